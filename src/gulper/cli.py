@@ -62,15 +62,21 @@ def backup(ctx):
 @backup.command("list", help="List available backups.")
 @click.option("--db", help="Database name")
 @click.option("--since", help="Time range for listing backups")
+@click.option("--limit", type=int, help="Maximum number of backups to list")
+@click.option("--before", help="List backups older than the one with this ID")
+@click.option("--after", help="List backups newer than the one with this ID")
 @click.option("--json", is_flag=True, help="Return output as JSON")
 @click.pass_context
-def backup_list(ctx, db, since, json):
+def backup_list(ctx, db, since, limit, before, after, json):
     """
     List backups
 
     Args:
         db (str): The database name
         since (str): The time range
+        limit (int): The maximum number of backups
+        before (str): The ID to list older backups than
+        after (str): The ID to list newer backups than
         json (bool): whether to output json or not
     """
     config = get_config(ctx.obj["config"])
@@ -79,10 +85,12 @@ def backup_list(ctx, db, since, json):
         config.get_logging_handler(),
         config.get_logging_path(),
     )
-    state = get_state(config.get_state_file())
+    state = get_state(config.get_state_file(), config.get_state_config())
+    # Write the buffered events when the command exits
+    ctx.call_on_close(state.flush_events)
     backup = get_backup(config, state, logger, get_file_system())
     backup_command = get_backup_command(backup, get_output())
-    return backup_command.list(db, since, json)
+    return backup_command.list(db, since, json, before, after, limit)
 
 
 @backup.command("run", help="Run a backup for a specified database.")
@@ -103,7 +111,9 @@ def backup_run(ctx, db, json):
         config.get_logging_handler(),
         config.get_logging_path(),
     )
-    state = get_state(config.get_state_file())
+    state = get_state(config.get_state_file(), config.get_state_config())
+    # Write the buffered events when the command exits
+    ctx.call_on_close(state.flush_events)
     backup = get_backup(config, state, logger, get_file_system())
     backup_command = get_backup_command(backup, get_output())
     return backup_command.run(db, json)
@@ -127,7 +137,9 @@ def backup_get(ctx, backup_id, json):
         config.get_logging_handler(),
         config.get_logging_path(),
     )
-    state = get_state(config.get_state_file())
+    state = get_state(config.get_state_file(), config.get_state_config())
+    # Write the buffered events when the command exits
+    ctx.call_on_close(state.flush_events)
     backup = get_backup(config, state, logger, get_file_system())
     backup_command = get_backup_command(backup, get_output())
     return backup_command.get(backup_id, json)
@@ -151,7 +163,9 @@ def backup_delete(ctx, backup_id, json):
         config.get_logging_handler(),
         config.get_logging_path(),
     )
-    state = get_state(config.get_state_file())
+    state = get_state(config.get_state_file(), config.get_state_config())
+    # Write the buffered events when the command exits
+    ctx.call_on_close(state.flush_events)
     backup = get_backup(config, state, logger, get_file_system())
     backup_command = get_backup_command(backup, get_output())
     return backup_command.delete(backup_id, json)
@@ -166,14 +180,16 @@ def restore(ctx):
 
 @restore.command("run", help="Restore a database from a specific backup.")
 @click.argument("backup_id")
+@click.option("--schema", multiple=True, help="Restore only this schema")
 @click.option("--json", is_flag=True, help="Return output as JSON")
 @click.pass_context
-def restore_run(ctx, backup_id, json):
+def restore_run(ctx, backup_id, schema, json):
     """
     Restore a database with backup id
 
     Args:
         backup_id (str): The backup id
+        schema (tuple): The schemas to restore
         json (bool): whether to output json or not
     """
     config = get_config(ctx.obj["config"])
@@ -182,22 +198,26 @@ def restore_run(ctx, backup_id, json):
         config.get_logging_handler(),
         config.get_logging_path(),
     )
-    state = get_state(config.get_state_file())
-    restore = get_restore(config, state, logger)
+    state = get_state(config.get_state_file(), config.get_state_config())
+    # Write the buffered events when the command exits
+    ctx.call_on_close(state.flush_events)
+    restore = get_restore(config, state, logger, get_file_system())
     restore_command = get_restore_command(restore, get_output())
-    return restore_command.run(None, backup_id, json)
+    return restore_command.run(None, backup_id, json, list(schema))
 
 
 @restore.command("db", help="Restore a specific database.")
 @click.argument("db")
+@click.option("--schema", multiple=True, help="Restore only this schema")
 @click.option("--json", is_flag=True, help="Return output as JSON")
 @click.pass_context
-def restore_db(ctx, db, json):
+def restore_db(ctx, db, schema, json):
     """
     Restore the database with db name
 
     Args:
         db (str): The database name
+        schema (tuple): The schemas to restore
         json (bool): whether to output json or not
     """
     config = get_config(ctx.obj["config"])
@@ -206,10 +226,12 @@ def restore_db(ctx, db, json):
         config.get_logging_handler(),
         config.get_logging_path(),
     )
-    state = get_state(config.get_state_file())
-    restore = get_restore(config, state, logger)
+    state = get_state(config.get_state_file(), config.get_state_config())
+    # Write the buffered events when the command exits
+    ctx.call_on_close(state.flush_events)
+    restore = get_restore(config, state, logger, get_file_system())
     restore_command = get_restore_command(restore, get_output())
-    return restore_command.run(db, None, json)
+    return restore_command.run(db, None, json, list(schema))
 
 
 @main.command(help="Run backup schedules")
@@ -228,7 +250,9 @@ def cron(ctx, daemon):
         config.get_logging_handler(),
         config.get_logging_path(),
     )
-    state = get_state(config.get_state_file())
+    state = get_state(config.get_state_file(), config.get_state_config())
+    # Write the buffered events when the command exits
+    ctx.call_on_close(state.flush_events)
     backup = get_backup(config, state, logger, get_file_system())
     cron = get_cron(config, state, logger, backup, get_schedule())
     cron_command = get_cron_command(cron)
@@ -245,15 +269,21 @@ def event(ctx):
 @event.command("list", help="List available events.")
 @click.option("--db", help="Database name to filter events")
 @click.option("--since", help="Time range for listing events")
+@click.option("--limit", type=int, help="Maximum number of events to list")
+@click.option("--before", help="List events older than the one with this ID")
+@click.option("--after", help="List events newer than the one with this ID")
 @click.option("--json", is_flag=True, help="Return output as JSON")
 @click.pass_context
-def event_list(ctx, db, since, json):
+def event_list(ctx, db, since, limit, before, after, json):
     """
     List backup and restore events
 
     Args:
         db (str): The database name
         since (str): The time range
+        limit (int): The maximum number of events
+        before (str): The ID to list older events than
+        after (str): The ID to list newer events than
         json (bool): whether to output json or not
     """
     config = get_config(ctx.obj["config"])
@@ -262,10 +292,12 @@ def event_list(ctx, db, since, json):
         config.get_logging_handler(),
         config.get_logging_path(),
     )
-    state = get_state(config.get_state_file())
+    state = get_state(config.get_state_file(), config.get_state_config())
+    # Write the buffered events when the command exits
+    ctx.call_on_close(state.flush_events)
     event = get_event(config, state, logger)
     event_command = get_event_command(event, get_output())
-    return event_command.list(db, since, json)
+    return event_command.list(db, since, json, before, after, limit)
 
 
 if __name__ == "__main__":
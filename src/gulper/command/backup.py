@@ -42,7 +42,15 @@ class BackupCommand:
         self._output = output
         self._backup.setup()
 
-    def list(self, db_name: Optional[str], since: Optional[str], as_json: bool):
+    def list(
+        self,
+        db_name: Optional[str],
+        since: Optional[str],
+        as_json: bool,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ):
         """
         Get a list of backups
 
@@ -50,9 +58,12 @@ class BackupCommand:
             db_name (Optional[str]): the database name
             since (Optional[str]): the time range
             as_json (bool): whether to output as JSON
+            before (Optional[str]): only backups older than the one with this id
+            after (Optional[str]): only backups newer than the one with this id
+            limit (Optional[int]): the maximum number of backups
         """
         try:
-            backups = self._backup.list(db_name, since)
+            backups = self._backup.list(db_name, since, before, after, limit)
         except Exception as e:
             self._output.error_message(str(e), as_json)
 
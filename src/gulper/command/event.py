@@ -42,7 +42,15 @@ class EventCommand:
         self._output = output
         self._event.setup()
 
-    def list(self, db_name: Optional[str], since: Optional[str], as_json: bool):
+    def list(
+        self,
+        db_name: Optional[str],
+        since: Optional[str],
+        as_json: bool,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ):
         """
         Output a list of events
 
@@ -50,9 +58,12 @@ class EventCommand:
             db_name (str): The database name
             since (str): A certain period for the backup
             as_json (bool): whether to output as JSON
+            before (str): Only events older than the event with this id
+            after (str): Only events newer than the event with this id
+            limit (int): The maximum number of events
         """
         try:
-            events = self._event.list(db_name, since)
+            events = self._event.list(db_name, since, before, after, limit)
         except Exception as e:
             self._output.error_message(str(e), as_json)
 
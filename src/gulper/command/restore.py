@@ -20,7 +20,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import Optional
+from typing import List, Optional
 from gulper.core import Restore
 from gulper.module import Output
 
@@ -42,7 +42,13 @@ class RestoreCommand:
         self._output = output
         self._restore.setup()
 
-    def run(self, db_name: Optional[str], backup_id: Optional[str], as_json: bool):
+    def run(
+        self,
+        db_name: Optional[str],
+        backup_id: Optional[str],
+        as_json: bool,
+        schemas: Optional[List[str]] = None,
+    ):
         """
         Restore the database
 
@@ -50,9 +56,10 @@ class RestoreCommand:
             db_name (str): The database name
             backup_id (str): The backup id
             as_json (bool): Whether to return output as JSON
+            schemas (Optional[List[str]]): The schemas to restore or None for the whole backup
         """
         try:
-            result = self._restore.run(db_name, backup_id)
+            result = self._restore.run(db_name, backup_id, schemas)
         except Exception as e:
             self._output.error_message(str(e), as_json)
 
@@ -22,13 +22,29 @@
 
 import os
 import json
-from typing import Any, Dict, Optional
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
 from gulper.module import Config
 from gulper.module import State
+from gulper.module import BackupRecord
 from gulper.module import Logger
 from gulper.module import get_storage
 from gulper.module import get_database
 from gulper.module import FileSystem
+from gulper.module import Database
+from gulper.module import Storage
+from gulper.module import FanoutWriter
+from gulper.module import HashingWriter
+from gulper.module import TeeWriter
+from gulper.module import Codec
+from gulper.module import get_codec_from_config
+from gulper.module import get_transfer_stats
+from gulper.module import format_throughput
+from gulper.module import Repository
+from gulper.module import get_repository_from_config
 from gulper.exception import BackupNotFound
 
 
@@ -64,26 +80,27 @@ class Backup:
         self._state.migrate()
 
     def list(
-        self, db_name: Optional[str], since: Optional[str]
-    ) -> list[Dict[str, Any]]:
+        self,
+        db_name: Optional[str],
+        since: Optional[str],
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[BackupRecord]:
         """
-        Get a list of backups
+        Stream a list of backups, newest first
 
         Args:
             db_name (str): The database name
             since (str): A certain period for the backup
+            before (str): Only backups older than the backup with this id
+            after (str): Only backups newer than the backup with this id
+            limit (int): The maximum number of backups
 
         Returns:
-            list[Dict[str, Any]]: A list of backups
+            Iterator[BackupRecord]: The backups
         """
-        backups = self._state.get_backups(db_name, since)
-
-        i = 0
-        for backup in backups:
-            backups[i]["meta"] = json.loads(backup.get("meta"))
-            i += 1
-
-        return backups
+        return self._state.iter_backups(db_name, since, before, after, limit)
 
     def delete(self, id: str) -> bool:
         """
@@ -103,9 +120,10 @@ class Backup:
             self._logger.get_logger().info(f"A backup with id {id} not found")
             raise BackupNotFound(f"Backup with id {id} not found!")
 
-        meta = json.loads(backup.get("meta"))
+        if self._state.has_child_backups(id):
+            raise Exception(f"Backup with id {id} is needed by newer increments!")
 
-        for file_backup in meta["backups"]:
+        for file_backup in backup.meta["backups"]:
             try:
                 self._logger.get_logger().info(
                     "Delete a file {} from storage {}".format(
@@ -131,7 +149,7 @@ class Backup:
 
         self._state.delete_backup(id)
         self._logger.get_logger().info(f"A backup with id {id} is deleted")
-        self._state.insert_event(
+        self._state.record_event(
             {
                 "db": backup.get("db"),
                 "type": "info",
@@ -156,8 +174,7 @@ class Backup:
             self._logger.get_logger().info(f"A backup with id {id} not found")
             raise BackupNotFound(f"Backup with id {id} not found!")
 
-        backup["meta"] = json.loads(backup.get("meta"))
-
+        backup = backup.to_dict()
         paths = []
         backups_exists = True
 
@@ -199,49 +216,586 @@ class Backup:
 
         self._logger.get_logger().info(f"Backup the database with name {db_name}")
 
-        file_path = db.backup()
-        backup_id = os.path.basename(file_path).replace(".tar.gz", "")
-
-        backups = []
         db_config = self._config.get_database_config(db_name)
         storages = db_config.get("storage", [])
 
+        if db_config.get("engine") == "parallel" and db_config.get("options"):
+            self._logger.get_logger().warning(
+                f"Database {db_name} uses the parallel engine, the mysqldump options are ignored"
+            )
+
+        repository = self._config.get_repository_config(db_name)
+        stream = db_config.get("stream", False)
+
+        # These formats and engines dump into many files, a single stream
+        # would fall back to a plain dump
+        dump = (
+            f"{db_config.get('format')} format"
+            if db_config.get("format") in ["directory", "cluster"]
+            else f"{db_config.get('engine')} engine"
+            if db_config.get("engine") in ["schemas", "parallel"]
+            else None
+        )
+
+        if dump and (repository or stream):
+            self._logger.get_logger().warning(
+                f"Database {db_name} uses the {dump}, it is dumped into temp_dir instead of streamed"
+            )
+            repository = None
+            stream = False
+
+        if repository:
+            return self._run_repository(db_name, db, storages)
+
+        if stream:
+            return self._run_stream(db_name, db, storages)
+
+        parent = None
+        incremental = self._config.get_incremental_config(db_name)
+
+        if incremental:
+            file_path, parent = db.backup_incremental(
+                incremental.get("manifest"),
+                self._get_parent(db_name, incremental.get("full_every")),
+            )
+        else:
+            file_path = db.backup()
+
+        backup_id = os.path.basename(file_path).split(".")[0]
+        db_codec = self._get_codec(db_name)
+        archives = {self._get_codec_key(db_codec): file_path}
+
+        uploads = []
+
         for storage_name in storages:
-            storage = get_storage(self._config, storage_name)
-            storage_config = self._config.get_storage_config(storage_name)
+            storage = self._get_storage(storage_name)
+            codec = self._get_codec(db_name, storage_name)
 
-            if storage_config is None:
+            try:
+                local_file = self._get_archive(archives, db_codec, codec)
+            except Exception as e:
                 self._logger.get_logger().error(
-                    f"Storage {storage_name} configs are missing!"
+                    f"Unable to recompress file {file_path} for storage {storage_name}: {e}"
+                )
+                continue
+
+            uploads.append((storage_name, storage, codec, local_file))
+
+        workers = max(1, min(self._config.get_upload_workers(), len(uploads)))
+
+        # Upload to all the storages concurrently
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda upload: self._upload_file(backup_id, *upload), uploads
+            )
+            backups = [backup for backup in results if backup is not None]
+
+        for local_file in archives.values():
+            self._file_system.delete_file(local_file)
+
+        return self._store_backup(
+            backup_id, db_name, storages, {"backups": backups}, parent
+        )
+
+    def _run_stream(self, db_name: str, db: Database, storages: List[str]) -> bool:
+        """
+        Backup the database by streaming the dump through hashing and
+        compression straight into the storages
+
+        Args:
+            db_name (str): The database name
+            db (Database): The database instance
+            storages (list[str]): The storage names
+
+        Returns:
+            bool: whether backup succeeded or not
+        """
+        if len(storages) == 0:
+            raise Exception(f"Database {db_name} has no storage to stream into!")
+
+        backup_id = str(uuid.uuid4())
+
+        # Storages sharing a codec share a single compressed stream
+        groups = {}
+
+        for storage_name in storages:
+            storage = self._get_storage(storage_name)
+            codec = self._get_codec(db_name, storage_name)
+            group = groups.setdefault(self._get_codec_key(codec), (codec, []))
+            group[1].append((storage_name, storage))
+
+        fanouts = []
+        compressors = []
+        remote_files = {}
+        uploaded = {}
+        threads = []
+
+        for codec, targets in groups.values():
+            fanout = FanoutWriter(len(targets))
+            remote_file_name = f"{backup_id}.dump{codec.get_extension()}"
+
+            for (storage_name, storage), reader in zip(targets, fanout.get_readers()):
+                remote_files[storage_name] = (remote_file_name, codec)
+                thread = threading.Thread(
+                    target=self._upload_stream,
+                    args=(storage_name, storage, reader, remote_file_name, uploaded),
                 )
-                raise Exception(f"Storage {storage_name} configs are missing!")
+                thread.start()
+                threads.append(thread)
+
+            fanouts.append(fanout)
+            compressors.append(codec.open_writer(fanout))
 
-            remote_file_name = f"{backup_id}.tar.gz"
+        # A codec stream whose storages all failed is dropped by the tee,
+        # the dump goes on as long as one of the streams is consumed
+        tee = TeeWriter(compressors)
+        writer = HashingWriter(tee)
+        error = None
+
+        try:
+            self._logger.get_logger().info(
+                f"Stream backup {backup_id} of database {db_name}"
+            )
+            db.dump(writer)
 
+            for i, (compressor, fanout) in enumerate(zip(compressors, fanouts)):
+                try:
+                    compressor.close()
+
+                    if tee.get_error(i) is not None:
+                        raise tee.get_error(i)
+
+                    fanout.close()
+                except Exception as e:
+                    fanout.fail(e)
+        except Exception as e:
+            # The dump stops when the streams of all the storages failed
+            stopped = all(tee.get_error(i) is not None for i in range(len(compressors)))
+
+            for fanout in fanouts:
+                fanout.fail(e)
+
+            if not stopped:
+                raise
+
+            error = e
+        finally:
+            for thread in threads:
+                thread.join()
+
+        if error is not None:
+            self._logger.get_logger().error(
+                f"Unable to stream backup {backup_id} of database {db_name}: {error}"
+            )
+
+            return self._store_backup(
+                backup_id, db_name, storages, {"backups": [], "format": "stream"}
+            )
+
+        backups = [
+            {
+                "storage_name": storage_name,
+                "file": remote_files[storage_name][0],
+                "codec": remote_files[storage_name][1].get_name(),
+                **uploaded[storage_name],
+            }
+            for storage_name in storages
+            if uploaded.get(storage_name)
+        ]
+
+        return self._store_backup(
+            backup_id,
+            db_name,
+            storages,
+            {"backups": backups, "format": "stream", "checksum": writer.hexdigest()},
+        )
+
+    def _run_repository(self, db_name: str, db: Database, storages: List[str]) -> bool:
+        """
+        Backup the database by streaming the dump into the chunk repository
+        of each storage, only the chunks a repository doesn't have are uploaded
+
+        Args:
+            db_name (str): The database name
+            db (Database): The database instance
+            storages (list[str]): The storage names
+
+        Returns:
+            bool: whether backup succeeded or not
+        """
+        if len(storages) == 0:
+            raise Exception(f"Database {db_name} has no storage to back up into!")
+
+        backup_id = str(uuid.uuid4())
+        fanout = FanoutWriter(len(storages))
+        repositories = {}
+        written = {}
+        threads = []
+
+        for storage_name, reader in zip(storages, fanout.get_readers()):
+            self._get_storage(storage_name)
+            repository = get_repository_from_config(self._config, db_name, storage_name)
+            repositories[storage_name] = repository
+            thread = threading.Thread(
+                target=self._write_repository,
+                args=(storage_name, repository, reader, backup_id, written),
+            )
+            thread.start()
+            threads.append(thread)
+
+        writer = HashingWriter(fanout)
+
+        try:
+            self._logger.get_logger().info(
+                f"Backup {backup_id} of database {db_name} into the repositories"
+            )
+            db.dump(writer)
+            fanout.close()
+        except Exception as e:
+            fanout.fail(e)
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+        backups = [
+            {
+                "storage_name": storage_name,
+                "file": repositories[storage_name].get_index_name(backup_id),
+                "codec": self._get_codec(db_name, storage_name).get_name(),
+                **written[storage_name],
+            }
+            for storage_name in storages
+            if written.get(storage_name)
+        ]
+
+        return self._store_backup(
+            backup_id,
+            db_name,
+            storages,
+            {
+                "backups": backups,
+                "format": "repository",
+                "checksum": writer.hexdigest(),
+            },
+        )
+
+    def collect_garbage(self, db_name: str):
+        """
+        Delete the repository chunks no backup references anymore from the
+        storages of a database
+
+        Args:
+            db_name (str): The database name
+        """
+        repository_config = self._config.get_repository_config(db_name)
+
+        if not repository_config:
+            return None
+
+        db_config = self._config.get_database_config(db_name)
+
+        for storage_name in db_config.get("storage", []):
             try:
+                repository = get_repository_from_config(
+                    self._config, db_name, storage_name
+                )
+                deleted = repository.collect_garbage(
+                    repository_config.get("gc_grace", 86400)
+                )
                 self._logger.get_logger().info(
-                    f"Upload file {file_path} to storage {storage_name}"
+                    f"Deleted {len(deleted)} unreferenced chunks from storage {storage_name}"
                 )
-                storage.upload_file(file_path, remote_file_name)
-                backups.append({"storage_name": storage_name, "file": remote_file_name})
             except Exception as e:
                 self._logger.get_logger().error(
-                    f"Unable to upload file {file_path} to storage {storage_name}: {e}"
+                    f"Unable to collect garbage from storage {storage_name}: {e}"
                 )
 
+    def _get_parent(self, db_name: str, full_every: int) -> Optional[str]:
+        """
+        Get the backup the next increment of a database depends on
+
+        Args:
+            db_name (str): The database name
+            full_every (int): The maximum number of backups in a chain
+
+        Returns:
+            Optional[str]: The parent backup id or None for a full backup
+        """
+        backup = self._state.get_latest_backup(db_name)
+
+        # Only chain on backups stored in all the storages
+        if backup is None or backup.get("status") != "success":
+            return None
+
+        if len(self._state.get_backup_chain(backup.get("id"))) >= full_every:
+            return None
+
+        return backup.get("id")
+
+    def _get_codec(self, db_name: str, storage_name: Optional[str] = None) -> Codec:
+        """
+        Get the compression codec of a database backup on a storage
+
+        Args:
+            db_name (str): The database name
+            storage_name (Optional[str]): The storage name
+
+        Returns:
+            Codec: The codec instance
+        """
+        return get_codec_from_config(
+            self._config.get_compression_config(db_name, storage_name)
+        )
+
+    def _get_codec_key(self, codec: Codec) -> str:
+        """
+        Get a key that identifies the output of a codec
+
+        Args:
+            codec (Codec): The codec instance
+
+        Returns:
+            str: The codec key
+        """
+        return f"{codec.get_name()}-{codec.get_level()}"
+
+    def _get_archive(
+        self, archives: Dict[str, str], from_codec: Codec, to_codec: Codec
+    ) -> str:
+        """
+        Get the backup archive compressed with a codec, the archive is
+        recompressed from the database archive the first time it is needed.
+
+        Args:
+            archives (Dict[str, str]): The local archives by codec key
+            from_codec (Codec): The codec of the database archive
+            to_codec (Codec): The codec needed by the storage
+
+        Returns:
+            str: The local archive path
+        """
+        key = self._get_codec_key(to_codec)
+
+        if key not in archives:
+            file_path = archives[self._get_codec_key(from_codec)]
+            backup_id = os.path.basename(file_path).split(".")[0]
+            local_file = os.path.join(
+                os.path.dirname(file_path),
+                f"{backup_id}-{key}.tar{to_codec.get_extension()}",
+            )
+            self._logger.get_logger().info(
+                f"Recompress file {file_path} with codec {to_codec.get_name()}"
+            )
+            self._file_system.transcode_file(
+                file_path, local_file, from_codec, to_codec
+            )
+            archives[key] = local_file
+
+        return archives[key]
+
+    def _upload_file(
+        self,
+        backup_id: str,
+        storage_name: str,
+        storage: Storage,
+        codec: Codec,
+        local_file: str,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Upload a backup archive to a storage
+
+        Args:
+            backup_id (str): The backup id
+            storage_name (str): The storage name
+            storage (Storage): The storage instance
+            codec (Codec): The codec of the archive
+            local_file (str): The archive path
+
+        Returns:
+            Optional[Dict[str, Any]]: The stored file data or None if upload failed
+        """
+        remote_file_name = f"{backup_id}.tar{codec.get_extension()}"
+
+        try:
+            self._logger.get_logger().info(
+                f"Upload file {local_file} to storage {storage_name}"
+            )
+            start = time.monotonic()
+            storage.upload_file(local_file, remote_file_name)
+            stats = get_transfer_stats(
+                os.path.getsize(local_file), time.monotonic() - start
+            )
+        except Exception as e:
+            self._logger.get_logger().error(
+                f"Unable to upload file {local_file} to storage {storage_name}: {e}"
+            )
+            return None
+
+        self._logger.get_logger().info(
+            "File {} uploaded to storage {}: {} bytes in {}s at {}".format(
+                local_file,
+                storage_name,
+                stats["size"],
+                stats["duration"],
+                format_throughput(stats["throughput"]),
+            )
+        )
+
+        return {
+            "storage_name": storage_name,
+            "file": remote_file_name,
+            "codec": codec.get_name(),
+            **stats,
+        }
+
+    def _upload_stream(
+        self,
+        storage_name: str,
+        storage: Storage,
+        reader: Any,
+        remote_file_name: str,
+        uploaded: Dict[str, Dict[str, Any]],
+    ):
+        """
+        Upload a backup stream to a storage
+
+        Args:
+            storage_name (str): The storage name
+            storage (Storage): The storage instance
+            reader (Any): The stream to upload
+            remote_file_name (str): The remote file name
+            uploaded (Dict[str, Dict[str, Any]]): The uploads stats by storage name
+        """
+        try:
+            self._logger.get_logger().info(
+                f"Stream file {remote_file_name} to storage {storage_name}"
+            )
+            start = time.monotonic()
+            storage.upload_stream(reader, remote_file_name)
+            uploaded[storage_name] = get_transfer_stats(
+                reader.get_bytes_read(), time.monotonic() - start
+            )
+        except Exception as e:
+            reader.abandon()
+            self._logger.get_logger().error(
+                f"Unable to stream file {remote_file_name} to storage {storage_name}: {e}"
+            )
+            return
+
+        self._logger.get_logger().info(
+            "File {} streamed to storage {}: {} bytes in {}s at {}".format(
+                remote_file_name,
+                storage_name,
+                uploaded[storage_name]["size"],
+                uploaded[storage_name]["duration"],
+                format_throughput(uploaded[storage_name]["throughput"]),
+            )
+        )
+
+    def _write_repository(
+        self,
+        storage_name: str,
+        repository: Repository,
+        reader: Any,
+        backup_id: str,
+        written: Dict[str, Dict[str, Any]],
+    ):
+        """
+        Write a backup stream into a storage repository
+
+        Args:
+            storage_name (str): The storage name
+            repository (Repository): The storage repository
+            reader (Any): The stream to back up
+            backup_id (str): The backup id
+            written (Dict[str, Dict[str, Any]]): The backups stats by storage name
+        """
+        try:
+            start = time.monotonic()
+            stats = repository.write(reader, backup_id)
+            duration = time.monotonic() - start
+        except Exception as e:
+            reader.abandon()
+            self._logger.get_logger().error(
+                f"Unable to write backup {backup_id} into storage {storage_name}: {e}"
+            )
+            return
+
+        written[storage_name] = {
+            "chunks": stats["chunks"],
+            "new_chunks": stats["new_chunks"],
+            **get_transfer_stats(stats["uploaded"], duration),
+        }
+        self._logger.get_logger().info(
+            "Backup {} written into storage {}: {} of {} chunks uploaded, {} bytes at {}".format(
+                backup_id,
+                storage_name,
+                stats["new_chunks"],
+                stats["chunks"],
+                stats["uploaded"],
+                format_throughput(written[storage_name]["throughput"]),
+            )
+        )
+
+    def _get_storage(self, storage_name: str) -> Storage:
+        """
+        Get a storage instance by name
+
+        Args:
+            storage_name (str): The storage name
+
+        Returns:
+            Storage: The storage instance
+        """
+        storage = get_storage(self._config, storage_name)
+        storage_config = self._config.get_storage_config(storage_name)
+
+        if storage_config is None:
+            self._logger.get_logger().error(
+                f"Storage {storage_name} configs are missing!"
+            )
+            raise Exception(f"Storage {storage_name} configs are missing!")
+
+        return storage
+
+    def _store_backup(
+        self,
+        backup_id: str,
+        db_name: str,
+        storages: List[str],
+        meta: Dict[str, Any],
+        parent: Optional[str] = None,
+    ) -> bool:
+        """
+        Store the backup data and the backup event
+
+        Args:
+            backup_id (str): The backup id
+            db_name (str): The database name
+            storages (list[str]): The storage names
+            meta (Dict[str, Any]): The backup meta
+            parent (Optional[str]): The id of the backup an increment depends on
+
+        Returns:
+            bool: whether backup succeeded or not
+        """
+        backups = meta.get("backups")
+
         self._logger.get_logger().info(f"Store backup {backup_id} data")
 
         self._state.insert_backup(
             {
                 "id": backup_id,
                 "db": db_name,
-                "meta": json.dumps({"backups": backups}),
+                "meta": json.dumps(meta),
                 "status": "success" if len(backups) == len(storages) else "failure",
+                "parent": parent,
             }
         )
 
         if len(backups) == len(storages):
-            self._state.insert_event(
+            self._state.record_event(
                 {
                     "db": db_name,
                     "type": "info",
@@ -249,7 +803,7 @@ class Backup:
                 }
             )
         else:
-            self._state.insert_event(
+            self._state.record_event(
                 {
                     "db": db_name,
                     "type": "error",
@@ -257,8 +811,6 @@ class Backup:
                 }
             )
 
-        self._file_system.delete_file(file_path)
-
         return True if len(backups) == len(storages) else False
 
 
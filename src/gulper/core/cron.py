@@ -20,14 +20,26 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import time
+import sys
+import heapq
 import pytz
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from gulper.module import Config
 from gulper.module import State
 from gulper.module import Logger
 from gulper.core import Backup
 from gulper.module import Schedule
-from datetime import datetime
+from datetime import datetime, timedelta
+
+
+# The seconds to wait before a failed backup is tried again in its window
+RETRY_DELAY = 60
+
+# The maximum backup attempts of a database in one schedule window
+MAX_ATTEMPTS = 3
 
 
 class Cron:
@@ -58,6 +70,15 @@ class Cron:
         self._logger = logger
         self._backup = backup
         self._schedule = schedule
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._running = set()
+        self._claimed = {}
+        self._attempts = {}
+        self._limits = {}
+        self._waiting = []
+        self._heap = []
+        self._sequence = 0
 
     def setup(self):
         """
@@ -78,93 +99,414 @@ class Cron:
         if is_daemon:
             print("Cron daemon started..")
 
-        while True:
-            dbs = self._config.get_databases()
+        workers = max(1, self._config.get_concurrency_config().get("backups"))
 
-            for db, configs in dbs.items():
-                schedule_name = configs.get("schedule", None)
+        if is_daemon and threading.current_thread() is threading.main_thread():
+            # Stop on SIGTERM like on Ctrl+C so the shutdown below runs
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
 
-                self.run_db_retention(db)
-                self.run_event_retention()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                self._schedule_backups()
 
-                if not schedule_name:
-                    continue
+                if not is_daemon:
+                    self.run_retention()
+                    now = self._schedule.get_current_utc()
+
+                    while True:
+                        for job in self._pop_due_jobs(now):
+                            self._run_job(job, executor, False)
+
+                        with self._wakeup:
+                            # Held back jobs are pushed again as backups finish
+                            while self._waiting and not (
+                                self._heap and self._heap[0][0] <= now
+                            ):
+                                self._wakeup.wait()
+
+                            if not (self._heap and self._heap[0][0] <= now):
+                                return
+
+                self._push(self._schedule.get_current_utc(), None, None, None)
+
+                while True:
+                    with self._wakeup:
+                        # Sleep until the next job is due or a retry is pushed
+                        while not self._heap or self._heap[0][0] > (
+                            now := self._schedule.get_current_utc()
+                        ):
+                            timeout = (
+                                (self._heap[0][0] - now).total_seconds()
+                                if self._heap
+                                else None
+                            )
+                            self._wakeup.wait(timeout)
+
+                    for job in self._pop_due_jobs():
+                        self._run_job(job, executor, True)
+        finally:
+            # The exit hooks don't run on SIGTERM, write the buffered events here
+            self._state.flush_events()
+
+    def _schedule_backups(self):
+        """
+        Parse the schedule of every database once and push its next backup.
+        A database without a backup in its current window is due right away.
+        """
+        now = self._schedule.get_current_utc()
+
+        for db, configs in self._config.get_databases().items():
+            schedule_name = configs.get("schedule", None)
+
+            if not schedule_name:
+                continue
+
+            schedule = self._config.get_schedule_config(schedule_name)
+
+            if not schedule:
+                self._logger.get_logger().error(
+                    f"Unable to find schedule {schedule_name}"
+                )
+                continue
 
-                schedule = self._config.get_schedule_config(schedule_name)
+            start, end = self._get_window(schedule, now)
+            backup = self._state.get_latest_backup(db)
 
-                if not schedule:
-                    self._logger.get_logger().error(
-                        f"Unable to find schedule {schedule_name}"
+            if backup:
+                # Validate that the backup was in the past or not
+                created_at = datetime.strptime(
+                    backup.get("createdAt"), "%Y-%m-%d %H:%M:%S"
+                )
+                created_at_utc = created_at.replace(tzinfo=pytz.UTC)
+
+                if created_at_utc >= start and created_at_utc < end:
+                    # The backup was not in the past, wait for the next window
+                    self._logger.get_logger().info(
+                        f"Database with name {db} had a backup at {created_at} so skip cron"
                     )
+                    self._push(end, db, end, self._get_window(schedule, end)[1])
                     continue
 
-                prev_cron_run = self._schedule.get_cron_prev_run(
-                    schedule.get("expression")
+            self._push(now, db, start, end)
+
+    def _get_window(self, schedule: dict, at: datetime) -> Tuple[datetime, datetime]:
+        """
+        Get the schedule window holding a time
+
+        Args:
+            schedule (dict): The schedule configuration
+            at (datetime): The time
+
+        Returns:
+            Tuple[datetime, datetime]: The window start and end
+        """
+        if schedule.get("interval"):
+            return self._schedule.get_interval_window(
+                self._config.get_interval_in_seconds(schedule.get("interval")), at
+            )
+
+        return self._schedule.get_cron_window(schedule.get("expression"), at)
+
+    def _push(
+        self,
+        due: datetime,
+        db: Optional[str],
+        start: Optional[datetime],
+        end: Optional[datetime],
+        retry: bool = False,
+    ):
+        """
+        Push a job into the heap, a job without database runs the retention
+
+        Args:
+            due (datetime): When the job is due
+            db (Optional[str]): The database to backup or None for the retention
+            start (Optional[datetime]): The start of the backup window
+            end (Optional[datetime]): The end of the backup window
+            retry (bool): Whether the job retries a failed backup
+        """
+        with self._wakeup:
+            self._sequence += 1
+            heapq.heappush(self._heap, (due, self._sequence, db, start, end, retry))
+            self._wakeup.notify()
+
+    def _pop_due_jobs(self, now: Optional[datetime] = None) -> List[tuple]:
+        """
+        Pop the jobs that are due
+
+        Args:
+            now (Optional[datetime]): The time the jobs are due at or None for the current time
+
+        Returns:
+            List[tuple]: The due jobs in order
+        """
+        now = now or self._schedule.get_current_utc()
+        jobs = []
+
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                jobs.append(heapq.heappop(self._heap))
+
+        return jobs
+
+    def _run_job(self, job: tuple, executor: ThreadPoolExecutor, reschedule: bool):
+        """
+        Run a due job and push its next run
+
+        Args:
+            job (tuple): The due job
+            executor (ThreadPoolExecutor): The backup worker pool
+            reschedule (bool): Whether to push the next run of the job
+        """
+        _, _, db, start, end, retry = job
+
+        if db is None:
+            self.run_retention()
+
+            if reschedule:
+                self._push(
+                    self._schedule.get_current_utc()
+                    + timedelta(
+                        seconds=self._config.get_retention_interval_in_seconds()
+                    ),
+                    None,
+                    None,
+                    None,
                 )
-                next_cron_run = self._schedule.get_cron_next_run(
-                    schedule.get("expression")
+            return
+
+        schedule = self._config.get_schedule_config(
+            self._config.get_database_config(db).get("schedule")
+        )
+        now = self._schedule.get_current_utc()
+
+        if now >= end:
+            if retry:
+                return
+
+            # The daemon missed the whole window, only the current one counts
+            start, end = self._get_window(schedule, now)
+
+        limits = self._get_limits(db)
+
+        with self._lock:
+            if self._claimed.get(db) == start:
+                # A backup already ran in this window, it may not be stored yet
+                return
+
+            # The job goes back to the heap once a backup finishes, so it
+            # doesn't hold a worker while it waits
+            waits_for = (
+                "its previous backup"
+                if db in self._running
+                else next(
+                    (key for key, size in limits if self._limits.get(key, 0) >= size),
+                    None,
                 )
-                current_utc = self._schedule.get_current_utc()
-
-                if current_utc >= prev_cron_run and current_utc < next_cron_run:
-                    backup = self._state.get_latest_backup(db)
-
-                    if backup:
-                        # Validate that the backup was in the past or not
-                        created_at = datetime.strptime(
-                            backup.get("createdAt"), "%Y-%m-%d %H:%M:%S"
-                        )
-                        created_at_utc = created_at.replace(tzinfo=pytz.UTC)
-                        if (
-                            created_at_utc >= prev_cron_run
-                            and created_at_utc < next_cron_run
-                        ):
-                            # The backup was not in the past, don't run another backup
-                            self._logger.get_logger().info(
-                                f"Database with name {db} had a backup at {created_at} so skip cron"
-                            )
-                            continue
-
-                    self._logger.get_logger().info(f"Run a backup for database {db}")
-                    self._state.insert_event(
-                        {
-                            "db": db,
-                            "type": "info",
-                            "record": "Run backup from a cron job",
-                        }
-                    )
-                    # Run a new backup
-                    self._backup.run(db)
+            )
 
-            if not is_daemon:
-                break
+            if waits_for:
+                self._waiting.append(job)
             else:
-                time.sleep(60)
+                self._running.add(db)
+                self._claimed[db] = start
+
+                for key, _ in limits:
+                    self._limits[key] = self._limits.get(key, 0) + 1
+
+                # Count the attempts of the window to cap the retries
+                attempts = self._attempts.get(db)
+                self._attempts[db] = (
+                    (start, attempts[1] + 1)
+                    if attempts and attempts[0] == start
+                    else (start, 1)
+                )
 
-    def run_db_retention(self, db_name):
+        if waits_for:
+            self._logger.get_logger().info(
+                f"Backup of database {db} waits for {waits_for}"
+            )
+            return
+
+        if reschedule and not retry:
+            self._push(end, db, end, self._get_window(schedule, end)[1])
+
+        self._logger.get_logger().info(f"Run a backup for database {db}")
+        self._state.record_event(
+            {
+                "db": db,
+                "type": "info",
+                "record": "Run backup from a cron job",
+            }
+        )
+        executor.submit(self._run_backup, db, start, end if reschedule else None)
+
+    def run_retention(self):
+        """
+        Run the retention of the databases without a running backup and of
+        the events
         """
-        Run a database retention
+        # Retention would race with a running backup
+        with self._lock:
+            dbs = [
+                db
+                for db in self._config.get_databases().keys()
+                if db not in self._running
+            ]
+
+        self.run_db_retention(*dbs)
+        self.run_event_retention()
+
+    def _run_backup(self, db: str, start: datetime, end: Optional[datetime]):
+        """
+        Run a backup, the host and storage limits it falls under are already
+        taken and released once it finishes
 
         Args:
-            db_name (str): The database name
+            db (str): The database name
+            start (datetime): The start of the schedule window of the backup
+            end (Optional[datetime]): The end of the window or None to never retry
         """
-        self._logger.get_logger().info(f"Check db {db_name} retention")
+        stored = False
 
-        retention = self._config.get_retention_in_seconds(db_name)
+        try:
+            stored = self._backup.run(db) or self._has_stored_backup(db, start)
+        except Exception as e:
+            self._logger.get_logger().error(f"Backup of database {db} failed: {e}")
+        finally:
+            with self._wakeup:
+                self._running.discard(db)
 
-        if not retention:
-            self._logger.get_logger().info(
-                f"Database {db_name} retention is not provided"
+                for key, _ in self._get_limits(db):
+                    self._limits[key] -= 1
+
+                # A backup stored on some of the storages still counts for
+                # the window, only a backup stored nowhere gives it up
+                if not stored and self._claimed.get(db) == start:
+                    del self._claimed[db]
+
+                # The held back jobs may run now
+                for job in self._waiting:
+                    heapq.heappush(self._heap, job)
+
+                self._waiting = []
+                self._wakeup.notify()
+
+        with self._lock:
+            attempts = self._attempts.get(db, (start, 0))[1]
+
+        # A backup stored nowhere is tried again in the same window
+        if not stored and end is not None and attempts < MAX_ATTEMPTS:
+            retry_at = self._schedule.get_current_utc() + timedelta(seconds=RETRY_DELAY)
+
+            if retry_at < end:
+                self._push(retry_at, db, start, end, True)
+
+    def _has_stored_backup(self, db: str, start: datetime) -> bool:
+        """
+        Check whether a backup of the window was stored on any storage
+
+        Args:
+            db (str): The database name
+            start (datetime): The start of the schedule window
+
+        Returns:
+            bool: Whether a backup was stored
+        """
+        backup = self._state.get_latest_backup(db)
+
+        if not backup:
+            return False
+
+        created_at = datetime.strptime(
+            backup.get("createdAt"), "%Y-%m-%d %H:%M:%S"
+        ).replace(tzinfo=pytz.UTC)
+
+        return created_at >= start and len(backup.meta.get("backups") or []) > 0
+
+    def _get_limits(self, db: str) -> List[Tuple[str, int]]:
+        """
+        Get the host and storage limits of a database backup
+
+        Args:
+            db (str): The database name
+
+        Returns:
+            List[Tuple[str, int]]: The limit keys and sizes
+        """
+        concurrency = self._config.get_concurrency_config()
+        db_config = self._config.get_database_config(db) or {}
+        limits = []
+
+        if concurrency.get("per_host") and db_config.get("host"):
+            limits.append(
+                (
+                    f"host:{db_config.get('host')}:{db_config.get('port', '')}",
+                    concurrency.get("per_host"),
+                )
             )
-            return None
 
-        backups = self._state.get_stale_backups(retention, db_name)
+        if concurrency.get("per_storage"):
+            for storage_name in db_config.get("storage", []):
+                limits.append(
+                    (f"storage:{storage_name}", concurrency.get("per_storage"))
+                )
+
+        return sorted(set(limits))
+
+    def run_db_retention(self, *db_names: str):
+        """
+        Run the retention of databases, the stale backups of all of them are
+        selected in one query
+
+        Args:
+            db_names (str): The database names
+        """
+        retentions = {}
 
+        for db_name in db_names:
+            self._logger.get_logger().info(f"Check db {db_name} retention")
+
+            retention = self._config.get_retention_in_seconds(db_name)
+
+            if not retention:
+                self._logger.get_logger().info(
+                    f"Database {db_name} retention is not provided"
+                )
+                continue
+
+            retentions[db_name] = retention
+
+        backups = self._state.get_stale_backups_by_db(retentions)
+        children = self._state.get_child_counts(
+            [backup.get("id") for backup in backups]
+        )
+
+        # Backups are sorted newest first, so increments go before their parents
         for backup in backups:
+            if children.get(backup.get("id")):
+                self._logger.get_logger().info(
+                    f"Keep a backup with id {backup.get('id')} needed by newer increments"
+                )
+                continue
+
             self._logger.get_logger().info(
                 f"Delete a backup with id {backup.get('id')}"
             )
-            self._backup.delete(backup.get("id"))
+
+            try:
+                self._backup.delete(backup.get("id"))
+            except Exception as e:
+                self._logger.get_logger().error(
+                    f"Unable to delete a backup with id {backup.get('id')}: {e}"
+                )
+                continue
+
+            if backup.get("parent") in children:
+                children[backup.get("parent")] -= 1
+
+        for db_name in retentions.keys():
+            self._backup.collect_garbage(db_name)
 
     def run_event_retention(self):
         """
@@ -172,12 +514,11 @@ class Cron:
         """
         self._logger.get_logger().info("Run event retention")
 
-        retention = self._config.get_event_retention_in_seconds()
-        events = self._state.get_stale_events(retention)
+        deleted = self._state.delete_stale_events(
+            self._config.get_event_retention_in_seconds()
+        )
 
-        for event in events:
-            self._logger.get_logger().info(f"Delete an event with id {event.get('id')}")
-            self._state.delete_event(event.get("id"))
+        self._logger.get_logger().info(f"Deleted {deleted} stale events")
 
 
 def get_cron(
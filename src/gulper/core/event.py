@@ -22,8 +22,9 @@
 
 from gulper.module import Config
 from gulper.module import State
+from gulper.module import EventRecord
 from gulper.module import Logger
-from typing import Any, Dict, Optional
+from typing import Iterator, Optional
 
 
 class Event:
@@ -54,19 +55,27 @@ class Event:
         self._state.migrate()
 
     def list(
-        self, db_name: Optional[str], since: Optional[str]
-    ) -> list[Dict[str, Any]]:
+        self,
+        db_name: Optional[str],
+        since: Optional[str],
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EventRecord]:
         """
-        Get a list of events
+        Stream a list of events, newest first
 
         Args:
             db_name (str): The database name
             since (str): A certain period for the backup
+            before (str): Only events older than the event with this id
+            after (str): Only events newer than the event with this id
+            limit (int): The maximum number of events
 
         Returns:
-            list[Dict[str, Any]]: A list of events
+            Iterator[EventRecord]: The events
         """
-        return self._state.get_events(db_name, since)
+        return self._state.iter_events(db_name, since, before, after, limit)
 
 
 def get_event(config: Config, state: State, logger: Logger) -> Event:
@@ -20,23 +20,166 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import os
 import json
-from typing import Optional
+import time
+import tarfile
+import threading
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 from gulper.module import Config
 from gulper.module import State
 from gulper.module import Logger
 from gulper.module import get_storage
 from gulper.module import get_database
+from gulper.module import Database
+from gulper.module import FileSystem
+from gulper.module import Codec
+from gulper.module import Storage
+from gulper.module import get_codec
+from gulper.module import FanoutWriter
+from gulper.module import VerifyingReader
+from gulper.module import TimingReader
+from gulper.module import get_transfer_stats
+from gulper.module import format_throughput
+from gulper.module import get_repository_from_config
 from gulper.exception import BackupNotFound
 from gulper.exception import OperationFailed
 
 
+# The size of the chunks a replica download copies between two cancel checks
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ReplicaDownload:
+    """
+    A download of a backup file from one storage on its own thread. It
+    can be cancelled between two chunks and reports its throughput while
+    it runs.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        file_name: str,
+        local_file: str,
+        done: threading.Event,
+    ):
+        """
+        Class Constructor
+
+        Args:
+            storage (Storage): The storage to download from
+            file_name (str): The remote file name
+            local_file (str): The local path to download into
+            done (threading.Event): Set when the download ends
+        """
+        self._storage = storage
+        self._file_name = file_name
+        self._local_file = local_file
+        self._done = done
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._start = None
+        self._first_byte = None
+        self._size = 0
+        self.error = None
+        self.finished = False
+
+    def start(self) -> "ReplicaDownload":
+        """
+        Start the download
+
+        Returns:
+            ReplicaDownload: The download itself
+        """
+        self._start = time.monotonic()
+        self._thread.start()
+
+        return self
+
+    def _run(self):
+        """
+        Copy the remote file into the local file until it ends or the
+        download is cancelled
+        """
+        try:
+            reader = self._storage.download_stream(self._file_name)
+
+            try:
+                with open(self._local_file, "wb") as writer:
+                    for chunk in iter(lambda: reader.read(DOWNLOAD_CHUNK_SIZE), b""):
+                        if self._cancelled.is_set():
+                            return
+
+                        if self._first_byte is None:
+                            self._first_byte = self.get_elapsed()
+
+                        writer.write(chunk)
+                        self._size += len(chunk)
+            finally:
+                reader.close()
+
+            self.finished = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    def cancel(self):
+        """
+        Cancel the download and remove what was downloaded
+        """
+        self._cancelled.set()
+        self._thread.join()
+
+        if os.path.exists(self._local_file):
+            os.remove(self._local_file)
+
+    def get_elapsed(self) -> float:
+        """
+        Get the seconds since the download started
+
+        Returns:
+            float: The elapsed seconds
+        """
+        return time.monotonic() - self._start
+
+    def get_throughput(self) -> int:
+        """
+        Get the download throughput so far
+
+        Returns:
+            int: The throughput in bytes per second
+        """
+        return get_transfer_stats(self._size, self.get_elapsed())["throughput"]
+
+    def get_first_byte(self) -> Optional[float]:
+        """
+        Get the seconds between the download start and its first byte
+
+        Returns:
+            Optional[float]: The seconds or None if no byte arrived yet
+        """
+        return self._first_byte
+
+    def get_local_file(self) -> str:
+        """
+        Get the local path the download writes into
+
+        Returns:
+            str: The local path
+        """
+        return self._local_file
+
+
 class Restore:
     """
     Restore Core Functionalities
     """
 
-    def __init__(self, config: Config, state: State, logger: Logger):
+    def __init__(
+        self, config: Config, state: State, logger: Logger, file_system: FileSystem
+    ):
         """
         Class Constructor
 
@@ -44,10 +187,13 @@ class Restore:
             config (Config): A config instance
             state (State): A state instance
             logger (Logger): A logger instance
+            file_system (FileSystem): The file system instance
         """
         self._config = config
         self._state = state
         self._logger = logger
+        self._file_system = file_system
+        self._downloads = []
 
     def setup(self):
         """
@@ -58,13 +204,19 @@ class Restore:
         self._logger.get_logger().info("Migrate the state database tables")
         self._state.migrate()
 
-    def run(self, db_name: Optional[str], backup_id: Optional[str]) -> bool:
+    def run(
+        self,
+        db_name: Optional[str],
+        backup_id: Optional[str],
+        schemas: Optional[List[str]] = None,
+    ) -> bool:
         """
         Restore a database from a backup
 
         Args:
             db_name (str): The database name
             backup_id (str): The backup id
+            schemas (Optional[List[str]]): The schemas to restore or None for the whole backup
 
         Returns:
             bool: whether the restore succeeded or not
@@ -85,24 +237,373 @@ class Restore:
                 f"Unable to find a backup for db {db_name} or id {backup_id}"
             )
 
+        meta = backup.meta
+        files = []
+        self._downloads = []
+
+        if schemas and (
+            backup.get("parent") or meta.get("format") in ["stream", "repository"]
+        ):
+            raise Exception(
+                f"Backup with id {backup.get('id')} can't restore selected schemas"
+            )
+
+        db_config = self._config.get_database_config(backup.get("db")) or {}
+
+        if (
+            db_config.get("stream_restore", False)
+            and not backup.get("parent")
+            and not schemas
+        ):
+            try:
+                database = get_database(self._config, backup.get("db"))
+                streamed = self._restore_from_storage(database, backup, meta)
+            except BackupNotFound:
+                raise
+            except Exception as e:
+                self._record_failure(backup, e)
+
+            if streamed:
+                self._record_success(backup)
+                return True
+
+        try:
+            if backup.get("parent"):
+                # An increment is restored on top of the backups it depends on
+                for chain_backup in self._state.get_backup_chain(backup.get("id")):
+                    files.append(self._download(chain_backup)[0])
+            else:
+                local_file, codec = self._download(backup)
+                files.append(local_file)
+        except Exception:
+            self._delete_files(files)
+            raise
+
+        try:
+            database = get_database(self._config, backup.get("db"))
+
+            if backup.get("parent"):
+                database.restore_chain(files)
+            elif meta.get("format") in ["stream", "repository"]:
+                self._restore_stream(database, local_file, codec, meta.get("checksum"))
+            else:
+                database.restore(local_file, schemas)
+
+            self._record_success(backup)
+        except Exception as e:
+            self._record_failure(backup, e)
+        finally:
+            self._delete_files(files)
+
+        return True
+
+    def _record_success(self, backup: Dict[str, Any]):
+        """
+        Log and record a successful restore with the download stats of the
+        storages it used
+
+        Args:
+            backup (Dict[str, Any]): The backup data
+        """
+        self._logger.get_logger().info(
+            f"Backup with id {backup.get('id')} restored successfully"
+        )
+        self._state.record_event(
+            {
+                "db": backup.get("db"),
+                "type": "info",
+                "record": f"Backup with id {backup.get('id')} restored successfully",
+                "meta": json.dumps({"downloads": self._downloads}),
+            }
+        )
+
+    def _record_download(
+        self,
+        storage_name: str,
+        throughput: Optional[int],
+        first_byte: Optional[float],
+    ):
+        """
+        Keep the download stats of a storage until the restore finishes
+
+        Args:
+            storage_name (str): The storage name
+            throughput (Optional[int]): The download throughput in bytes per second, None if unknown
+            first_byte (Optional[float]): The seconds to the first byte, None if unknown
+        """
+        self._downloads.append(
+            {
+                "storage_name": storage_name,
+                "throughput": throughput,
+                "first_byte": None if first_byte is None else round(first_byte, 3),
+            }
+        )
+
+    def _record_failure(self, backup: Dict[str, Any], error: Exception):
+        """
+        Log and record a failed restore
+
+        Args:
+            backup (Dict[str, Any]): The backup data
+            error (Exception): The restore error
+
+        Raises:
+            OperationFailed: Always, with the restore error
+        """
+        self._logger.get_logger().error(
+            f"Failed to restore backup with id {backup.get('id')}"
+        )
+        self._state.record_event(
+            {
+                "db": backup.get("db"),
+                "type": "error",
+                "record": f"Failed to restore backup with id {backup.get('id')}",
+            }
+        )
+        raise OperationFailed(
+            "Failed to restore database {}: {}".format(backup.get("db"), str(error))
+        )
+
+    def _restore_from_storage(
+        self, database: Database, backup: Dict[str, Any], meta: Dict[str, Any]
+    ) -> bool:
+        """
+        Restore a database while the backup is downloaded, decompressed and
+        verified, without staging it in the temp directory
+
+        Args:
+            database (Database): The database instance
+            backup (Dict[str, Any]): The backup data
+            meta (Dict[str, Any]): The backup meta data
+
+        Returns:
+            bool: False if the backup archive can't be restored as a stream
+        """
+        for backup_file in self._rank_backup_files(backup, meta):
+            try:
+                self._logger.get_logger().info(
+                    f"Stream file {backup_file.get('file')} from storage {backup_file.get('storage_name')}"
+                )
+                start = time.monotonic()
+
+                if meta.get("format") == "repository":
+                    reader = self._open_repository(backup, backup_file)
+                else:
+                    storage = get_storage(self._config, backup_file.get("storage_name"))
+                    reader = storage.download_stream(backup_file.get("file"))
+            except Exception as e:
+                self._logger.get_logger().error(
+                    "Unable to stream backup {} file {} from storage {}: {}".format(
+                        backup.get("id"),
+                        backup_file.get("file"),
+                        backup_file.get("storage_name"),
+                        str(e),
+                    )
+                )
+                continue
+
+            # The restore already reached the database, so a failure from
+            # here on can't be retried from another storage
+            timed = TimingReader(reader, start)
+
+            try:
+                if meta.get("format") == "repository":
+                    codec = get_codec("none")
+                else:
+                    codec = get_codec(
+                        backup_file.get("codec", "gzip"),
+                        workers=self._config.get_compression_config(
+                            backup.get("db")
+                        ).get("workers", 1),
+                    )
+
+                with codec.open_reader(timed) as decompressed:
+                    if meta.get("format") in ["stream", "repository"]:
+                        verifier = VerifyingReader(decompressed, meta.get("checksum"))
+                        database.load(verifier)
+                        verifier.verify()
+                    else:
+                        verifier = self._load_archive(database, decompressed)
+
+                        if verifier is None:
+                            self._logger.get_logger().info(
+                                f"Backup with id {backup.get('id')} can't be restored as a stream"
+                            )
+                            return False
+            finally:
+                reader.close()
+
+            stats = get_transfer_stats(verifier.get_size(), time.monotonic() - start)
+            self._logger.get_logger().info(
+                "Backup {} is restored from storage {}: {} bytes in {}s at {}".format(
+                    backup.get("id"),
+                    backup_file.get("storage_name"),
+                    stats["size"],
+                    stats["duration"],
+                    format_throughput(stats["throughput"]),
+                )
+            )
+            # The database sets the pace of a streamed restore, only the
+            # time to first byte measures the storage
+            self._record_download(
+                backup_file.get("storage_name"), None, timed.get_first_byte()
+            )
+
+            return True
+
+        self._logger.get_logger().error(f"Backup with id {backup.get('id')} not found!")
+        raise BackupNotFound(f"Backup with id {backup.get('id')} not found!")
+
+    def _load_archive(
+        self, database: Database, reader: BinaryIO
+    ) -> Optional[VerifyingReader]:
+        """
+        Load a database from a backup archive holding a single dump file and
+        its checksum. Archives with more files, like directory dumps, are
+        left alone before anything reaches the database.
+
+        Args:
+            database (Database): The database instance
+            reader (BinaryIO): The decompressed archive stream
+
+        Returns:
+            Optional[VerifyingReader]: The reader of the loaded dump or None if the archive can't be streamed
+        """
+        with tarfile.open(fileobj=reader, mode="r|") as tar:
+            member = tar.next()
+            checksum = None
+
+            if (
+                member is not None
+                and member.isfile()
+                and member.name.endswith(".checksum")
+            ):
+                checksum = tar.extractfile(member).read().decode().strip()
+                name = member.name[: -len(".checksum")]
+                member = tar.next()
+
+                if member is None or member.name != name:
+                    return None
+
+            if member is None or not member.isfile() or "/" in member.name:
+                return None
+
+            # Archives of older backups hold the checksum after the dump, it
+            # can only be verified once the database is loaded
+            verifier = VerifyingReader(tar.extractfile(member), checksum)
+            database.load(verifier)
+            verifier.verify()
+
+            if checksum is None:
+                name = f"{member.name}.checksum"
+                member = tar.next()
+
+                if (
+                    member is None
+                    or member.name != name
+                    or tar.extractfile(member).read().decode().strip()
+                    != verifier.hexdigest()
+                ):
+                    raise Exception(
+                        "Database checksum doesn't match, the database was loaded from a corrupted backup!"
+                    )
+
+        return verifier
+
+    def _open_repository(
+        self, backup: Dict[str, Any], backup_file: Dict[str, Any]
+    ) -> BinaryIO:
+        """
+        Open a reader of a backup dump reassembled from a storage repository
+
+        Args:
+            backup (Dict[str, Any]): The backup data
+            backup_file (Dict[str, Any]): The backup file data
+
+        Returns:
+            BinaryIO: The dump reader, closing it stops the reassembly
+        """
+        repository = get_repository_from_config(
+            self._config, backup.get("db"), backup_file.get("storage_name")
+        )
+        writer = FanoutWriter(1)
+        reader = writer.get_readers()[0]
+
+        def produce():
+            try:
+                repository.read(backup.get("id"), writer)
+                writer.close()
+            except BaseException as e:
+                writer.fail(e)
+
+        threading.Thread(target=produce, daemon=True).start()
+
+        return reader
+
+    def _download(self, backup: Dict[str, Any]) -> Tuple[str, Codec]:
+        """
+        Download a backup from the first storage that has it
+
+        Args:
+            backup (Dict[str, Any]): The backup data
+
+        Returns:
+            Tuple[str, Codec]: The local backup path and its codec
+        """
         backup_exists = True
-        meta = json.loads(backup.get("meta"))
+        meta = backup.meta
+        backup_files = self._rank_backup_files(backup, meta)
+        restore_config = self._config.get_restore_config()
+
+        if (
+            restore_config.get("hedge")
+            and meta.get("format") != "repository"
+            and len(backup_files) > 1
+        ):
+            return self._download_hedged(backup, backup_files, restore_config)
 
         file = None
-        for backup_file in meta["backups"]:
+        codec = None
+        for backup_file in backup_files:
             try:
                 self._logger.get_logger().info(
                     f"Download file {backup_file.get('file')} from storage {backup_file.get('storage_name')}"
                 )
-                storage = get_storage(self._config, backup_file.get("storage_name"))
-                local_file = "{}/{}.tar.gz".format(
-                    self._config.get_temp_dir(), backup.get("id")
+                start = time.monotonic()
+
+                if meta.get("format") == "repository":
+                    file_name = f"{backup.get('id')}.dump"
+                    local_file = "{}/{}".format(self._config.get_temp_dir(), file_name)
+                    self._read_repository(backup, backup_file, local_file)
+                    codec = get_codec("none")
+                else:
+                    storage = get_storage(self._config, backup_file.get("storage_name"))
+                    file_name = backup_file.get("file")
+                    local_file = "{}/{}".format(self._config.get_temp_dir(), file_name)
+                    storage.download_file(file_name, local_file)
+                    codec = get_codec(
+                        backup_file.get("codec", "gzip"),
+                        workers=self._config.get_compression_config(
+                            backup.get("db")
+                        ).get("workers", 1),
+                    )
+
+                stats = get_transfer_stats(
+                    os.path.getsize(local_file), time.monotonic() - start
                 )
-                storage.download_file(backup_file.get("file"), local_file)
-                file = backup_file.get("file")
+                file = file_name
                 backup_exists = True
+                self._record_download(
+                    backup_file.get("storage_name"), stats["throughput"], None
+                )
                 self._logger.get_logger().info(
-                    f"File {backup_file.get('file')} is downloaded from storage {backup_file.get('storage_name')}"
+                    "File {} is downloaded from storage {}: {} bytes in {}s at {}".format(
+                        backup_file.get("file"),
+                        backup_file.get("storage_name"),
+                        stats["size"],
+                        stats["duration"],
+                        format_throughput(stats["throughput"]),
+                    )
                 )
             except Exception as e:
                 backup_exists = False
@@ -118,40 +619,288 @@ class Restore:
                 break
 
         if file is None:
-            self._logger.get_logger().error(f"Backup with id {id} not found!")
-            raise BackupNotFound(f"Backup with id {id} not found!")
-
-        try:
-            database = get_database(self._config, backup.get("db"))
-            database.restore("{}/{}".format(self._config.get_temp_dir(), file))
-            self._logger.get_logger().info(
-                f"Backup with id {backup.get('id')} restored successfully"
+            self._logger.get_logger().error(
+                f"Backup with id {backup.get('id')} not found!"
             )
-            self._state.insert_event(
-                {
-                    "db": backup.get("db"),
-                    "type": "info",
-                    "record": f"Backup with id {backup.get('id')} restored successfully",
-                }
+            raise BackupNotFound(f"Backup with id {backup.get('id')} not found!")
+
+        return local_file, codec
+
+    def _rank_backup_files(
+        self, backup: Dict[str, Any], meta: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank the stored copies of a backup, local storages go first then
+        the storages expected to deliver the backup the soonest, from the
+        download throughput and time to first byte of the recent restores
+        of the database. A storage never restored from is ranked on its
+        upload throughput in the recent backups instead. Storages without
+        measurements keep their order last.
+
+        Args:
+            backup (Dict[str, Any]): The backup data
+            meta (Dict[str, Any]): The backup meta data
+
+        Returns:
+            List[Dict[str, Any]]: The backup files, the best first
+        """
+        history = self._config.get_restore_config().get("history")
+        downloads = {}
+        uploads = {}
+
+        for event in self._state.get_recent_restores(backup.get("db"), history):
+            for download in event.meta.get("downloads", []):
+                for key in ["throughput", "first_byte"]:
+                    if download.get(key) is not None:
+                        downloads.setdefault(
+                            download.get("storage_name"), {}
+                        ).setdefault(key, []).append(download.get(key))
+
+        for recent in self._state.get_recent_backups(backup.get("db"), history):
+            for backup_file in recent.meta.get("backups", []):
+                if backup_file.get("throughput"):
+                    uploads.setdefault(backup_file.get("storage_name"), []).append(
+                        backup_file.get("throughput")
+                    )
+
+        def average(measures: List[float]) -> Optional[float]:
+            return sum(measures) / len(measures) if measures else None
+
+        def rank(backup_file: Dict[str, Any]) -> Tuple[bool, float]:
+            storage_name = backup_file.get("storage_name")
+            storage = self._config.get_storage_config(storage_name) or {}
+            measures = downloads.get(storage_name, {})
+            throughput = average(measures.get("throughput", [])) or average(
+                uploads.get(storage_name, [])
             )
-        except Exception as e:
+            first_byte = average(measures.get("first_byte", []))
+
+            if throughput:
+                seconds = (first_byte or 0) + (
+                    backup_file.get("size") or 1
+                ) / throughput
+            elif first_byte is not None:
+                seconds = first_byte
+            else:
+                seconds = float("inf")
+
+            return (storage.get("type") != "local", seconds)
+
+        return sorted(meta["backups"], key=rank)
+
+    def _download_hedged(
+        self,
+        backup: Dict[str, Any],
+        backup_files: List[Dict[str, Any]],
+        restore_config: Dict[str, Any],
+    ) -> Tuple[str, Codec]:
+        """
+        Download a backup from the best storage, a second download starts
+        from the next storage if the first one is slower than the hedge
+        throughput. The first download to finish wins and the other one
+        is cancelled.
+
+        Args:
+            backup (Dict[str, Any]): The backup data
+            backup_files (List[Dict[str, Any]]): The ranked backup files
+            restore_config (Dict[str, Any]): The restore configuration
+
+        Returns:
+            Tuple[str, Codec]: The local backup path and its codec
+        """
+        done = threading.Event()
+        pending = list(backup_files)
+        active = []
+        winner = None
+
+        def start_next() -> bool:
+            while pending:
+                backup_file = pending.pop(0)
+
+                try:
+                    storage = get_storage(self._config, backup_file.get("storage_name"))
+                except Exception as e:
+                    self._logger.get_logger().error(
+                        "Unable to open storage {}: {}".format(
+                            backup_file.get("storage_name"), str(e)
+                        )
+                    )
+                    continue
+
+                self._logger.get_logger().info(
+                    f"Download file {backup_file.get('file')} from storage {backup_file.get('storage_name')}"
+                )
+                local_file = "{}/{}.{}".format(
+                    self._config.get_temp_dir(),
+                    backup_file.get("file"),
+                    backup_file.get("storage_name"),
+                )
+                active.append(
+                    (
+                        backup_file,
+                        ReplicaDownload(
+                            storage, backup_file.get("file"), local_file, done
+                        ).start(),
+                    )
+                )
+                return True
+
+            return False
+
+        start_next()
+
+        try:
+            while active:
+                done.wait(0.5)
+                done.clear()
+
+                for backup_file, download in list(active):
+                    if download.finished:
+                        winner = (backup_file, download)
+                        active.remove(winner)
+                        break
+
+                    if download.error is not None:
+                        self._logger.get_logger().error(
+                            "Unable to restore backup {} file {} in storage {}: {}".format(
+                                backup.get("id"),
+                                backup_file.get("file"),
+                                backup_file.get("storage_name"),
+                                str(download.error),
+                            )
+                        )
+                        active.remove((backup_file, download))
+                        download.cancel()
+
+                if winner:
+                    break
+
+                if not active:
+                    start_next()
+                elif len(active) == 1 and pending:
+                    backup_file, download = active[0]
+
+                    if download.get_elapsed() >= restore_config.get(
+                        "hedge_delay"
+                    ) and download.get_throughput() < restore_config.get(
+                        "hedge_throughput"
+                    ):
+                        self._logger.get_logger().info(
+                            "Storage {} is downloading at {}, try the next storage too".format(
+                                backup_file.get("storage_name"),
+                                format_throughput(download.get_throughput()),
+                            )
+                        )
+                        start_next()
+        finally:
+            for _, download in active:
+                download.cancel()
+
+        if winner is None:
             self._logger.get_logger().error(
-                f"Failed to restore backup with id {backup.get('id')}"
+                f"Backup with id {backup.get('id')} not found!"
             )
-            self._state.insert_event(
-                {
-                    "db": backup.get("db"),
-                    "type": "error",
-                    "record": f"Failed to restore backup with id {backup.get('id')}",
-                }
-            )
-            raise OperationFailed(
-                "Failed to restore database {}: {}".format(backup.get("db"), str(e))
+            raise BackupNotFound(f"Backup with id {backup.get('id')} not found!")
+
+        backup_file, download = winner
+        local_file = "{}/{}".format(
+            self._config.get_temp_dir(), backup_file.get("file")
+        )
+        os.replace(download.get_local_file(), local_file)
+
+        stats = get_transfer_stats(os.path.getsize(local_file), download.get_elapsed())
+        self._record_download(
+            backup_file.get("storage_name"),
+            stats["throughput"],
+            download.get_first_byte(),
+        )
+        self._logger.get_logger().info(
+            "File {} is downloaded from storage {}: {} bytes in {}s at {}".format(
+                backup_file.get("file"),
+                backup_file.get("storage_name"),
+                stats["size"],
+                stats["duration"],
+                format_throughput(stats["throughput"]),
             )
-        return True
+        )
+
+        codec = get_codec(
+            backup_file.get("codec", "gzip"),
+            workers=self._config.get_compression_config(backup.get("db")).get(
+                "workers", 1
+            ),
+        )
+
+        return local_file, codec
+
+    def _delete_files(self, files: List[str]):
+        """
+        Delete the local backup files left behind by a restore
+
+        Args:
+            files (List[str]): The local backup paths
+        """
+        for local_file in files:
+            if os.path.exists(local_file):
+                self._file_system.delete_file(local_file)
+
+    def _read_repository(
+        self, backup: Dict[str, Any], backup_file: Dict[str, Any], local_file: str
+    ):
+        """
+        Reassemble a backup dump from the chunks of a storage repository
+
+        Args:
+            backup (Dict[str, Any]): The backup data
+            backup_file (Dict[str, Any]): The backup file data
+            local_file (str): The path to write the dump into
+        """
+        repository = get_repository_from_config(
+            self._config, backup.get("db"), backup_file.get("storage_name")
+        )
+
+        try:
+            with open(local_file, "wb") as writer:
+                repository.read(backup.get("id"), writer)
+        except Exception:
+            if os.path.exists(local_file):
+                self._file_system.delete_file(local_file)
+            raise
+
+    def _restore_stream(
+        self,
+        database: Database,
+        local_file: str,
+        codec: Codec,
+        checksum: Optional[str],
+    ):
+        """
+        Restore a database from a streamed backup
+
+        Args:
+            database (Database): The database instance
+            local_file (str): The path to the downloaded backup
+            codec (Codec): The codec of the downloaded backup
+            checksum (Optional[str]): The checksum of the database dump
+        """
+        dump_file = f"{local_file}.restore"
+
+        try:
+            if checksum != self._file_system.extract_file(local_file, dump_file, codec):
+                raise Exception("Database checksum doesn't match!")
+
+            with open(dump_file, "rb") as reader:
+                database.load(reader)
+        finally:
+            self._file_system.delete_file(local_file)
+
+            if os.path.exists(dump_file):
+                self._file_system.delete_file(dump_file)
 
 
-def get_restore(config: Config, state: State, logger: Logger) -> Restore:
+def get_restore(
+    config: Config, state: State, logger: Logger, file_system: FileSystem
+) -> Restore:
     """
     Get Restore Class Instance
 
@@ -159,8 +908,9 @@ def get_restore(config: Config, state: State, logger: Logger) -> Restore:
         config (Config): A config instance
         state (State): A state instance
         logger (Logger): A logger instance
+        file_system (FileSystem): The file system instance
 
     Returns:
         Restore: An instance of restore class
     """
-    return Restore(config, state, logger)
+    return Restore(config, state, logger, file_system)
@@ -24,8 +24,15 @@ from .logger import Logger, get_logger
 from .database import Database
 from .dbs import get_database
 from .file_system import FileSystem, get_file_system
+from .stream import FanoutWriter, HashingWriter, TeeWriter, VerifyingReader
+from .stream import TimingReader
+from .stream import get_transfer_stats, format_throughput
+from .codec import Codec, get_codec, get_codec_from_config
 from .config import Config, get_config
 from .schedule import Schedule, get_schedule
 from .storage import Storage, get_storage
+from .repository import Repository, get_repository_from_config
+from .recorder import EventRecorder, get_event_recorder
+from .record import BackupRecord, EventRecord
 from .state import State, get_state
 from .output import Output, get_output
@@ -0,0 +1,784 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import io
+import gzip
+import lzma
+import zlib
+import struct
+from collections import deque
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover
+    lz4_frame = None
+
+
+# The default size of the blocks compressed in parallel
+BLOCK_SIZE = 4 * 1024 * 1024
+
+# The magic number of the skippable frame that carries a zstd or lz4 block size
+SKIPPABLE_FRAME_MAGIC = 0x184D2A5E
+
+
+class Codec(ABC):
+    """
+    Compression Codec Class
+
+    Codecs that can split the data into independent blocks derive from
+    BlockCodec and use their workers to compress in parallel, the other
+    codecs always stream on a single thread.
+    """
+
+    def __init__(
+        self,
+        level: Optional[int] = None,
+        workers: int = 1,
+        block_size: int = BLOCK_SIZE,
+    ):
+        """
+        Class Constructor
+
+        Args:
+            level (Optional[int]): The compression level or None for the codec default
+            workers (int): The number of threads used to compress and decompress blocks
+            block_size (int): The size of the blocks compressed in parallel
+        """
+        self._level = level
+        self._workers = workers
+        self._block_size = block_size
+
+    @abstractmethod
+    def get_name(self) -> str:
+        """
+        Get the codec name
+
+        Returns:
+            The codec name
+        """
+        pass
+
+    @abstractmethod
+    def get_extension(self) -> str:
+        """
+        Get the file extension of the compressed data
+
+        Returns:
+            The file extension
+        """
+        pass
+
+    def open_writer(self, fileobj: BinaryIO) -> BinaryIO:
+        """
+        Open a compressing writer on top of a file object. Closing the
+        writer finishes the compressed data but keeps the file object open.
+
+        Args:
+            fileobj (BinaryIO): The file object to write the compressed data into
+
+        Returns:
+            The compressing writer
+        """
+        if self._workers > 1 and isinstance(self, BlockCodec):
+            return ParallelWriter(self, fileobj, self._workers, self._block_size)
+
+        return self._open_stream_writer(fileobj)
+
+    def open_reader(self, fileobj: BinaryIO) -> BinaryIO:
+        """
+        Open a decompressing reader on top of a file object
+
+        Args:
+            fileobj (BinaryIO): The file object to read the compressed data from
+
+        Returns:
+            The decompressing reader
+        """
+        if self._workers > 1 and isinstance(self, LocatableBlockCodec):
+            return ParallelReader(self, fileobj, self._workers)
+
+        return self._open_stream_reader(fileobj)
+
+    @abstractmethod
+    def _open_stream_writer(self, fileobj: BinaryIO) -> BinaryIO:
+        """
+        Open a single threaded compressing writer
+
+        Args:
+            fileobj (BinaryIO): The file object to write the compressed data into
+
+        Returns:
+            The compressing writer
+        """
+        pass
+
+    @abstractmethod
+    def _open_stream_reader(self, fileobj: BinaryIO) -> BinaryIO:
+        """
+        Open a single threaded decompressing reader
+
+        Args:
+            fileobj (BinaryIO): The file object to read the compressed data from
+
+        Returns:
+            The decompressing reader
+        """
+        pass
+
+    def get_level(self) -> Optional[int]:
+        """
+        Get the compression level
+
+        Returns:
+            The compression level or None for the codec default
+        """
+        return self._level
+
+    def get_workers(self) -> int:
+        """
+        Get the number of compression threads
+
+        Returns:
+            The number of compression threads
+        """
+        return self._workers
+
+
+class BlockCodec(Codec):
+    """
+    Base class of the codecs that compress independent blocks
+
+    With more than one worker, the data is split into blocks that are
+    compressed in parallel and written one after the other as a
+    multi-member (gzip, xz) or multi-frame (zstd, lz4) stream.
+    """
+
+    @abstractmethod
+    def compress_block(self, data: bytes) -> bytes:
+        """
+        Compress a block into a self-contained member or frame
+
+        Args:
+            data (bytes): The block data
+
+        Returns:
+            The compressed block
+        """
+        pass
+
+
+class LocatableBlockCodec(BlockCodec):
+    """
+    Base class of the block codecs whose blocks record their compressed
+    size in a way standard tools ignore, so the blocks can also be located
+    and decompressed in parallel
+    """
+
+    @abstractmethod
+    def get_block_header_size(self) -> int:
+        """
+        Get the size of the header that holds a compressed block size
+
+        Returns:
+            The header size
+        """
+        pass
+
+    @abstractmethod
+    def get_block_remaining_size(self, header: bytes) -> Optional[int]:
+        """
+        Get the size of the rest of a compressed block from its header
+
+        Args:
+            header (bytes): The block header
+
+        Returns:
+            The size of the rest of the block or None if it is not a block header
+        """
+        pass
+
+    @abstractmethod
+    def decompress_block(self, block: bytes) -> bytes:
+        """
+        Decompress a block including its header
+
+        Args:
+            block (bytes): The compressed block
+
+        Returns:
+            The block data
+        """
+        pass
+
+
+class GzipCodec(LocatableBlockCodec):
+    """
+    Gzip Codec Class
+
+    Parallel blocks are gzip members carrying their size in a "GL" extra
+    subfield, the same way BGZF does.
+    """
+
+    HEADER_SIZE = 20
+
+    def get_name(self) -> str:
+        return "gzip"
+
+    def get_extension(self) -> str:
+        return ".gz"
+
+    def _open_stream_writer(self, fileobj: BinaryIO) -> BinaryIO:
+        return gzip.GzipFile(
+            fileobj=fileobj,
+            mode="wb",
+            compresslevel=6 if self._level is None else self._level,
+        )
+
+    def _open_stream_reader(self, fileobj: BinaryIO) -> BinaryIO:
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+
+    def compress_block(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(
+            6 if self._level is None else self._level, zlib.DEFLATED, -15
+        )
+        body = compressor.compress(data) + compressor.flush()
+        size = self.HEADER_SIZE + len(body) + 8
+        header = (
+            b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff"
+            + struct.pack("<H", 8)
+            + b"GL"
+            + struct.pack("<HI", 4, size)
+        )
+        trailer = struct.pack("<II", zlib.crc32(data), len(data) & 0xFFFFFFFF)
+        return header + body + trailer
+
+    def get_block_header_size(self) -> int:
+        return self.HEADER_SIZE
+
+    def get_block_remaining_size(self, header: bytes) -> Optional[int]:
+        if len(header) != self.HEADER_SIZE or header[:4] != b"\x1f\x8b\x08\x04":
+            return None
+
+        if header[10:16] != struct.pack("<H", 8) + b"GL" + struct.pack("<H", 4):
+            return None
+
+        return struct.unpack("<I", header[16:20])[0] - self.HEADER_SIZE
+
+    def decompress_block(self, block: bytes) -> bytes:
+        return zlib.decompress(block, 31)
+
+
+class XzCodec(BlockCodec):
+    """
+    Xz Codec Class
+
+    Parallel blocks are concatenated xz streams. They are compressed in
+    parallel but xz streams can't be located without reading them, so
+    they are decompressed sequentially.
+    """
+
+    def get_name(self) -> str:
+        return "xz"
+
+    def get_extension(self) -> str:
+        return ".xz"
+
+    def _open_stream_writer(self, fileobj: BinaryIO) -> BinaryIO:
+        return lzma.LZMAFile(fileobj, mode="wb", preset=self._level)
+
+    def _open_stream_reader(self, fileobj: BinaryIO) -> BinaryIO:
+        return lzma.LZMAFile(fileobj, mode="rb")
+
+    def compress_block(self, data: bytes) -> bytes:
+        return lzma.compress(data, preset=self._level)
+
+
+class _FramedCodec(LocatableBlockCodec):
+    """
+    Base class of the codecs whose parallel blocks are frames preceded by
+    a skippable frame that holds the frame size
+    """
+
+    HEADER_SIZE = 12
+
+    def compress_block(self, data: bytes) -> bytes:
+        frame = self._compress_frame(data)
+        return struct.pack("<III", SKIPPABLE_FRAME_MAGIC, 4, len(frame)) + frame
+
+    def get_block_header_size(self) -> int:
+        return self.HEADER_SIZE
+
+    def get_block_remaining_size(self, header: bytes) -> Optional[int]:
+        if len(header) != self.HEADER_SIZE:
+            return None
+
+        magic, length, size = struct.unpack("<III", header)
+
+        if magic != SKIPPABLE_FRAME_MAGIC or length != 4:
+            return None
+
+        return size
+
+    def decompress_block(self, block: bytes) -> bytes:
+        return self._decompress_frame(block[self.HEADER_SIZE :])
+
+    @abstractmethod
+    def _compress_frame(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def _decompress_frame(self, frame: bytes) -> bytes:
+        pass
+
+
+class ZstdCodec(_FramedCodec):
+    """
+    Zstandard Codec Class
+    """
+
+    def __init__(self, *args, **kwargs):
+        if zstandard is None:
+            raise Exception(
+                "The zstd codec requires the zstandard package, install gulper[zstd]"
+            )
+        super().__init__(*args, **kwargs)
+
+    def get_name(self) -> str:
+        return "zstd"
+
+    def get_extension(self) -> str:
+        return ".zst"
+
+    def _open_stream_writer(self, fileobj: BinaryIO) -> BinaryIO:
+        compressor = zstandard.ZstdCompressor(
+            level=3 if self._level is None else self._level
+        )
+        return compressor.stream_writer(fileobj, closefd=False)
+
+    def _open_stream_reader(self, fileobj: BinaryIO) -> BinaryIO:
+        return zstandard.ZstdDecompressor().stream_reader(
+            fileobj, read_across_frames=True, closefd=False
+        )
+
+    def _compress_frame(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(
+            level=3 if self._level is None else self._level
+        ).compress(data)
+
+    def _decompress_frame(self, frame: bytes) -> bytes:
+        return zstandard.ZstdDecompressor().decompress(frame)
+
+
+class Lz4Codec(_FramedCodec):
+    """
+    LZ4 Codec Class
+    """
+
+    def __init__(self, *args, **kwargs):
+        if lz4_frame is None:
+            raise Exception(
+                "The lz4 codec requires the lz4 package, install gulper[lz4]"
+            )
+        super().__init__(*args, **kwargs)
+
+    def get_name(self) -> str:
+        return "lz4"
+
+    def get_extension(self) -> str:
+        return ".lz4"
+
+    def _open_stream_writer(self, fileobj: BinaryIO) -> BinaryIO:
+        return lz4_frame.LZ4FrameFile(
+            fileobj,
+            mode="wb",
+            compression_level=0 if self._level is None else self._level,
+        )
+
+    def _open_stream_reader(self, fileobj: BinaryIO) -> BinaryIO:
+        return lz4_frame.LZ4FrameFile(fileobj, mode="rb")
+
+    def _compress_frame(self, data: bytes) -> bytes:
+        return lz4_frame.compress(
+            data,
+            compression_level=0 if self._level is None else self._level,
+            store_size=True,
+        )
+
+    def _decompress_frame(self, frame: bytes) -> bytes:
+        return lz4_frame.decompress(frame)
+
+
+class NoneCodec(Codec):
+    """
+    A Codec That Stores The Data Uncompressed
+    """
+
+    def get_name(self) -> str:
+        return "none"
+
+    def get_extension(self) -> str:
+        return ""
+
+    def _open_stream_writer(self, fileobj: BinaryIO) -> BinaryIO:
+        return _Passthrough(fileobj)
+
+    def _open_stream_reader(self, fileobj: BinaryIO) -> BinaryIO:
+        return _Passthrough(fileobj)
+
+
+class ParallelWriter(io.RawIOBase):
+    """
+    A writer that compresses blocks on a thread pool and writes them in order
+    """
+
+    def __init__(
+        self, codec: BlockCodec, fileobj: BinaryIO, workers: int, block_size: int
+    ):
+        """
+        Class Constructor
+
+        Args:
+            codec (BlockCodec): The codec to compress the blocks with
+            fileobj (BinaryIO): The file object to write the compressed blocks into
+            workers (int): The number of compression threads
+            block_size (int): The block size
+
+        Raises:
+            Exception: If the codec can't compress blocks
+        """
+        if not isinstance(codec, BlockCodec):
+            raise Exception(f"The {codec.get_name()} codec can't compress blocks")
+
+        self._codec = codec
+        self._fileobj = fileobj
+        self._workers = workers
+        self._block_size = block_size
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+
+        while len(self._buffer) >= self._block_size:
+            self._submit(bytes(self._buffer[: self._block_size]))
+            del self._buffer[: self._block_size]
+
+        return len(data)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer = bytearray()
+
+            while self._pending:
+                self._fileobj.write(self._pending.popleft().result())
+        finally:
+            self._executor.shutdown()
+            super().close()
+
+    def _submit(self, block: bytes) -> None:
+        """
+        Queue a block for compression, keeping at most two blocks per
+        worker in memory
+
+        Args:
+            block (bytes): The block data
+        """
+        self._pending.append(self._executor.submit(self._codec.compress_block, block))
+
+        while len(self._pending) > self._workers * 2:
+            self._fileobj.write(self._pending.popleft().result())
+
+
+class ParallelReader(io.RawIOBase):
+    """
+    A reader that decompresses blocks on a thread pool and returns them in
+    order. Data that wasn't written in blocks is decompressed sequentially.
+    """
+
+    def __init__(self, codec: LocatableBlockCodec, fileobj: BinaryIO, workers: int):
+        """
+        Class Constructor
+
+        Args:
+            codec (LocatableBlockCodec): The codec to decompress the blocks with
+            fileobj (BinaryIO): The file object to read the compressed blocks from
+            workers (int): The number of decompression threads
+
+        Raises:
+            Exception: If the codec blocks can't be located
+        """
+        if not isinstance(codec, LocatableBlockCodec):
+            raise Exception(f"The {codec.get_name()} codec blocks can't be located")
+
+        self._codec = codec
+        self._fileobj = fileobj
+        self._workers = workers
+        self._pending = deque()
+        self._chunk = b""
+        self._offset = 0
+        self._started = False
+        self._exhausted = False
+        self._fallback = None
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._offset >= len(self._chunk):
+            self._fill()
+
+            if self._fallback is not None:
+                data = self._fallback.read(len(buffer))
+                buffer[: len(data)] = data
+                return len(data)
+
+            if not self._pending:
+                return 0
+
+            self._chunk = self._pending.popleft().result()
+            self._offset = 0
+
+        size = min(len(buffer), len(self._chunk) - self._offset)
+        buffer[:size] = self._chunk[self._offset : self._offset + size]
+        self._offset += size
+
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._executor.shutdown(cancel_futures=True)
+            if self._fallback is not None:
+                self._fallback.close()
+        super().close()
+
+    def _fill(self) -> None:
+        """
+        Queue blocks for decompression, keeping at most two blocks per
+        worker in memory
+        """
+        while not self._exhausted and len(self._pending) < self._workers * 2:
+            block = self._read_block()
+
+            if block is None:
+                self._exhausted = True
+                return
+
+            self._pending.append(
+                self._executor.submit(self._codec.decompress_block, block)
+            )
+
+    def _read_block(self) -> Optional[bytes]:
+        """
+        Read the next compressed block
+
+        Returns:
+            The compressed block or None at the end of the blocks
+        """
+        header = _read_exact(self._fileobj, self._codec.get_block_header_size())
+
+        if not header:
+            return None
+
+        remaining = self._codec.get_block_remaining_size(header)
+
+        if remaining is None:
+            if self._started:
+                raise IOError("Compressed block header is corrupted")
+
+            self._fallback = self._codec._open_stream_reader(
+                _PrefixedReader(header, self._fileobj)
+            )
+            return None
+
+        self._started = True
+        body = _read_exact(self._fileobj, remaining)
+
+        if len(body) != remaining:
+            raise IOError("Compressed block is truncated")
+
+        return header + body
+
+
+class _Passthrough(io.RawIOBase):
+    """
+    A file object wrapper that keeps the wrapped file object open on close
+    """
+
+    def __init__(self, fileobj: BinaryIO):
+        self._fileobj = fileobj
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self._fileobj.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self._fileobj.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def write(self, data) -> int:
+        return self._fileobj.write(data)
+
+
+class _PrefixedReader(_Passthrough):
+    """
+    A reader that returns some already consumed bytes before the rest of a file object
+    """
+
+    def __init__(self, prefix: bytes, fileobj: BinaryIO):
+        super().__init__(fileobj)
+        self._prefix = prefix
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._prefix:
+            return self._fileobj.read(size)
+
+        if size is None or size < 0:
+            data = self._prefix + self._fileobj.read()
+            self._prefix = b""
+            return data
+
+        data = self._prefix[:size]
+        self._prefix = self._prefix[size:]
+        return data
+
+
+def _read_exact(fileobj: BinaryIO, size: int) -> bytes:
+    """
+    Read exactly size bytes unless the end of the file is reached
+
+    Args:
+        fileobj (BinaryIO): The file object to read from
+        size (int): The number of bytes to read
+
+    Returns:
+        The bytes read
+    """
+    data = b""
+
+    while len(data) < size:
+        chunk = fileobj.read(size - len(data))
+
+        if not chunk:
+            break
+
+        data += chunk
+
+    return data
+
+
+CODECS = {
+    "gzip": GzipCodec,
+    "xz": XzCodec,
+    "zstd": ZstdCodec,
+    "lz4": Lz4Codec,
+    "none": NoneCodec,
+}
+
+
+def get_codec(
+    name: str = "gzip",
+    level: Optional[int] = None,
+    workers: int = 1,
+    block_size: int = BLOCK_SIZE,
+) -> Codec:
+    """
+    Get a codec instance by name
+
+    Args:
+        name (str): The codec name (gzip, xz, zstd, lz4 or none)
+        level (Optional[int]): The compression level or None for the codec default
+        workers (int): The number of threads used to compress and decompress blocks
+        block_size (int): The size of the blocks compressed in parallel
+
+    Returns:
+        Codec: The codec instance
+    """
+    if name not in CODECS:
+        raise Exception(f"Compression codec {name} is not supported!")
+
+    return CODECS[name](level, workers, block_size)
+
+
+def get_codec_from_config(compression: Dict[str, Any]) -> Codec:
+    """
+    Get a codec instance from a compression configuration
+
+    Args:
+        compression (Dict[str, Any]): The compression configuration
+
+    Returns:
+        Codec: The codec instance
+    """
+    return get_codec(
+        compression.get("codec", "gzip"),
+        compression.get("level"),
+        compression.get("workers", 1),
+        compression.get("block_size", BLOCK_SIZE),
+    )
+
+
+def get_codec_by_path(path: str, workers: int = 1) -> Codec:
+    """
+    Get the codec of a compressed file from its extension
+
+    Args:
+        path (str): The compressed file path
+        workers (int): The number of threads used to decompress blocks
+
+    Returns:
+        Codec: The codec instance
+    """
+    if path.endswith(".gz"):
+        return GzipCodec(None, workers)
+    elif path.endswith(".xz"):
+        return XzCodec(None, workers)
+    elif path.endswith(".zst"):
+        return ZstdCodec(None, workers)
+    elif path.endswith(".lz4"):
+        return Lz4Codec(None, workers)
+
+    return NoneCodec(None, workers)
@@ -20,6 +20,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import os
 import yaml
 from typing import Dict, Any, Optional
 
@@ -67,6 +68,47 @@ class Config:
         """
         return self.config.get("state_file", "/tmp/gulper.db")
 
+    def get_state_config(self) -> Dict[str, Any]:
+        """
+        Get the state database connection profile with its defaults, sizes
+        are converted into bytes
+
+        Returns:
+            Dict[str, Any]: the state connection profile
+
+        Raises:
+            ValueError: If the journal mode or synchronous level is unsupported.
+        """
+        state = self.config.get("state") or {}
+
+        profile = {
+            "journal_mode": str(state.get("journal_mode", "wal")).lower(),
+            "synchronous": str(state.get("synchronous", "normal")).lower(),
+            "busy_timeout": state.get("busy_timeout", 5000),
+            "mmap_size": self._parse_size(state.get("mmap_size", "256 MB")),
+            "cache_size": self._parse_size(state.get("cache_size", "16 MB")),
+            "event_batch_size": state.get("event_batch_size", 500),
+            "event_flush_interval": state.get("event_flush_interval", 1),
+        }
+
+        if profile["journal_mode"] not in [
+            "delete",
+            "truncate",
+            "persist",
+            "memory",
+            "wal",
+        ]:
+            raise ValueError(
+                f"Unsupported state journal mode: '{profile['journal_mode']}'."
+            )
+
+        if profile["synchronous"] not in ["off", "normal", "full", "extra"]:
+            raise ValueError(
+                f"Unsupported state synchronous level: '{profile['synchronous']}'."
+            )
+
+        return profile
+
     def get_logging_level(self) -> str:
         """
         Get logging level
@@ -105,6 +147,43 @@ class Config:
             self.config.get("event").get("retention", "1 month")
         )
 
+    def get_retention_interval_in_seconds(self) -> int:
+        """
+        Get the interval between two retention runs of the cron daemon
+
+        Returns:
+            int: the retention interval in seconds
+        """
+        return self.get_interval_in_seconds(
+            (self.config.get("cron") or {}).get("retention_interval", "10 minutes")
+        )
+
+    def get_upload_workers(self) -> int:
+        """
+        Get the number of storages a backup is uploaded to concurrently
+
+        Returns:
+            int: the number of upload workers
+        """
+        return self.get_concurrency_config()["uploads"]
+
+    def get_concurrency_config(self) -> Dict[str, int]:
+        """
+        Get the concurrency configuration with its defaults, a limit of 0
+        means unlimited
+
+        Returns:
+            Dict[str, int]: the concurrency configuration
+        """
+        concurrency = self.config.get("concurrency") or {}
+
+        return {
+            "uploads": concurrency.get("uploads", 4),
+            "backups": concurrency.get("backups", 1),
+            "per_host": concurrency.get("per_host", 0),
+            "per_storage": concurrency.get("per_storage", 0),
+        }
+
     def get_storages(self) -> Dict[str, Any]:
         """
         Get all storage configurations.
@@ -215,6 +294,26 @@ class Config:
 
         return value * seconds_per_unit[unit]
 
+    def get_interval_in_seconds(self, interval: str) -> int:
+        """
+        Parse a schedule interval string into seconds.
+
+        Args:
+            interval (str): Interval (e.g., "30 seconds", "15 minutes", "1 hour").
+
+        Returns:
+            int: Interval in seconds.
+
+        Raises:
+            ValueError: If the interval is not positive.
+        """
+        seconds = self._parse_retention(interval)
+
+        if seconds <= 0:
+            raise ValueError(f"Invalid schedule interval: '{interval}'.")
+
+        return seconds
+
     def get_retention_in_seconds(self, db_name: str) -> Optional[int]:
         """
         Get the retention period in seconds for a specific database.
@@ -232,6 +331,188 @@ class Config:
 
         return None
 
+    def get_compression_config(
+        self, db_name: str, storage_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the compression configuration of a database backup, a storage
+        compression configuration takes precedence over the database one.
+
+        Args:
+            db_name (str): name of the database.
+            storage_name (Optional[str]): name of the storage.
+
+        Returns:
+            Dict[str, Any]: The compression configuration.
+        """
+        compression = {}
+        db_config = self.get_database_config(db_name)
+
+        if db_config and "compression" in db_config:
+            compression = dict(db_config["compression"])
+
+        if storage_name:
+            storage_config = self.get_storage_config(storage_name)
+
+            if storage_config and "compression" in storage_config:
+                # The workers count belongs to the backup host, keep the database one
+                workers = compression.get("workers")
+                compression = dict(storage_config["compression"])
+
+                if workers and "workers" not in compression:
+                    compression["workers"] = workers
+
+        if "block_size" in compression:
+            compression["block_size"] = self._parse_size(compression["block_size"])
+
+        return compression
+
+    def get_repository_config(self, db_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the repository configuration of a database, sizes are converted
+        into bytes and the garbage collection grace period into seconds.
+
+        Args:
+            db_name (str): name of the database.
+
+        Returns:
+            Optional[Dict[str, Any]]: The repository configuration or None if
+            the database isn't backed up into a repository.
+        """
+        db_config = self.get_database_config(db_name) or {}
+        repository = db_config.get("repository")
+
+        if not repository:
+            return None
+
+        repository = dict(repository) if isinstance(repository, dict) else {}
+
+        for key in ["min_chunk_size", "avg_chunk_size", "max_chunk_size"]:
+            if key in repository:
+                repository[key] = self._parse_size(repository[key])
+
+        if "gc_grace" in repository:
+            repository["gc_grace"] = self._parse_retention(repository["gc_grace"])
+
+        return repository
+
+    def get_incremental_config(self, db_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the incremental backups configuration of a database.
+
+        Args:
+            db_name (str): name of the database.
+
+        Returns:
+            Optional[Dict[str, Any]]: The incremental configuration or None if
+            the database backups are always full.
+        """
+        db_config = self.get_database_config(db_name) or {}
+        incremental = db_config.get("incremental")
+
+        if not incremental:
+            return None
+
+        incremental = dict(incremental) if isinstance(incremental, dict) else {}
+        incremental.setdefault("full_every", 24)
+        incremental.setdefault(
+            "manifest", os.path.join(self.get_temp_dir(), f"{db_name}.pages")
+        )
+
+        return incremental
+
+    def get_restore_config(self) -> Dict[str, Any]:
+        """
+        Get the restore configuration with its defaults, the hedge
+        throughput is converted into bytes per second.
+
+        Returns:
+            Dict[str, Any]: The restore configuration.
+        """
+        restore = self.config.get("restore") or {}
+
+        return {
+            "hedge": restore.get("hedge", False),
+            "hedge_throughput": self._parse_size(
+                restore.get("hedge_throughput", "10 MB")
+            ),
+            "hedge_delay": restore.get("hedge_delay", 5),
+            "history": restore.get("history", 20),
+        }
+
+    def get_transfer_config(self, storage_name: str) -> Dict[str, Any]:
+        """
+        Get the transfer configuration of a storage, sizes are converted
+        into bytes.
+
+        Args:
+            storage_name (str): name of the storage.
+
+        Returns:
+            Dict[str, Any]: The transfer configuration.
+        """
+        storage_config = self.get_storage_config(storage_name) or {}
+        transfer = dict(storage_config.get("transfer") or {})
+
+        for key in [
+            "multipart_threshold",
+            "multipart_chunksize",
+            "max_bandwidth",
+            "range_size",
+        ]:
+            if key in transfer:
+                transfer[key] = self._parse_size(transfer[key])
+
+        return transfer
+
+    def _parse_size(self, size: Any) -> int:
+        """
+        Parse size string into bytes.
+
+        Args:
+            size (Any): Size in bytes or a size string (e.g., "512 KB", "4 MB", "1 GB").
+
+        Returns:
+            int: Size in bytes.
+
+        Raises:
+            ValueError: If the unit is unsupported.
+        """
+        if isinstance(size, int):
+            return size
+
+        parts = str(size).split()
+
+        if len(parts) == 1:
+            try:
+                return int(parts[0])
+            except ValueError:
+                raise ValueError(f"Invalid size: '{size}'.")
+
+        if len(parts) != 2:
+            raise ValueError(
+                "Invalid size format. Expected format is '<value> <unit>'."
+            )
+
+        try:
+            value = int(parts[0])
+        except ValueError:
+            raise ValueError("Invalid value for size. Must be an integer.")
+
+        unit = parts[1].upper()
+
+        bytes_per_unit = {
+            "B": 1,
+            "KB": 1024,
+            "MB": 1024**2,
+            "GB": 1024**3,
+        }
+
+        if unit not in bytes_per_unit:
+            raise ValueError(f"Unsupported unit for size: '{unit}'.")
+
+        return value * bytes_per_unit[unit]
+
 
 def get_config(config_file: str) -> Config:
     """
@@ -20,6 +20,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from typing import BinaryIO, List, Optional, Tuple
 from abc import ABC, abstractmethod
 
 
@@ -37,18 +38,69 @@ class Database(ABC):
         pass
 
     @abstractmethod
-    def restore(self, backup_path: str) -> bool:
+    def restore(self, backup_path: str, schemas: Optional[List[str]] = None) -> bool:
         """
         Restore the database from a backup
 
         Args:
-            backup_path (str): The path to .tar.gz backup
+            backup_path (str): The path to the backup archive
+            schemas (Optional[List[str]]): The schemas to restore or None for the whole backup
 
         Returns:
             Whether the restore succeeded or not
         """
         pass
 
+    def backup_incremental(
+        self, manifest_path: str, parent: Optional[str]
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Backup only what changed since a parent backup
+
+        Args:
+            manifest_path (str): The path to the database manifest
+            parent (Optional[str]): The parent backup id, None for a full backup
+
+        Returns:
+            The path to the backup and the parent backup id it depends on
+        """
+        raise Exception("Incremental backups are not supported by this database")
+
+    def restore_chain(self, backup_paths: List[str]) -> bool:
+        """
+        Restore the database from a full backup followed by its increments
+
+        Args:
+            backup_paths (List[str]): The backup archives, the full backup first
+
+        Returns:
+            Whether the restore succeeded or not
+        """
+        raise Exception("Incremental backups are not supported by this database")
+
+    @abstractmethod
+    def dump(self, writer: BinaryIO) -> None:
+        """
+        Stream the database dump into a writer
+
+        Args:
+            writer (BinaryIO): The writer to stream the dump into
+        """
+        pass
+
+    @abstractmethod
+    def load(self, reader: BinaryIO) -> bool:
+        """
+        Load the database from a dump stream
+
+        Args:
+            reader (BinaryIO): The reader to load the dump from
+
+        Returns:
+            Whether the load succeeded or not
+        """
+        pass
+
     @abstractmethod
     def connect(self) -> bool:
         """
@@ -26,6 +26,7 @@ from .postgresql import get_postgresql
 from .mysql import get_mysql
 from .config import Config
 from .file_system import get_file_system
+from .codec import get_codec_from_config
 
 
 def get_database(config: Config, db_name: str) -> Database:
@@ -34,9 +35,15 @@ def get_database(config: Config, db_name: str) -> Database:
     if db_config is None:
         raise Exception(f"Database {db_name} not found")
 
+    codec = get_codec_from_config(config.get_compression_config(db_name))
+
     if db_config.get("type") == "sqlite":
         return get_sqlite(
-            get_file_system(), config.get_temp_dir(), db_config.get("path")
+            get_file_system(),
+            config.get_temp_dir(),
+            db_config.get("path"),
+            codec,
+            db_config.get("snapshot", {}),
         )
     elif db_config.get("type") == "mysql":
         return get_mysql(
@@ -48,6 +55,10 @@ def get_database(config: Config, db_name: str) -> Database:
             db_config.get("database", []),
             config.get_temp_dir(),
             db_config.get("options", {}),
+            codec,
+            db_config.get("engine", "mysqldump"),
+            db_config.get("jobs", 1),
+            db_config.get("chunk_rows", 100000),
         )
     elif db_config.get("type") == "postgresql":
         return get_postgresql(
@@ -58,4 +69,7 @@ def get_database(config: Config, db_name: str) -> Database:
             db_config.get("port", 5432),
             db_config.get("database", None),
             config.get_temp_dir(),
+            codec,
+            db_config.get("format", "plain"),
+            db_config.get("jobs", 1),
         )
@@ -24,42 +24,130 @@ import os
 import shutil
 import tarfile
 import hashlib
-from typing import Any, Dict
-from datetime import datetime
+from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from .stream import CHUNK_SIZE, HashingReader, HashingWriter, copy_stream
+from .codec import Codec, get_codec_by_path
 
 
 class FileSystem:
     """FileSystem Utils Class"""
 
-    def compress_as_tar_gz(self, input_file: str, checksum_file: str, output_file: str):
+    def compress_archive(
+        self,
+        input_file: str,
+        checksum_file: str,
+        output_file: str,
+        codec: Optional[Codec] = None,
+    ):
         """
-        Compresses a file into a tar.gz archive.
+        Compresses a file or a directory into a tar archive.
 
         Args:
-            input_file (str): The path to the file to be compressed.
+            input_file (str): The path to the file or directory to be compressed.
             checksum_file (str): The path to input file checksum file
-            output_file (str): The path where the compressed tar.gz file will be saved.
+            output_file (str): The path where the compressed archive will be saved.
+            codec (Optional[Codec]): The compression codec, detected from the output file extension if None.
 
         Returns:
             None
         """
-        with tarfile.open(output_file, "w:gz") as tar:
-            tar.add(input_file, arcname=os.path.basename(input_file))
-            tar.add(checksum_file, arcname=os.path.basename(checksum_file))
-
-    def extract_tar_gz(self, tar_file_path: str, extract_to: str):
+        codec = codec or get_codec_by_path(output_file)
+
+        with open(output_file, "wb") as f:
+            with codec.open_writer(f) as writer:
+                with tarfile.open(fileobj=writer, mode="w|") as tar:
+                    # The checksum goes first so a streamed restore can
+                    # verify the input before it reaches its end
+                    tar.add(checksum_file, arcname=os.path.basename(checksum_file))
+                    tar.add(input_file, arcname=os.path.basename(input_file))
+
+    def extract_archive(
+        self, archive_path: str, extract_to: str, codec: Optional[Codec] = None
+    ) -> Dict[str, str]:
         """
-        Extracts the contents of a tar.gz file to a specified directory.
+        Extracts the contents of a tar archive to a specified directory.
+
+        The SHA256 hash of each extracted file is calculated while it is
+        being written so the files don't need to be read again to be verified.
 
         Args:
-            tar_file_path (str): The path to the tar.gz file to be extracted.
+            archive_path (str): The path to the archive to be extracted.
             extract_to (str): The directory where the contents will be extracted.
+            codec (Optional[Codec]): The compression codec, detected from the archive extension if None.
+
+        Returns:
+            Dict[str, str]: The SHA256 hash of each extracted file by its archive name.
+        """
+        checksums = {}
+        extract_to = os.path.realpath(extract_to)
+        codec = codec or get_codec_by_path(archive_path)
+
+        with open(archive_path, "rb") as f, codec.open_reader(f) as reader:
+            with tarfile.open(fileobj=reader, mode="r|") as tar:
+                for member in tar:
+                    path = os.path.realpath(os.path.join(extract_to, member.name))
+
+                    if os.path.commonpath([extract_to, path]) != extract_to:
+                        raise IOError(
+                            f"Archive member {member.name} is outside {extract_to}"
+                        )
+
+                    if member.isdir():
+                        os.makedirs(path, exist_ok=True)
+                    elif member.isfile():
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        member_reader = HashingReader(tar.extractfile(member))
+
+                        with open(path, "wb") as writer:
+                            copy_stream(member_reader, writer)
+
+                        checksums[member.name] = member_reader.hexdigest()
+
+        return checksums
+
+    def extract_file(
+        self, input_file: str, output_file: str, codec: Optional[Codec] = None
+    ) -> str:
+        """
+        Decompresses a file and calculates the SHA256 hash of its content.
+
+        Args:
+            input_file (str): The path to the file to be decompressed.
+            output_file (str): The path where the decompressed content will be saved.
+            codec (Optional[Codec]): The compression codec, detected from the input file extension if None.
+
+        Returns:
+            str: The SHA256 hash of the decompressed content.
+        """
+        codec = codec or get_codec_by_path(input_file)
+
+        with open(input_file, "rb") as f, codec.open_reader(f) as reader:
+            with open(output_file, "wb") as out:
+                writer = HashingWriter(out)
+                copy_stream(reader, writer)
+
+        return writer.hexdigest()
+
+    def transcode_file(
+        self, input_file: str, output_file: str, from_codec: Codec, to_codec: Codec
+    ):
+        """
+        Recompresses a file with another codec.
+
+        Args:
+            input_file (str): The path to the compressed file.
+            output_file (str): The path where the recompressed file will be saved.
+            from_codec (Codec): The codec of the input file.
+            to_codec (Codec): The codec of the output file.
 
         Returns:
             None
         """
-        with tarfile.open(tar_file_path, "r:gz") as tar:
-            tar.extractall(extract_to)
+        with open(input_file, "rb") as f, from_codec.open_reader(f) as reader:
+            with open(output_file, "wb") as out, to_codec.open_writer(out) as writer:
+                copy_stream(reader, writer)
 
     def copy_file(self, from_path: str, to_path: str) -> bool:
         """
@@ -156,17 +244,21 @@ class FileSystem:
         with open(path, "r") as file:
             return file.read()
 
-    def write_checksum_to_file(self, file_path: str) -> str:
+    def write_checksum_to_file(
+        self, file_path: str, checksum: Optional[str] = None
+    ) -> str:
         """
         Calculates the SHA256 checksum of a file and writes it to a text file with the .checksum extension.
 
         Args:
             file_path (str): The path to the file for which the checksum will be generated.
+            checksum (Optional[str]): The checksum if it was already calculated while writing the file.
 
         Returns:
             str: The path to the checksum file.
         """
-        checksum = self.get_sha256_hash(file_path)
+        if checksum is None:
+            checksum = self.get_sha256_hash(file_path)
 
         # Create the checksum file path
         checksum_file_path = f"{file_path}.checksum"
@@ -190,14 +282,81 @@ class FileSystem:
         sha256_hash = hashlib.sha256()
 
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
                 sha256_hash.update(chunk)
 
         return sha256_hash.hexdigest()
 
+    def write_directory_checksums(self, dir_path: str, workers: int = 1) -> str:
+        """
+        Calculates the SHA256 checksum of every file in a directory and writes
+        them to a text file with the .checksum extension, one line per file
+        in the sha256sum format.
+
+        Args:
+            dir_path (str): The path to the directory.
+            workers (int): The number of files hashed at the same time.
+
+        Returns:
+            str: The path to the checksum file.
+        """
+        dir_path = dir_path.rstrip("/")
+        base_path = os.path.dirname(dir_path)
+        files = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(dir_path)
+            for name in names
+        )
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            checksums = executor.map(self.get_sha256_hash, files)
+
+            checksum_file_path = f"{dir_path}.checksum"
+
+            with open(checksum_file_path, "w") as f:
+                for file, checksum in zip(files, checksums):
+                    f.write(f"{checksum}  {os.path.relpath(file, base_path)}\n")
+
+        return checksum_file_path
+
+    def read_checksums(self, checksum_file: str) -> Dict[str, str]:
+        """
+        Reads a checksum file written by write_directory_checksums.
+
+        Args:
+            checksum_file (str): The path to the checksum file.
+
+        Returns:
+            Dict[str, str]: The SHA256 hash of each file by its relative path.
+        """
+        checksums = {}
+
+        with open(checksum_file, "r") as f:
+            for line in f:
+                if line.strip():
+                    checksum, path = line.rstrip("\n").split("  ", 1)
+                    checksums[path] = checksum
+
+        return checksums
+
+    def delete_directory(self, dir_path: str) -> bool:
+        """
+        Deletes a directory and its content.
+
+        Args:
+            dir_path (str): The path to the directory.
+
+        Returns:
+            bool: True if the directory was deleted.
+        """
+        shutil.rmtree(dir_path)
+
+        return True
+
     def get_file_stats(self, file_path: str) -> Dict[str, Any]:
         """
-        Get File Stats
+        Get File Stats, the modification time is in UTC like the one of
+        S3 objects
 
         Args:
             file_path (str): The file path
@@ -213,9 +372,9 @@ class FileSystem:
         return {
             "path": file_path,
             "size": file_stats.st_size,
-            "mod_time": datetime.fromtimestamp(file_stats.st_mtime).strftime(
-                "%Y-%m-%d %H:%M:%S"
-            ),
+            "mod_time": datetime.fromtimestamp(
+                file_stats.st_mtime, timezone.utc
+            ).strftime("%Y-%m-%d %H:%M:%S"),
         }
 
     def write_to_file(self, path, content) -> bool:
@@ -22,10 +22,33 @@
 
 import os
 import uuid
+import queue
 import subprocess
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 from .database import Database
 from .file_system import FileSystem
+from .codec import Codec, get_codec_by_path
+from .stream import HashingWriter, stream_command_input, stream_command_output
+
+try:
+    import pymysql
+    import pymysql.cursors
+except ImportError:  # pragma: no cover
+    pymysql = None
+
+
+# The schemas that belong to the server itself
+SYSTEM_SCHEMAS = ["mysql", "information_schema", "performance_schema", "sys"]
+
+# The integer types a table primary key can be split into ranges on
+INTEGER_TYPES = ["tinyint", "smallint", "mediumint", "int", "bigint"]
+
+# The size of an INSERT statement in a chunk file
+STATEMENT_SIZE = 1024 * 1024
+
+# The header of every chunk file
+CHUNK_HEADER = "SET NAMES utf8mb4;\nSET TIME_ZONE='+00:00';\nSET FOREIGN_KEY_CHECKS=0;\nSET UNIQUE_CHECKS=0;\n"
 
 
 class MySQL(Database):
@@ -44,6 +67,10 @@ class MySQL(Database):
         databases: list[str],
         temp_path: str,
         options: Optional[Dict[str, Any]],
+        codec: Codec,
+        engine: str = "mysqldump",
+        jobs: int = 1,
+        chunk_rows: int = 100000,
     ):
         """
         Initializes the MySQL instance
@@ -57,6 +84,10 @@ class MySQL(Database):
             databases (list[str]): The database to backup or empty list if all databases
             temp_path (str): The temp path to use for backup
             options (Optional[Dict[str, Any]]): The list of options for backups
+            codec (Codec): The compression codec for backups
+            engine (str): The dump engine, mysqldump, schemas or parallel
+            jobs (int): The number of concurrent dumps of the schemas and parallel engines
+            chunk_rows (int): The number of rows per chunk of the parallel engine
         """
         self._file_system = file_system
         self._host = host
@@ -66,6 +97,10 @@ class MySQL(Database):
         self._databases = databases
         self._temp_path = temp_path
         self._options = options
+        self._codec = codec
+        self._engine = engine
+        self._jobs = max(1, jobs)
+        self._chunk_rows = chunk_rows
 
     def backup(self) -> str:
         """
@@ -76,17 +111,23 @@ class MySQL(Database):
         """
         backup_id = str(uuid.uuid4())
         backup_sql_path = os.path.join(self._temp_path, f"{backup_id}.sql")
-        backup_tar_path = os.path.join(self._temp_path, f"{backup_id}.tar.gz")
+        backup_tar_path = os.path.join(
+            self._temp_path, f"{backup_id}.tar{self._codec.get_extension()}"
+        )
 
-        self._file_system.write_to_file(backup_sql_path, "")
+        if self._engine == "parallel":
+            return self._backup_parallel(backup_id, backup_tar_path)
 
-        command = self._build_dump_command(backup_sql_path)
+        if self._engine == "schemas":
+            return self._backup_schemas(backup_id, backup_tar_path)
 
-        self._execute_command(command)
+        with open(backup_sql_path, "wb") as f:
+            writer = HashingWriter(f)
+            self.dump(writer)
 
-        self._file_system.write_checksum_to_file(backup_sql_path)
-        self._file_system.compress_as_tar_gz(
-            backup_sql_path, f"{backup_sql_path}.checksum", backup_tar_path
+        self._file_system.write_checksum_to_file(backup_sql_path, writer.hexdigest())
+        self._file_system.compress_archive(
+            backup_sql_path, f"{backup_sql_path}.checksum", backup_tar_path, self._codec
         )
 
         self._file_system.delete_file(f"{backup_sql_path}.checksum")
@@ -94,27 +135,45 @@ class MySQL(Database):
 
         return backup_tar_path
 
-    def restore(self, backup_path: str) -> bool:
+    def restore(self, backup_path: str, schemas: Optional[List[str]] = None) -> bool:
         """
         Restore the database from a backup
 
         Args:
-            backup_path (str): The path to .tar.gz backup
+            backup_path (str): The path to the backup archive
+            schemas (Optional[List[str]]): The schemas to restore or None for the whole backup
 
         Returns:
             bool: whether the restore succeeded or not
         """
-        self._file_system.extract_tar_gz(backup_path, self._temp_path)
+        checksums = self._file_system.extract_archive(
+            backup_path,
+            self._temp_path,
+            get_codec_by_path(backup_path, self._codec.get_workers()),
+        )
 
-        file_name = os.path.basename(backup_path).replace(".tar.gz", "")
+        file_name = os.path.basename(backup_path).split(".")[0]
         dir_path = os.path.dirname(backup_path)
 
+        if f"{file_name}.checksum" in checksums:
+            return self._restore_directory(
+                backup_path, f"{dir_path}/{file_name}", checksums, schemas
+            )
+
         current_db_path = f"{dir_path}/{file_name}.sql"
         current_db_checksum = f"{dir_path}/{file_name}.sql.checksum"
 
+        if schemas:
+            self._file_system.delete_file(current_db_checksum)
+            self._file_system.delete_file(backup_path)
+            self._file_system.delete_file(current_db_path)
+            raise Exception(
+                "Only backups taken with the schemas or parallel engine can restore selected schemas"
+            )
+
         checksum = self._file_system.read_file(current_db_checksum)
 
-        if checksum != self._file_system.get_sha256_hash(current_db_path):
+        if checksum != checksums.get(f"{file_name}.sql"):
             raise Exception("Database checksum doesn't match!")
 
         # Restore a database
@@ -126,6 +185,629 @@ class MySQL(Database):
         self._file_system.delete_file(backup_path)
         self._file_system.delete_file(current_db_path)
 
+        return True
+
+    def _backup_parallel(self, backup_id: str, backup_tar_path: str) -> str:
+        """
+        Backup the databases with concurrent connections sharing one
+        consistent snapshot. Large tables are split into primary key ranges
+        and every chunk is dumped into its own file of the archive.
+
+        Args:
+            backup_id (str): The backup id
+            backup_tar_path (str): The path to the backup archive
+
+        Returns:
+            str: the path to the backup
+        """
+        if pymysql is None:
+            raise Exception(
+                "The parallel engine requires the PyMySQL package, install it with pip install gulper[mysql]"
+            )
+
+        backup_dir_path = os.path.join(self._temp_path, backup_id)
+        os.makedirs(backup_dir_path)
+
+        try:
+            self._dump_parallel(backup_dir_path)
+            checksum_file = self._file_system.write_directory_checksums(
+                backup_dir_path, self._jobs
+            )
+            self._file_system.compress_archive(
+                backup_dir_path, checksum_file, backup_tar_path, self._codec
+            )
+        finally:
+            if os.path.exists(f"{backup_dir_path}.checksum"):
+                self._file_system.delete_file(f"{backup_dir_path}.checksum")
+
+            self._file_system.delete_directory(backup_dir_path)
+
+        return backup_tar_path
+
+    def _dump_parallel(self, backup_dir_path: str):
+        """
+        Dump the schemas and the table chunks into a directory
+
+        Args:
+            backup_dir_path (str): The directory to dump into
+        """
+        coordinator = self._open_connection()
+        connections = []
+
+        try:
+            # Every connection starts its snapshot while writes are blocked,
+            # so they all see the database at the same point in time
+            with coordinator.cursor() as cursor:
+                cursor.execute("FLUSH TABLES WITH READ LOCK")
+
+                try:
+                    for _ in range(self._jobs):
+                        connection = self._open_connection()
+                        connections.append(connection)
+
+                        with connection.cursor() as snapshot_cursor:
+                            snapshot_cursor.execute(
+                                "SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ"
+                            )
+                            snapshot_cursor.execute(
+                                "START TRANSACTION WITH CONSISTENT SNAPSHOT"
+                            )
+                finally:
+                    cursor.execute("UNLOCK TABLES")
+
+            chunks = self._dump_schemas(connections[0], backup_dir_path)
+
+            # Connections are handed out to the chunks one at a time
+            pool = queue.Queue()
+
+            for connection in connections:
+                pool.put(connection)
+
+            def dump_chunk(chunk):
+                connection = pool.get()
+
+                try:
+                    self._dump_chunk(connection, backup_dir_path, *chunk)
+                finally:
+                    pool.put(connection)
+
+            with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+                for _ in executor.map(dump_chunk, chunks):
+                    pass
+        finally:
+            for connection in connections:
+                connection.close()
+
+            coordinator.close()
+
+    def _dump_schemas(
+        self, connection: Any, backup_dir_path: str
+    ) -> List[Tuple[str, str, List[str], Optional[str], int]]:
+        """
+        Dump the schemas of the databases, tables, views, routines, events
+        and triggers and plan the table chunks
+
+        Args:
+            connection (Any): A connection inside the snapshot
+            backup_dir_path (str): The directory to dump into
+
+        Returns:
+            List[Tuple[str, str, List[str], Optional[str], int]]: The chunks
+            as the schema, table, columns, range condition and chunk number
+        """
+        chunks = []
+
+        with connection.cursor() as cursor:
+            for schema in self._get_schemas(cursor):
+                cursor.execute(f"SHOW CREATE DATABASE {self._quote(schema)}")
+                create_database = cursor.fetchone()[1]
+                self._write_file(
+                    backup_dir_path,
+                    f"{schema}-schema-create.sql",
+                    create_database.replace(
+                        "CREATE DATABASE", "CREATE DATABASE IF NOT EXISTS", 1
+                    )
+                    + ";\n",
+                )
+
+                # Plan the largest tables first so they don't end up alone at the end
+                cursor.execute(
+                    "SELECT TABLE_NAME, TABLE_TYPE FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s ORDER BY DATA_LENGTH DESC",
+                    (schema,),
+                )
+
+                for table, table_type in cursor.fetchall():
+                    header = f"USE {self._quote(schema)};\n"
+
+                    if table_type == "VIEW":
+                        self._dump_view(cursor, backup_dir_path, schema, table)
+                        continue
+
+                    cursor.execute(
+                        f"SHOW CREATE TABLE {self._quote(schema)}.{self._quote(table)}"
+                    )
+                    self._write_file(
+                        backup_dir_path,
+                        f"{schema}.{table}-schema.sql",
+                        f"{CHUNK_HEADER}{header}DROP TABLE IF EXISTS {self._quote(table)};\n{cursor.fetchone()[1]};\n",
+                    )
+
+                    columns = self._get_columns(cursor, schema, table)
+
+                    for number, condition in enumerate(
+                        self._get_ranges(cursor, schema, table)
+                    ):
+                        chunks.append((schema, table, columns, condition, number))
+
+                self._dump_objects(connection, cursor, backup_dir_path, schema)
+
+        return chunks
+
+    def _dump_view(self, cursor: Any, backup_dir_path: str, schema: str, view: str):
+        """
+        Dump a view as a placeholder with the same columns, created with the
+        tables, and its definition, which replaces the placeholder once all
+        of them exist. Views selecting from other views can then be created
+        in any order.
+
+        Args:
+            cursor (Any): A cursor inside the snapshot
+            backup_dir_path (str): The directory to dump into
+            schema (str): The schema name
+            view (str): The view name
+        """
+        header = f"USE {self._quote(schema)};\n"
+        columns = ", ".join(
+            f"1 AS {self._quote(column)}"
+            for column in self._get_columns(cursor, schema, view)
+        )
+        self._write_file(
+            backup_dir_path,
+            f"{schema}.{view}-schema.sql",
+            f"{header}DROP VIEW IF EXISTS {self._quote(view)};\nCREATE VIEW {self._quote(view)} AS SELECT {columns};\n",
+        )
+
+        cursor.execute(f"SHOW CREATE VIEW {self._quote(schema)}.{self._quote(view)}")
+        create_view = cursor.fetchone()[1].replace("CREATE ", "CREATE OR REPLACE ", 1)
+        self._write_file(
+            backup_dir_path,
+            f"{schema}.{view}-schema-view.sql",
+            f"{header}{create_view};\n",
+        )
+
+    def _dump_objects(
+        self, connection: Any, cursor: Any, backup_dir_path: str, schema: str
+    ):
+        """
+        Dump the routines, events and triggers of a schema into one file
+        that is loaded after the table rows
+
+        Args:
+            connection (Any): A connection inside the snapshot
+            cursor (Any): A cursor of the connection
+            backup_dir_path (str): The directory to dump into
+            schema (str): The schema name
+        """
+        objects = []
+
+        cursor.execute(
+            "SELECT ROUTINE_TYPE, ROUTINE_NAME FROM information_schema.ROUTINES WHERE ROUTINE_SCHEMA = %s ORDER BY ROUTINE_NAME",
+            (schema,),
+        )
+        objects.extend((kind, name, 2) for kind, name in cursor.fetchall())
+
+        cursor.execute(
+            "SELECT EVENT_NAME FROM information_schema.EVENTS WHERE EVENT_SCHEMA = %s ORDER BY EVENT_NAME",
+            (schema,),
+        )
+        objects.extend(("EVENT", row[0], 3) for row in cursor.fetchall())
+
+        cursor.execute(
+            "SELECT TRIGGER_NAME FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = %s ORDER BY TRIGGER_NAME",
+            (schema,),
+        )
+        objects.extend(("TRIGGER", row[0], 2) for row in cursor.fetchall())
+
+        if not objects:
+            return
+
+        # The bodies hold semicolons, so the statements end with ;; instead
+        content = f"USE {self._quote(schema)};\nDELIMITER ;;\n"
+
+        for kind, name, column in objects:
+            cursor.execute(
+                f"SHOW CREATE {kind} {self._quote(schema)}.{self._quote(name)}"
+            )
+            row = cursor.fetchone()
+
+            if row is None or row[column] is None:
+                raise Exception(
+                    f"Unable to read the definition of {kind.lower()} {schema}.{name}, check the user privileges"
+                )
+
+            content += f"SET SESSION sql_mode = {connection.escape(row[1])};;\n"
+
+            if kind == "EVENT":
+                content += f"SET SESSION time_zone = {connection.escape(row[2])};;\n"
+
+            content += f"DROP {kind} IF EXISTS {self._quote(name)};;\n{row[column]};;\n"
+
+        self._write_file(
+            backup_dir_path, f"{schema}-schema-objects.sql", content + "DELIMITER ;\n"
+        )
+
+    def _dump_chunk(
+        self,
+        connection: Any,
+        backup_dir_path: str,
+        schema: str,
+        table: str,
+        columns: List[str],
+        condition: Optional[str],
+        number: int,
+    ):
+        """
+        Dump the rows of a table chunk as INSERT statements
+
+        Args:
+            connection (Any): A connection inside the snapshot
+            backup_dir_path (str): The directory to dump into
+            schema (str): The schema name
+            table (str): The table name
+            columns (List[str]): The table columns
+            condition (Optional[str]): The chunk range condition or None for the whole table
+            number (int): The chunk number
+        """
+        column_list = ", ".join(self._quote(column) for column in columns)
+        query = f"SELECT {column_list} FROM {self._quote(schema)}.{self._quote(table)}"
+
+        if condition:
+            query += f" WHERE {condition}"
+
+        insert = f"INSERT INTO {self._quote(table)} ({column_list}) VALUES "
+        path = os.path.join(backup_dir_path, f"{schema}.{table}.{number:05d}.sql")
+
+        with connection.cursor(pymysql.cursors.SSCursor) as cursor:
+            with open(path, "w", encoding="utf-8") as writer:
+                writer.write(f"{CHUNK_HEADER}USE {self._quote(schema)};\n")
+                cursor.execute(query)
+                values = []
+                size = 0
+
+                for row in cursor:
+                    value = connection.escape(row)
+                    values.append(value)
+                    size += len(value)
+
+                    if size >= STATEMENT_SIZE:
+                        writer.write(insert + ",".join(values) + ";\n")
+                        values = []
+                        size = 0
+
+                if values:
+                    writer.write(insert + ",".join(values) + ";\n")
+
+    def _get_schemas(self, cursor: Any) -> List[str]:
+        """
+        Get the schemas to backup
+
+        Args:
+            cursor (Any): A cursor inside the snapshot
+
+        Returns:
+            List[str]: The schema names
+        """
+        if self._databases:
+            return list(self._databases)
+
+        cursor.execute("SHOW DATABASES")
+
+        return [row[0] for row in cursor.fetchall() if row[0] not in SYSTEM_SCHEMAS]
+
+    def _get_columns(self, cursor: Any, schema: str, table: str) -> List[str]:
+        """
+        Get the stored columns of a table, generated columns are skipped
+
+        Args:
+            cursor (Any): A cursor inside the snapshot
+            schema (str): The schema name
+            table (str): The table name
+
+        Returns:
+            List[str]: The column names
+        """
+        cursor.execute(
+            "SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND EXTRA NOT LIKE '%%GENERATED%%' ORDER BY ORDINAL_POSITION",
+            (schema, table),
+        )
+
+        return [row[0] for row in cursor.fetchall()]
+
+    def _get_ranges(self, cursor: Any, schema: str, table: str) -> List[Optional[str]]:
+        """
+        Split a table into primary key ranges of chunk_rows rows. Only tables
+        with a single integer primary key column and more than chunk_rows
+        rows are split. The range boundaries are the keys found every
+        chunk_rows rows, so sparse keys don't produce empty chunks.
+
+        Args:
+            cursor (Any): A cursor inside the snapshot
+            schema (str): The schema name
+            table (str): The table name
+
+        Returns:
+            List[Optional[str]]: The range conditions, None for the whole table
+        """
+        cursor.execute(
+            "SELECT COLUMN_NAME, DATA_TYPE FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_KEY = 'PRI'",
+            (schema, table),
+        )
+        keys = cursor.fetchall()
+
+        if len(keys) != 1 or keys[0][1] not in INTEGER_TYPES:
+            return [None]
+
+        # The row count is an estimate, it only decides whether to split
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+            (schema, table),
+        )
+        row = cursor.fetchone()
+
+        if row is None or not row[0] or row[0] <= self._chunk_rows:
+            return [None]
+
+        key = self._quote(keys[0][0])
+        bounds = []
+
+        # Every lookup walks chunk_rows entries of the primary key from the previous bound
+        while True:
+            where = f" WHERE {key} >= {bounds[-1]}" if bounds else ""
+            cursor.execute(
+                f"SELECT {key} FROM {self._quote(schema)}.{self._quote(table)}{where} ORDER BY {key} LIMIT 1 OFFSET {self._chunk_rows}"
+            )
+            row = cursor.fetchone()
+
+            if row is None:
+                break
+
+            bounds.append(row[0])
+
+        if not bounds:
+            return [None]
+
+        ranges = [f"{key} < {bounds[0]}"]
+        ranges.extend(
+            f"{key} >= {low} AND {key} < {high}"
+            for low, high in zip(bounds, bounds[1:])
+        )
+        ranges.append(f"{key} >= {bounds[-1]}")
+
+        return ranges
+
+    def _restore_directory(
+        self,
+        backup_path: str,
+        backup_dir_path: str,
+        checksums: Dict[str, str],
+        schemas: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Restore the databases from a schemas or parallel backup, the schemas
+        are created first then the dump files are loaded concurrently
+
+        Args:
+            backup_path (str): The path to the backup archive
+            backup_dir_path (str): The path to the extracted backup directory
+            checksums (Dict[str, str]): The checksums of the extracted files
+            schemas (Optional[List[str]]): The schemas to restore or None for the whole backup
+
+        Returns:
+            bool: whether the restore succeeded or not
+        """
+        checksum_file = f"{backup_dir_path}.checksum"
+
+        try:
+            expected = self._file_system.read_checksums(checksum_file)
+            actual = {
+                path: checksum
+                for path, checksum in checksums.items()
+                if path != os.path.basename(checksum_file)
+            }
+
+            if expected != actual:
+                raise Exception("Database checksum doesn't match!")
+
+            files = sorted(os.listdir(backup_dir_path))
+
+            if schemas:
+                missing = [
+                    schema
+                    for schema in schemas
+                    if not any(self._is_schema_file(f, schema) for f in files)
+                ]
+
+                if missing:
+                    raise Exception(
+                        "Schemas {} are not part of the backup".format(
+                            ", ".join(missing)
+                        )
+                    )
+
+                files = [
+                    f
+                    for f in files
+                    if any(self._is_schema_file(f, schema) for schema in schemas)
+                ]
+
+            databases = [f for f in files if f.endswith("-schema-create.sql")]
+            tables = [f for f in files if f.endswith("-schema.sql")]
+            views = [f for f in files if f.endswith("-schema-view.sql")]
+            objects = [f for f in files if f.endswith("-schema-objects.sql")]
+            chunks = [f for f in files if f not in databases + tables + views + objects]
+
+            def load(file: str):
+                self._execute_command(
+                    self._build_restore_command(os.path.join(backup_dir_path, file))
+                )
+
+            with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+                # Triggers are created after the rows so loading them doesn't fire them
+                for step in [databases, tables, chunks, objects, views]:
+                    for _ in executor.map(load, step):
+                        pass
+        finally:
+            self._file_system.delete_file(checksum_file)
+            self._file_system.delete_file(backup_path)
+            self._file_system.delete_directory(backup_dir_path)
+
+        return True
+
+    def _backup_schemas(self, backup_id: str, backup_tar_path: str) -> str:
+        """
+        Backup every schema with its own mysqldump process, jobs of them
+        run at the same time and each schema is a separate file of the archive
+
+        Args:
+            backup_id (str): The backup id
+            backup_tar_path (str): The path to the backup archive
+
+        Returns:
+            str: the path to the backup
+        """
+        backup_dir_path = os.path.join(self._temp_path, backup_id)
+        os.makedirs(backup_dir_path)
+
+        try:
+            schemas = self._databases or self._list_schemas()
+
+            def dump_schema(schema: str):
+                self._execute_command(
+                    self._build_dump_command(
+                        os.path.join(backup_dir_path, f"{schema}.sql"), [schema]
+                    )
+                )
+
+            with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+                for _ in executor.map(dump_schema, schemas):
+                    pass
+
+            checksum_file = self._file_system.write_directory_checksums(
+                backup_dir_path, self._jobs
+            )
+            self._file_system.compress_archive(
+                backup_dir_path, checksum_file, backup_tar_path, self._codec
+            )
+        finally:
+            if os.path.exists(f"{backup_dir_path}.checksum"):
+                self._file_system.delete_file(f"{backup_dir_path}.checksum")
+
+            self._file_system.delete_directory(backup_dir_path)
+
+        return backup_tar_path
+
+    def _list_schemas(self) -> List[str]:
+        """
+        List the schemas of the server, the system schemas are skipped
+
+        Returns:
+            List[str]: The schema names
+        """
+        output = self._execute_command(
+            f'{self._build_restore_command()} -N -B -e "SHOW DATABASES"'
+        )
+
+        return [
+            schema
+            for schema in output.splitlines()
+            if schema and schema not in SYSTEM_SCHEMAS
+        ]
+
+    def _is_schema_file(self, file: str, schema: str) -> bool:
+        """
+        Check if a dump file belongs to a schema
+
+        Args:
+            file (str): The dump file name
+            schema (str): The schema name
+
+        Returns:
+            bool: whether the file belongs to the schema
+        """
+        return (
+            file == f"{schema}.sql"
+            or file == f"{schema}-schema-create.sql"
+            or file == f"{schema}-schema-objects.sql"
+            or file.startswith(f"{schema}.")
+        )
+
+    def _open_connection(self) -> Any:
+        """
+        Open a connection to the database server
+
+        Returns:
+            Any: The PyMySQL connection
+        """
+        connection = pymysql.connect(
+            host=self._host,
+            user=self._username,
+            password=self._password,
+            port=int(self._port),
+            charset="utf8mb4",
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET time_zone = '+00:00'")
+
+        return connection
+
+    def _quote(self, name: str) -> str:
+        """
+        Quote an identifier
+
+        Args:
+            name (str): The identifier
+
+        Returns:
+            str: The quoted identifier
+        """
+        return "`{}`".format(name.replace("`", "``"))
+
+    def _write_file(self, dir_path: str, name: str, content: str):
+        """
+        Write a dump file
+
+        Args:
+            dir_path (str): The dump directory
+            name (str): The file name
+            content (str): The file content
+        """
+        with open(os.path.join(dir_path, name), "w", encoding="utf-8") as writer:
+            writer.write(content)
+
+    def dump(self, writer: BinaryIO) -> None:
+        """
+        Stream the database dump into a writer
+
+        Args:
+            writer (BinaryIO): The writer to stream the dump into
+        """
+        stream_command_output(self._build_dump_command(), writer)
+
+    def load(self, reader: BinaryIO) -> bool:
+        """
+        Load the database from a dump stream
+
+        Args:
+            reader (BinaryIO): The reader to load the dump from
+
+        Returns:
+            bool: whether the load succeeded or not
+        """
+        stream_command_input(self._build_restore_command(), reader)
+
+        return True
+
     def connect(self) -> bool:
         """
         Connect into the database
@@ -148,17 +830,21 @@ class MySQL(Database):
         """
         return f"mysql -h {self._host} -u {self._username} -p{self._password} -P {self._port} -e 'SELECT 1'"
 
-    def _build_dump_command(self, output_file) -> str:
+    def _build_dump_command(
+        self, output_file: Optional[str] = None, databases: Optional[List[str]] = None
+    ) -> str:
         """
         Build Dump Command
 
         Args:
-            output_file (str): The output file
+            output_file (Optional[str]): The output file or None to dump into stdout
+            databases (Optional[List[str]]): The databases to dump instead of the configured ones
         """
         command = f"mysqldump -h {self._host} -u {self._username} -P {self._port} -p{self._password}"
+        databases = databases or self._databases
 
-        if self._databases and len(self._databases) > 0:
-            dbs = " ".join(self._databases)
+        if databases and len(databases) > 0:
+            dbs = " ".join(databases)
             command += f" --databases {dbs}"
         else:
             command += " --all-databases"
@@ -173,28 +859,37 @@ class MySQL(Database):
                 for item in value:
                     command += f" --{key}={item}"
 
-        command += f" > {output_file}"
+        if output_file:
+            command += f" > {output_file}"
 
         return command
 
-    def _build_restore_command(self, input_file: str) -> str:
+    def _build_restore_command(self, input_file: Optional[str] = None) -> str:
         """
         Build the mysql command for restore operation.
 
         Args:
-            input_file (str): The sql file
+            input_file (Optional[str]): The sql file or None to read from stdin
 
         Returns:
             str: the restore command
         """
-        return f"mysql -h {self._host} -u {self._username} -p{self._password} -P {self._port} < {input_file}"
+        command = f"mysql -h {self._host} -u {self._username} -p{self._password} -P {self._port}"
 
-    def _execute_command(self, command: str) -> None:
+        if input_file:
+            command += f" < {input_file}"
+
+        return command
+
+    def _execute_command(self, command: str) -> str:
         """
         Execute a shell command.
 
         Args:
             command (str): Command string to execute
+
+        Returns:
+            str: the command output
         """
         process = subprocess.run(
             command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
@@ -203,6 +898,8 @@ class MySQL(Database):
         if process.returncode != 0:
             raise Exception(f"Error: {process.stderr.decode()}")
 
+        return process.stdout.decode()
+
 
 def get_mysql(
     file_system: FileSystem,
@@ -213,6 +910,10 @@ def get_mysql(
     databases: list[str],
     temp_path: str,
     options: Optional[Dict[str, Any]],
+    codec: Codec,
+    engine: str = "mysqldump",
+    jobs: int = 1,
+    chunk_rows: int = 100000,
 ) -> MySQL:
     """
     Get MySQL instance
@@ -226,10 +927,25 @@ def get_mysql(
         databases (list[str]): The database to backup or empty list if all databases
         temp_path (str): The temp path to use for backup
         options (Optional[Dict[str, Any]]): The list of options for backups
+        codec (Codec): The compression codec for backups
+        engine (str): The dump engine, mysqldump, schemas or parallel
+        jobs (int): The number of concurrent dumps of the schemas and parallel engines
+        chunk_rows (int): The number of rows per chunk of the parallel engine
 
     Returns:
         MySQL: The mysql instance
     """
     return MySQL(
-        file_system, host, username, password, port, databases, temp_path, options
+        file_system,
+        host,
+        username,
+        password,
+        port,
+        databases,
+        temp_path,
+        options,
+        codec,
+        engine,
+        jobs,
+        chunk_rows,
     )
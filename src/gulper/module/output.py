@@ -21,13 +21,20 @@
 # SOFTWARE.
 
 import json
-from typing import Dict, Any
+import itertools
+from typing import Any, Dict, Iterable, List, Tuple
+from rich import box
 from rich.table import Table
+from rich.cells import cell_len
 from rich import print as fprint
 from rich.console import Console
 from rich.markdown import Markdown
 
 
+# The rows printed at once when a table is streamed
+TABLE_BATCH_SIZE = 100
+
+
 class Output:
     """
     Output Class
@@ -81,50 +88,47 @@ class Output:
             fprint(f"[bold red][ERROR][/bold red] {message}")
         exit(1)
 
-    def show_backups(self, data: list[Dict[str, Any]], as_json: bool):
+    def show_backups(self, data: Iterable[Dict[str, Any]], as_json: bool):
         """
-        Show Backups list
+        Show Backups list, rows are printed while they are read
 
         Args:
-            data (list[Dict[str, Any]]): A list of backups
+            data (Iterable[Dict[str, Any]]): The backups
             as_json (bool): Whether to output as json
         """
         if as_json:
-            items = []
-            for item in data:
-                items.append(
-                    {
-                        "id": item["id"],
-                        "db": item["db"],
-                        "status": item["status"],
-                        "createdAt": item["createdAt"],
-                        "updatedAt": item["updatedAt"],
-                    }
-                )
-            print(json.dumps(items))
-            return
-
-        # Create a table
-        table = Table(title="Database Backups")
-
-        # Add columns
-        table.add_column("ID", style="cyan", no_wrap=True)
-        table.add_column("Database Name", style="magenta")
-        table.add_column("Status", justify="center", style="green")
-        table.add_column("Created At (UTC)", style="yellow")
-        table.add_column("Updated At (UTC)", style="yellow")
-
-        # Add rows to the table
-        for item in data:
-            table.add_row(
-                item["id"],
-                item["db"],
-                item["status"].title(),
-                item["createdAt"],
-                item["updatedAt"],
+            self._print_json_list(
+                {
+                    "id": item["id"],
+                    "db": item["db"],
+                    "status": item["status"],
+                    "createdAt": item["createdAt"],
+                    "updatedAt": item["updatedAt"],
+                }
+                for item in data
             )
+            return
 
-        self._console.print(table)
+        self._print_table(
+            "Database Backups",
+            [
+                ("ID", {"style": "cyan", "no_wrap": True}),
+                ("Database Name", {"style": "magenta"}),
+                ("Status", {"justify": "center", "style": "green"}),
+                ("Created At (UTC)", {"style": "yellow"}),
+                ("Updated At (UTC)", {"style": "yellow"}),
+            ],
+            (
+                (
+                    item["id"],
+                    item["db"],
+                    item["status"].title(),
+                    item["createdAt"],
+                    item["updatedAt"],
+                )
+                for item in data
+            ),
+        )
         exit(0)
 
     def show_backup(self, data: Dict[str, Any], as_json: bool):
@@ -167,54 +171,114 @@ class Output:
         self._console.print(md)
         exit(0)
 
-    def show_events(self, data: list[Dict[str, Any]], as_json: bool):
+    def show_events(self, data: Iterable[Dict[str, Any]], as_json: bool):
         """
-        Show Events list
+        Show Events list, rows are printed while they are read
 
         Args:
-            data (list[Dict[str, Any]]): A list of events
+            data (Iterable[Dict[str, Any]]): The events
             as_json (bool): Whether to output as json
         """
         if as_json:
-            items = []
-            for item in data:
-                items.append(
-                    {
-                        "id": item.get("id"),
-                        "db": item.get("db"),
-                        "type": item.get("type"),
-                        "record": item.get("record"),
-                        "createdAt": item.get("createdAt"),
-                        "updatedAt": item.get("updatedAt"),
-                    }
-                )
-            print(json.dumps(items))
+            self._print_json_list(
+                {
+                    "id": item.get("id"),
+                    "db": item.get("db"),
+                    "type": item.get("type"),
+                    "record": item.get("record"),
+                    "createdAt": item.get("createdAt"),
+                    "updatedAt": item.get("updatedAt"),
+                }
+                for item in data
+            )
             return
 
-        # Create a table
-        table = Table(title="Events")
-
-        # Add columns
-        table.add_column("ID", style="cyan", no_wrap=True)
-        table.add_column("Database Name", style="magenta")
-        table.add_column("Type", style="red")
-        table.add_column("Record", style="green")
-        table.add_column("Created At (UTC)", style="yellow")
-        table.add_column("Updated At (UTC)", style="yellow")
-
-        # Add rows to the table
-        for item in data:
-            table.add_row(
-                item.get("id"),
-                item.get("db"),
-                item.get("type"),
-                item.get("record"),
-                item.get("createdAt"),
-                item.get("updatedAt"),
+        self._print_table(
+            "Events",
+            [
+                ("ID", {"style": "cyan", "no_wrap": True}),
+                ("Database Name", {"style": "magenta"}),
+                ("Type", {"style": "red"}),
+                ("Record", {"style": "green"}),
+                ("Created At (UTC)", {"style": "yellow"}),
+                ("Updated At (UTC)", {"style": "yellow"}),
+            ],
+            (
+                (
+                    item.get("id"),
+                    item.get("db"),
+                    item.get("type"),
+                    item.get("record"),
+                    item.get("createdAt"),
+                    item.get("updatedAt"),
+                )
+                for item in data
+            ),
+        )
+        exit(0)
+
+    def _print_json_list(self, items: Iterable[Dict[str, Any]]):
+        """
+        Print a JSON list one item at a time
+
+        Args:
+            items (Iterable[Dict[str, Any]]): The list items
+        """
+        print("[", end="")
+
+        for i, item in enumerate(items):
+            print((", " if i else "") + json.dumps(item), end="", flush=True)
+
+        print("]")
+
+    def _print_table(
+        self,
+        title: str,
+        columns: List[Tuple[str, Dict[str, Any]]],
+        rows: Iterable[Tuple[Any, ...]],
+    ):
+        """
+        Print a table in batches of rows, only the first one has the title
+        and header. The column widths come from the first batch so the
+        batches line up as one table.
+
+        Args:
+            title (str): The table title
+            columns (List[Tuple[str, Dict[str, Any]]]): The column names and options
+            rows (Iterable[Tuple[Any, ...]]): The table rows
+        """
+        rows = iter(rows)
+        batch = list(itertools.islice(rows, TABLE_BATCH_SIZE))
+        widths = [
+            max([cell_len(name)] + [cell_len(str(row[i])) for row in batch])
+            for i, (name, _) in enumerate(columns)
+        ]
+        first = True
+
+        while True:
+            table = Table(
+                title=title if first else None,
+                show_header=first,
+                show_edge=False,
+                box=box.SIMPLE_HEAD,
             )
 
-        self._console.print(table)
-        exit(0)
+            for (name, options), width in zip(columns, widths):
+                table.add_column(name, width=width, **options)
+
+            for row in batch:
+                table.add_row(*row)
+
+            self._console.print(table)
+
+            if len(batch) < TABLE_BATCH_SIZE:
+                return
+
+            batch = list(itertools.islice(rows, TABLE_BATCH_SIZE))
+            first = False
+
+            if not batch:
+                return
 
 
 def get_output() -> Output:
@@ -22,10 +22,18 @@
 
 import os
 import uuid
+import shlex
 import subprocess
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, List, Optional
 from .database import Database
 from .file_system import FileSystem
+from .codec import Codec, get_codec_by_path
+from .stream import HashingWriter, stream_command_input, stream_command_output
+
+
+# The file of the roles and tablespaces in a cluster backup
+GLOBALS_FILE = "globals.sql"
 
 
 class PostgreSQL(Database):
@@ -43,6 +51,9 @@ class PostgreSQL(Database):
         port: int,
         database: Optional[str],
         temp_path: str,
+        codec: Codec,
+        format: str = "plain",
+        jobs: int = 1,
     ):
         """
         Initializes the PostgreSQL instance
@@ -55,6 +66,9 @@ class PostgreSQL(Database):
             port (int): The PostgreSQL database port
             database (Optional[str]): The database to backup or None for all databases
             temp_path (str): The temp path to use for backup
+            codec (Codec): The compression codec for backups
+            format (str): The dump format, plain, directory or cluster
+            jobs (int): The number of parallel jobs of a directory or cluster dump and restore
         """
         self._file_system = file_system
         self._host = host
@@ -63,6 +77,9 @@ class PostgreSQL(Database):
         self._port = port
         self._database = database
         self._temp_path = temp_path
+        self._codec = codec
+        self._format = format
+        self._jobs = max(1, jobs)
 
     def backup(self) -> str:
         """
@@ -73,17 +90,23 @@ class PostgreSQL(Database):
         """
         backup_id = str(uuid.uuid4())
         backup_sql_path = os.path.join(self._temp_path, f"{backup_id}.sql")
-        backup_tar_path = os.path.join(self._temp_path, f"{backup_id}.tar.gz")
+        backup_tar_path = os.path.join(
+            self._temp_path, f"{backup_id}.tar{self._codec.get_extension()}"
+        )
 
-        self._file_system.write_to_file(backup_sql_path, "")
+        if self._format == "directory":
+            return self._backup_directory(backup_id, backup_tar_path)
 
-        command = self._build_dump_command(backup_sql_path)
+        if self._format == "cluster":
+            return self._backup_cluster(backup_id, backup_tar_path)
 
-        self._execute_command(command)
+        with open(backup_sql_path, "wb") as f:
+            writer = HashingWriter(f)
+            self.dump(writer)
 
-        self._file_system.write_checksum_to_file(backup_sql_path)
-        self._file_system.compress_as_tar_gz(
-            backup_sql_path, f"{backup_sql_path}.checksum", backup_tar_path
+        self._file_system.write_checksum_to_file(backup_sql_path, writer.hexdigest())
+        self._file_system.compress_archive(
+            backup_sql_path, f"{backup_sql_path}.checksum", backup_tar_path, self._codec
         )
 
         self._file_system.delete_file(f"{backup_sql_path}.checksum")
@@ -91,27 +114,54 @@ class PostgreSQL(Database):
 
         return backup_tar_path
 
-    def restore(self, backup_path: str) -> bool:
+    def restore(self, backup_path: str, schemas: Optional[List[str]] = None) -> bool:
         """
         Restore the database from a backup
 
         Args:
-            backup_path (str): The path to .tar.gz backup
+            backup_path (str): The path to the backup archive
+            schemas (Optional[List[str]]): The databases of a cluster backup to restore or None for the whole backup
 
         Returns:
             bool: whether the restore succeeded or not
         """
-        self._file_system.extract_tar_gz(backup_path, self._temp_path)
+        checksums = self._file_system.extract_archive(
+            backup_path,
+            self._temp_path,
+            get_codec_by_path(backup_path, self._codec.get_workers()),
+        )
 
-        file_name = os.path.basename(backup_path).replace(".tar.gz", "")
+        file_name = os.path.basename(backup_path).split(".")[0]
         dir_path = os.path.dirname(backup_path)
 
+        if f"{file_name}/{GLOBALS_FILE}" in checksums:
+            return self._restore_cluster(
+                backup_path, f"{dir_path}/{file_name}", checksums, schemas
+            )
+
+        if schemas:
+            self._file_system.delete_file(backup_path)
+
+            for path in checksums.keys():
+                if os.path.exists(f"{dir_path}/{path}"):
+                    self._file_system.delete_file(f"{dir_path}/{path}")
+
+            if os.path.isdir(f"{dir_path}/{file_name}"):
+                self._file_system.delete_directory(f"{dir_path}/{file_name}")
+
+            raise Exception("Only cluster backups can restore selected databases")
+
+        if f"{file_name}/toc.dat" in checksums:
+            return self._restore_directory(
+                backup_path, f"{dir_path}/{file_name}", checksums
+            )
+
         current_db_path = f"{dir_path}/{file_name}.sql"
         current_db_checksum = f"{dir_path}/{file_name}.sql.checksum"
 
         checksum = self._file_system.read_file(current_db_checksum)
 
-        if checksum != self._file_system.get_sha256_hash(current_db_path):
+        if checksum != checksums.get(f"{file_name}.sql"):
             raise Exception("Database checksum doesn't match!")
 
         # Restore a database
@@ -125,6 +175,242 @@ class PostgreSQL(Database):
 
         return True
 
+    def _backup_directory(self, backup_id: str, backup_tar_path: str) -> str:
+        """
+        Backup the database in the directory format with parallel jobs
+
+        Args:
+            backup_id (str): The backup id
+            backup_tar_path (str): The path to the backup archive
+
+        Returns:
+            str: the path to the backup
+        """
+        if not self._database:
+            raise Exception("The directory format needs a database to backup")
+
+        backup_dir_path = os.path.join(self._temp_path, backup_id)
+
+        try:
+            self._execute_command(self._build_directory_dump_command(backup_dir_path))
+            checksum_file = self._file_system.write_directory_checksums(
+                backup_dir_path, self._jobs
+            )
+            self._file_system.compress_archive(
+                backup_dir_path, checksum_file, backup_tar_path, self._codec
+            )
+        finally:
+            if os.path.exists(f"{backup_dir_path}.checksum"):
+                self._file_system.delete_file(f"{backup_dir_path}.checksum")
+
+            if os.path.exists(backup_dir_path):
+                self._file_system.delete_directory(backup_dir_path)
+
+        return backup_tar_path
+
+    def _restore_directory(
+        self, backup_path: str, backup_dir_path: str, checksums: Dict[str, str]
+    ) -> bool:
+        """
+        Restore the database from a directory format backup with parallel jobs
+
+        Args:
+            backup_path (str): The path to the backup archive
+            backup_dir_path (str): The path to the extracted backup directory
+            checksums (Dict[str, str]): The checksums of the extracted files
+
+        Returns:
+            bool: whether the restore succeeded or not
+        """
+        checksum_file = f"{backup_dir_path}.checksum"
+
+        try:
+            expected = self._file_system.read_checksums(checksum_file)
+            actual = {
+                path: checksum
+                for path, checksum in checksums.items()
+                if path != os.path.basename(checksum_file)
+            }
+
+            if expected != actual:
+                raise Exception("Database checksum doesn't match!")
+
+            self._execute_command(
+                self._build_directory_restore_command(backup_dir_path)
+            )
+        finally:
+            self._file_system.delete_file(checksum_file)
+            self._file_system.delete_file(backup_path)
+            self._file_system.delete_directory(backup_dir_path)
+
+        return True
+
+    def _backup_cluster(self, backup_id: str, backup_tar_path: str) -> str:
+        """
+        Backup the roles and tablespaces once then every database with its
+        own pg_dump, jobs of them run at the same time and each database is
+        a separate file of the archive
+
+        Args:
+            backup_id (str): The backup id
+            backup_tar_path (str): The path to the backup archive
+
+        Returns:
+            str: the path to the backup
+        """
+        if self._database:
+            raise Exception("The cluster format backs up all the databases")
+
+        backup_dir_path = os.path.join(self._temp_path, backup_id)
+        os.makedirs(backup_dir_path)
+
+        try:
+            self._execute_command(
+                self._build_globals_dump_command(
+                    os.path.join(backup_dir_path, GLOBALS_FILE)
+                )
+            )
+
+            def dump_database(database: str):
+                self._execute_command(
+                    self._build_database_dump_command(
+                        database, os.path.join(backup_dir_path, f"{database}.db.sql")
+                    )
+                )
+
+            with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+                for _ in executor.map(dump_database, self._list_databases()):
+                    pass
+
+            checksum_file = self._file_system.write_directory_checksums(
+                backup_dir_path, self._jobs
+            )
+            self._file_system.compress_archive(
+                backup_dir_path, checksum_file, backup_tar_path, self._codec
+            )
+        finally:
+            if os.path.exists(f"{backup_dir_path}.checksum"):
+                self._file_system.delete_file(f"{backup_dir_path}.checksum")
+
+            self._file_system.delete_directory(backup_dir_path)
+
+        return backup_tar_path
+
+    def _restore_cluster(
+        self,
+        backup_path: str,
+        backup_dir_path: str,
+        checksums: Dict[str, str],
+        databases: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Restore the roles and tablespaces of a cluster backup then its
+        databases with jobs concurrent psql clients
+
+        Args:
+            backup_path (str): The path to the backup archive
+            backup_dir_path (str): The path to the extracted backup directory
+            checksums (Dict[str, str]): The checksums of the extracted files
+            databases (Optional[List[str]]): The databases to restore or None for all of them
+
+        Returns:
+            bool: whether the restore succeeded or not
+        """
+        checksum_file = f"{backup_dir_path}.checksum"
+
+        try:
+            expected = self._file_system.read_checksums(checksum_file)
+            actual = {
+                path: checksum
+                for path, checksum in checksums.items()
+                if path != os.path.basename(checksum_file)
+            }
+
+            if expected != actual:
+                raise Exception("Database checksum doesn't match!")
+
+            files = {
+                f[: -len(".db.sql")]: f
+                for f in os.listdir(backup_dir_path)
+                if f.endswith(".db.sql")
+            }
+
+            if databases:
+                missing = [db for db in databases if db not in files]
+
+                if missing:
+                    raise Exception(
+                        "Databases {} are not part of the backup".format(
+                            ", ".join(missing)
+                        )
+                    )
+
+                files = {db: files[db] for db in databases}
+
+            self._execute_command(
+                self._build_restore_command(
+                    os.path.join(backup_dir_path, GLOBALS_FILE), "postgres"
+                )
+            )
+
+            # Every dump creates its own database from template0, so the
+            # clients connect to template1 which is never dropped
+            def load(file: str):
+                self._execute_command(
+                    self._build_restore_command(
+                        os.path.join(backup_dir_path, file), "template1"
+                    )
+                )
+
+            with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+                for _ in executor.map(load, sorted(files.values())):
+                    pass
+        finally:
+            self._file_system.delete_file(checksum_file)
+            self._file_system.delete_file(backup_path)
+            self._file_system.delete_directory(backup_dir_path)
+
+        return True
+
+    def _list_databases(self) -> List[str]:
+        """
+        List the databases of the cluster, the templates are skipped
+
+        Returns:
+            List[str]: The database names
+        """
+        output = self._execute_command(
+            f"PGPASSWORD={self._password} psql -h {self._host} -U {self._username} -p {self._port} -d postgres -At -c "
+            + shlex.quote(
+                "SELECT datname FROM pg_database WHERE datallowconn AND NOT datistemplate ORDER BY pg_database_size(datname) DESC"
+            )
+        )
+
+        return [database for database in output.splitlines() if database]
+
+    def dump(self, writer: BinaryIO) -> None:
+        """
+        Stream the database dump into a writer
+
+        Args:
+            writer (BinaryIO): The writer to stream the dump into
+        """
+        stream_command_output(self._build_dump_command(), writer)
+
+    def load(self, reader: BinaryIO) -> bool:
+        """
+        Load the database from a dump stream
+
+        Args:
+            reader (BinaryIO): The reader to load the dump from
+
+        Returns:
+            bool: whether the load succeeded or not
+        """
+        stream_command_input(self._build_restore_command(), reader)
+
+        return True
+
     def connect(self) -> bool:
         """
         Connect into the database
@@ -147,42 +433,110 @@ class PostgreSQL(Database):
         """
         return f"PGPASSWORD={self._password} psql -h {self._host} -U {self._username} -p {self._port} -c 'SELECT 1'"
 
-    def _build_dump_command(self, output_file) -> str:
+    def _build_dump_command(self, output_file: Optional[str] = None) -> str:
         """
         Build Dump Command
 
         Args:
-            output_file (str): The output file
+            output_file (Optional[str]): The output file or None to dump into stdout
         """
         if self._database:
             # For specific databases, use pg_dump
             command = f"PGPASSWORD={self._password} pg_dump -h {self._host} -U {self._username} -p {self._port} -d {self._database}"
-            command += f" -c -C > {output_file}"
+            command += " -c -C"
         else:
             # For all databases, use pg_dumpall
             command = f"PGPASSWORD={self._password} pg_dumpall -h {self._host} -U {self._username} -p {self._port}"
-            command += f" -c > {output_file}"
+            command += " -c"
+
+        if output_file:
+            command += f" > {output_file}"
 
         return command
 
-    def _build_restore_command(self, input_file: str) -> str:
+    def _build_globals_dump_command(self, output_file: str) -> str:
+        """
+        Build the pg_dumpall command of the roles and tablespaces
+
+        Args:
+            output_file (str): The output file
+
+        Returns:
+            str: the dump command
+        """
+        return f"PGPASSWORD={self._password} pg_dumpall -h {self._host} -U {self._username} -p {self._port} -g -c --if-exists -f {output_file}"
+
+    def _build_database_dump_command(self, database: str, output_file: str) -> str:
+        """
+        Build the pg_dump command of a database in a cluster backup
+
+        Args:
+            database (str): The database name
+            output_file (str): The output file
+
+        Returns:
+            str: the dump command
+        """
+        return f"PGPASSWORD={self._password} pg_dump -h {self._host} -U {self._username} -p {self._port} -d {shlex.quote(database)} -c -C --if-exists -f {shlex.quote(output_file)}"
+
+    def _build_directory_dump_command(self, output_dir: str) -> str:
+        """
+        Build the pg_dump command of a directory format backup. The dump
+        files are left uncompressed since the archive codec compresses them.
+
+        Args:
+            output_dir (str): The directory to dump into
+
+        Returns:
+            str: the dump command
+        """
+        return f"PGPASSWORD={self._password} pg_dump -h {self._host} -U {self._username} -p {self._port} -d {self._database} -Fd -j {self._jobs} -Z 0 -f {output_dir}"
+
+    def _build_directory_restore_command(self, input_dir: str) -> str:
+        """
+        Build the pg_restore command of a directory format backup. Like the
+        plain format, the database is dropped and created again.
+
+        Args:
+            input_dir (str): The directory to restore from
+
+        Returns:
+            str: the restore command
+        """
+        return f"PGPASSWORD={self._password} pg_restore -h {self._host} -U {self._username} -p {self._port} -d postgres -c -C --if-exists -j {self._jobs} {input_dir}"
+
+    def _build_restore_command(
+        self, input_file: Optional[str] = None, database: Optional[str] = None
+    ) -> str:
         """
         Build the psql command for restore operation.
 
         Args:
-            input_file (str): The sql file
+            input_file (Optional[str]): The sql file or None to read from stdin
+            database (Optional[str]): The database to connect to
 
         Returns:
             str: the restore command
         """
-        return f"PGPASSWORD={self._password} psql -h {self._host} -U {self._username} -p {self._port} -f {input_file}"
+        command = f"PGPASSWORD={self._password} psql -h {self._host} -U {self._username} -p {self._port}"
 
-    def _execute_command(self, command: str) -> None:
+        if database:
+            command += f" -d {database}"
+
+        if input_file:
+            command += f" -f {shlex.quote(input_file)}"
+
+        return command
+
+    def _execute_command(self, command: str) -> str:
         """
         Execute a shell command.
 
         Args:
             command (str): Command string to execute
+
+        Returns:
+            str: the command output
         """
         process = subprocess.run(
             command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
@@ -191,6 +545,8 @@ class PostgreSQL(Database):
         if process.returncode != 0:
             raise Exception(f"Error: {process.stderr.decode()}")
 
+        return process.stdout.decode()
+
 
 def get_postgresql(
     file_system: FileSystem,
@@ -200,6 +556,9 @@ def get_postgresql(
     port: int,
     database: Optional[str],
     temp_path: str,
+    codec: Codec,
+    format: str = "plain",
+    jobs: int = 1,
 ) -> PostgreSQL:
     """
     Get PostgreSQL instance
@@ -212,8 +571,22 @@ def get_postgresql(
         port (int): The PostgreSQL database port
         database (Optiona;[str]): The database to backup or None for all databases
         temp_path (str): The temp path to use for backup
+        codec (Codec): The compression codec for backups
+        format (str): The dump format, plain, directory or cluster
+        jobs (int): The number of parallel jobs of a directory or cluster dump and restore
 
     Returns:
         PostgreSQL: The PostgreSQL instance
     """
-    return PostgreSQL(file_system, host, username, password, port, database, temp_path)
+    return PostgreSQL(
+        file_system,
+        host,
+        username,
+        password,
+        port,
+        database,
+        temp_path,
+        codec,
+        format,
+        jobs,
+    )
@@ -0,0 +1,209 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import sqlite3
+from typing import Any, Dict, Tuple
+
+
+class Record:
+    """
+    A compact read-only row of the state database.
+
+    Columns are kept in slots instead of a per-row dict and the JSON meta
+    column is only decoded on first access. Records keep the dict style
+    get() and [] access of the rows they replace.
+    """
+
+    __slots__ = ()
+
+    # The table columns in the order of SELECT *
+    _fields: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: Tuple[Any, ...]) -> "Record":
+        """
+        Build a record from a row, used as the cursor row factory
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor of the row
+            row (Tuple[Any, ...]): The row values
+
+        Returns:
+            Record: The record
+        """
+        return cls(*row)
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """
+        Get the decoded meta column
+
+        Returns:
+            Dict[str, Any]: The meta data
+        """
+        if self._meta is None:
+            self._meta = json.loads(self._raw_meta or "{}")
+
+        return self._meta
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a column value
+
+        Args:
+            key (str): The column name
+            default (Any): The value of unknown columns
+
+        Returns:
+            Any: The column value
+        """
+        if key not in self._fields:
+            return default
+
+        return getattr(self, key)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the record as a dict with the decoded meta
+
+        Returns:
+            Dict[str, Any]: The record data
+        """
+        return {field: getattr(self, field) for field in self._fields}
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Record):
+            return NotImplemented
+
+        return type(self) is type(other) and all(
+            getattr(self, field) == getattr(other, field) for field in self._fields
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, db={self.db!r})"
+
+
+class BackupRecord(Record):
+    """
+    A row of the backup table
+    """
+
+    __slots__ = (
+        "id",
+        "db",
+        "_raw_meta",
+        "_meta",
+        "status",
+        "createdAt",
+        "updatedAt",
+        "parent",
+    )
+
+    _fields = ("id", "db", "meta", "status", "createdAt", "updatedAt", "parent")
+
+    def __init__(
+        self,
+        id: str,
+        db: str,
+        meta: str,
+        status: str,
+        createdAt: str,
+        updatedAt: str,
+        parent: str = None,
+    ):
+        """
+        Class Constructor
+
+        Args:
+            id (str): The backup id
+            db (str): The database name
+            meta (str): The JSON encoded meta data
+            status (str): The backup status
+            createdAt (str): The creation time
+            updatedAt (str): The update time
+            parent (str): The id of the backup this one is an increment of
+        """
+        self.id = id
+        self.db = db
+        self._raw_meta = meta
+        self._meta = None
+        self.status = status
+        self.createdAt = createdAt
+        self.updatedAt = updatedAt
+        self.parent = parent
+
+
+class EventRecord(Record):
+    """
+    A row of the event table
+    """
+
+    __slots__ = (
+        "id",
+        "db",
+        "record",
+        "type",
+        "_raw_meta",
+        "_meta",
+        "createdAt",
+        "updatedAt",
+    )
+
+    _fields = ("id", "db", "record", "type", "meta", "createdAt", "updatedAt")
+
+    def __init__(
+        self,
+        id: str,
+        db: str,
+        record: str,
+        type: str,
+        meta: str,
+        createdAt: str,
+        updatedAt: str,
+    ):
+        """
+        Class Constructor
+
+        Args:
+            id (str): The event id
+            db (str): The database name
+            record (str): The event message
+            type (str): The event type
+            meta (str): The JSON encoded meta data
+            createdAt (str): The creation time
+            updatedAt (str): The update time
+        """
+        self.id = id
+        self.db = db
+        self.record = record
+        self.type = type
+        self._raw_meta = meta
+        self._meta = None
+        self.createdAt = createdAt
+        self.updatedAt = updatedAt
@@ -0,0 +1,173 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import uuid
+import atexit
+import threading
+from typing import Any, Dict, List
+from datetime import datetime, timezone
+
+
+# The most events buffered while the state can't be written, older ones are dropped
+MAX_BUFFERED_EVENTS = 100000
+
+
+class EventRecorder:
+    """
+    A write-behind buffer of state events.
+
+    Recorded events are appended to memory and written by a background
+    thread in one transaction per batch, so callers never wait on SQLite.
+    Error events wake the writer up right away and process exit flushes
+    the buffer. While the state can't be written, flushes are retried
+    every flush interval and the oldest events are dropped once the buffer
+    is full.
+    """
+
+    def __init__(self, state: Any, batch_size: int = 500, flush_interval: float = 1):
+        """
+        Class Constructor
+
+        Args:
+            state (State): The state the events are written to
+            batch_size (int): The buffered events that trigger a flush
+            flush_interval (float): The maximum seconds an event stays buffered
+        """
+        self._state = state
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._urgent = False
+        self._events: List[Dict[str, Any]] = []
+        self._condition = threading.Condition()
+        # Flushes are serialized so batches are written in order
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, event: Dict[str, Any]):
+        """
+        Buffer an event, its id and creation time are set right away
+
+        Args:
+            event (Dict[str, Any]): The event data
+        """
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        event = dict(event)
+        event.setdefault("id", str(uuid.uuid4()))
+        event.setdefault("createdAt", now)
+        event.setdefault("updatedAt", now)
+
+        with self._condition:
+            self._events.append(event)
+
+            if len(self._events) > MAX_BUFFERED_EVENTS:
+                del self._events[: len(self._events) - MAX_BUFFERED_EVENTS]
+
+            if event.get("type") == "error":
+                # Keep failures even if the process dies soon after
+                self._urgent = True
+
+            if self._urgent or len(self._events) >= self._batch_size:
+                self._condition.notify()
+
+    def flush(self) -> int:
+        """
+        Write the buffered events in one transaction
+
+        Returns:
+            int: The total rows inserted
+        """
+        with self._flush_lock:
+            with self._condition:
+                events, self._events = self._events, []
+
+            if not events:
+                return 0
+
+            try:
+                return self._state.insert_events(events)
+            except Exception:
+                # Put the events back so the next flush retries them
+                with self._condition:
+                    self._events = (events + self._events)[-MAX_BUFFERED_EVENTS:]
+                raise
+
+    def close(self):
+        """
+        Stop the background thread and flush the buffered events
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+        self._thread.join()
+        atexit.unregister(self.close)
+        self.flush()
+
+    def _run(self):
+        """
+        Flush the buffer once it is full or every flush interval
+        """
+        failed = False
+
+        while True:
+            with self._condition:
+                if failed:
+                    # Back off a full interval before retrying a failed flush
+                    self._condition.wait_for(lambda: self._closed, self._flush_interval)
+                elif (
+                    not self._closed
+                    and not self._urgent
+                    and len(self._events) < self._batch_size
+                ):
+                    self._condition.wait(self._flush_interval)
+
+                if self._closed:
+                    return
+
+                self._urgent = False
+
+            try:
+                self.flush()
+                failed = False
+            except Exception:
+                # The events stay buffered for the next interval
+                failed = True
+
+
+def get_event_recorder(
+    state: Any, batch_size: int = 500, flush_interval: float = 1
+) -> EventRecorder:
+    """
+    Get an event recorder instance
+
+    Args:
+        state (State): The state the events are written to
+        batch_size (int): The buffered events that trigger a flush
+        flush_interval (float): The maximum seconds an event stays buffered
+
+    Returns:
+        EventRecorder: An event recorder instance
+    """
+    return EventRecorder(state, batch_size, flush_interval)
@@ -0,0 +1,567 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import io
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Any, BinaryIO, Dict, Iterator, List, Set
+from .codec import Codec, get_codec, get_codec_by_path
+from .config import Config
+from .storage import Storage, get_storage
+from .stream import CHUNK_SIZE
+
+
+# The chunk size limits of the content defined chunking
+MIN_CHUNK_SIZE = 256 * 1024
+AVG_CHUNK_SIZE = 1024 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+# The random values the gear hash adds for every byte, derived from sha256
+# so the cut points never change between versions
+GEAR = [
+    int.from_bytes(hashlib.sha256(bytes([i])).digest()[:8], "big") for i in range(256)
+]
+
+# Unreferenced chunks younger than this may belong to a running backup
+GC_GRACE = 24 * 60 * 60
+
+# The chunks deleted between two checks for new leases
+GC_LEASE_CHECK = 100
+
+
+class Chunker:
+    """
+    Content Defined Chunker
+
+    A gear rolling hash runs over the bytes of the stream and a chunk ends
+    where the hash matches a mask. The hash only depends on the last 64
+    bytes, so the cut points only depend on the content around them and
+    inserting or deleting data, in a dump or in a binary file like a
+    SQLite database, only changes the chunks around the change.
+
+    Like FastCDC, the search starts at the minimum size, uses a stricter
+    mask before the average size and a looser one after it, which keeps
+    the chunk sizes close to the average.
+    """
+
+    def __init__(
+        self,
+        min_size: int = MIN_CHUNK_SIZE,
+        avg_size: int = AVG_CHUNK_SIZE,
+        max_size: int = MAX_CHUNK_SIZE,
+    ):
+        """
+        Class Constructor
+
+        Args:
+            min_size (int): The minimum chunk size
+            avg_size (int): The average chunk size
+            max_size (int): The maximum chunk size
+        """
+        if not 0 < min_size < avg_size <= max_size:
+            raise Exception("Chunk sizes must satisfy 0 < min < avg <= max")
+
+        self._min_size = min_size
+        self._avg_size = avg_size
+        self._max_size = max_size
+
+        # The mask bits are the top bits, they depend on the most bytes
+        bits = max(2, (avg_size - min_size).bit_length() - 1)
+        self._strict_mask = ((1 << (bits + 1)) - 1) << (63 - bits)
+        self._loose_mask = ((1 << (bits - 1)) - 1) << (65 - bits)
+
+    def split(self, reader: BinaryIO) -> Iterator[bytes]:
+        """
+        Split a stream into chunks
+
+        Args:
+            reader (BinaryIO): The stream to split
+
+        Returns:
+            The chunks iterator
+        """
+        buffer = bytearray()
+        eof = False
+
+        while True:
+            while not eof and len(buffer) < self._max_size:
+                data = reader.read(CHUNK_SIZE)
+
+                if data:
+                    buffer += data
+                else:
+                    eof = True
+
+            if not buffer:
+                return
+
+            cut = self._find_cut(buffer)
+            yield bytes(buffer[:cut])
+            del buffer[:cut]
+
+    def _find_cut(self, data: bytearray) -> int:
+        """
+        Find the end of the chunk at the start of the data
+
+        Args:
+            data (bytearray): The buffered data
+
+        Returns:
+            int: The chunk size
+        """
+        size = min(len(data), self._max_size)
+
+        if size <= self._min_size:
+            return size
+
+        gear = GEAR
+        fingerprint = 0
+        position = self._min_size
+        average = min(size, self._avg_size)
+
+        for mask, end in [(self._strict_mask, average), (self._loose_mask, size)]:
+            for byte in data[position:end]:
+                fingerprint = ((fingerprint << 1) + gear[byte]) & 0xFFFFFFFFFFFFFFFF
+                position += 1
+
+                if not fingerprint & mask:
+                    return position
+
+        return size
+
+
+class Repository:
+    """
+    Content Addressed Backup Repository
+
+    A repository lives inside a storage. Chunks are stored by the sha256
+    of their content under chunks/ and each backup is an index under
+    indexes/ that lists its chunks in order, so a chunk shared by many
+    backups is only stored once.
+
+    A backup holds a lease under leases/ while it writes. The garbage
+    collection doesn't run while a lease is held, and a backup checks
+    that the chunks it reused still exist before it writes its index.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        codec: Codec,
+        temp_path: str,
+        chunker: Chunker,
+        workers: int = 8,
+    ):
+        """
+        Class Constructor
+
+        Args:
+            storage (Storage): The storage holding the repository
+            codec (Codec): The codec to compress new chunks with
+            temp_path (str): The path to the temp directory
+            chunker (Chunker): The chunker instance
+            workers (int): The number of chunks transferred concurrently
+        """
+        self._storage = storage
+        self._codec = codec
+        self._temp_path = temp_path
+        self._chunker = chunker
+        self._workers = max(1, workers)
+
+    def write(self, reader: BinaryIO, backup_id: str) -> Dict[str, Any]:
+        """
+        Chunk a stream and upload the chunks the repository doesn't have yet
+
+        Args:
+            reader (BinaryIO): The stream to back up
+            backup_id (str): The backup id
+
+        Returns:
+            Dict[str, Any]: The backup index stats
+        """
+        lease = self.get_lease_name(backup_id)
+        self._storage.upload_stream(io.BytesIO(b"{}"), lease)
+
+        try:
+            return self._write_backup(reader, backup_id)
+        finally:
+            self._storage.delete_file(lease)
+
+    def _write_backup(self, reader: BinaryIO, backup_id: str) -> Dict[str, Any]:
+        """
+        Chunk a stream and upload its chunks and index while holding a lease
+
+        Args:
+            reader (BinaryIO): The stream to back up
+            backup_id (str): The backup id
+
+        Returns:
+            Dict[str, Any]: The backup index stats
+
+        Raises:
+            Exception: If a reused chunk was deleted during the backup
+        """
+        existing = self._get_chunk_names()
+        reused = set()
+        chunks = []
+        stats = {"chunks": 0, "new_chunks": 0, "size": 0, "uploaded": 0}
+        lock = threading.Lock()
+        pending = deque()
+
+        def upload(name: str, data: bytes):
+            compressed = self._compress(data)
+            self._storage.upload_stream(io.BytesIO(compressed), name)
+
+            with lock:
+                stats["uploaded"] += len(compressed)
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            for data in self._chunker.split(reader):
+                name = self.get_chunk_name(hashlib.sha256(data).hexdigest())
+                chunks.append([name, len(data)])
+                stats["chunks"] += 1
+                stats["size"] += len(data)
+
+                if name in existing:
+                    reused.add(name)
+                    continue
+
+                existing.add(name)
+                stats["new_chunks"] += 1
+                pending.append(executor.submit(upload, name, data))
+
+                # Bound the chunks held in memory by the pending uploads
+                while len(pending) >= self._workers * 2:
+                    pending.popleft().result()
+
+            while pending:
+                pending.popleft().result()
+
+        # A garbage collection that started before the lease may have
+        # deleted an unreferenced chunk this backup deduplicated against
+        missing = reused - self._get_chunk_names()
+
+        if missing:
+            raise Exception(
+                f"{len(missing)} chunks of backup {backup_id} were deleted by a garbage collection, run the backup again"
+            )
+
+        index = json.dumps({"id": backup_id, "size": stats["size"], "chunks": chunks})
+        self._storage.upload_stream(
+            io.BytesIO(index.encode()), self.get_index_name(backup_id)
+        )
+
+        return stats
+
+    def read(self, backup_id: str, writer: BinaryIO) -> int:
+        """
+        Reassemble a backup from its chunks
+
+        Args:
+            backup_id (str): The backup id
+            writer (BinaryIO): The stream to write the backup into
+
+        Returns:
+            int: The backup size
+        """
+        index = self._read_index(self.get_index_name(backup_id))
+        pending = deque()
+        size = 0
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            for name, _ in index["chunks"]:
+                pending.append(executor.submit(self._download_chunk, name))
+
+                # Keep the chunks in order while a few are downloaded ahead
+                while len(pending) >= self._workers * 2:
+                    size += self._write(writer, pending.popleft().result())
+
+            while pending:
+                size += self._write(writer, pending.popleft().result())
+
+        if size != index["size"]:
+            raise Exception(f"Backup {backup_id} size doesn't match its index!")
+
+        return size
+
+    def collect_garbage(self, grace: int = GC_GRACE) -> List[str]:
+        """
+        Delete the chunks no backup index references anymore
+
+        Args:
+            grace (int): The age in seconds an unreferenced chunk is kept for
+
+        Returns:
+            List[str]: The deleted chunk names
+        """
+        if self._has_lease(grace):
+            return []
+
+        referenced = set()
+
+        for file_data in self._storage.iter_files("indexes/"):
+            index = self._read_index(file_data["name"])
+            referenced.update(name for name, _ in index["chunks"])
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        deleted = []
+
+        for file_data in self._storage.iter_files("chunks/"):
+            if file_data["name"] in referenced:
+                continue
+
+            mod_time = datetime.strptime(file_data["mod_time"], "%Y-%m-%d %H:%M:%S")
+
+            if now - mod_time < timedelta(seconds=grace):
+                continue
+
+            # Stop once a backup starts, it may reuse the unreferenced chunks
+            if (
+                deleted
+                and len(deleted) % GC_LEASE_CHECK == 0
+                and self._has_lease(grace)
+            ):
+                break
+
+            self._storage.delete_file(file_data["name"])
+            deleted.append(file_data["name"])
+
+        return deleted
+
+    def _has_lease(self, grace: int) -> bool:
+        """
+        Check whether a backup is writing into the repository, leases older
+        than the grace period belong to crashed backups and are deleted
+
+        Args:
+            grace (int): The age in seconds a lease is valid for
+
+        Returns:
+            bool: Whether a backup holds a lease
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        held = False
+
+        for file_data in self._storage.iter_files("leases/"):
+            mod_time = datetime.strptime(file_data["mod_time"], "%Y-%m-%d %H:%M:%S")
+
+            if now - mod_time < timedelta(seconds=grace):
+                held = True
+            else:
+                self._storage.delete_file(file_data["name"])
+
+        return held
+
+    def get_chunk_name(self, digest: str) -> str:
+        """
+        Get the remote name of a chunk
+
+        Args:
+            digest (str): The chunk sha256 digest
+
+        Returns:
+            str: The chunk remote name
+        """
+        return f"chunks/{digest}{self._codec.get_extension()}"
+
+    def get_index_name(self, backup_id: str) -> str:
+        """
+        Get the remote name of a backup index
+
+        Args:
+            backup_id (str): The backup id
+
+        Returns:
+            str: The index remote name
+        """
+        return f"indexes/{backup_id}.json"
+
+    def get_lease_name(self, backup_id: str) -> str:
+        """
+        Get the remote name of a backup lease
+
+        Args:
+            backup_id (str): The backup id
+
+        Returns:
+            str: The lease remote name
+        """
+        return f"leases/{backup_id}.json"
+
+    def _get_chunk_names(self) -> Set[str]:
+        """
+        Get the names of the chunks stored in the repository
+
+        Returns:
+            Set[str]: The chunk names
+        """
+        return {file_data["name"] for file_data in self._storage.iter_files("chunks/")}
+
+    def _read_index(self, name: str) -> Dict[str, Any]:
+        """
+        Download and parse a backup index
+
+        Args:
+            name (str): The index remote name
+
+        Returns:
+            Dict[str, Any]: The index data
+        """
+        return json.loads(self._download(name))
+
+    def _download_chunk(self, name: str) -> bytes:
+        """
+        Download a chunk and verify its content
+
+        Args:
+            name (str): The chunk remote name
+
+        Returns:
+            bytes: The chunk data
+        """
+        codec = get_codec_by_path(name)
+        data = codec.open_reader(io.BytesIO(self._download(name))).read()
+        digest = os.path.basename(name).split(".")[0]
+
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise Exception(f"Chunk {name} checksum doesn't match!")
+
+        return data
+
+    def _download(self, name: str) -> bytes:
+        """
+        Download the content of a repository file
+
+        Args:
+            name (str): The remote file name
+
+        Returns:
+            bytes: The file content
+        """
+        local_file = os.path.join(
+            self._temp_path, f"{threading.get_ident()}-{os.path.basename(name)}"
+        )
+
+        try:
+            self._storage.download_file(name, local_file)
+
+            with open(local_file, "rb") as reader:
+                return reader.read()
+        finally:
+            if os.path.exists(local_file):
+                os.remove(local_file)
+
+    def _compress(self, data: bytes) -> bytes:
+        """
+        Compress a chunk with the repository codec
+
+        Args:
+            data (bytes): The chunk data
+
+        Returns:
+            bytes: The compressed chunk
+        """
+        buffer = io.BytesIO()
+        writer = self._codec.open_writer(buffer)
+        writer.write(data)
+        writer.close()
+
+        return buffer.getvalue()
+
+    def _write(self, writer: BinaryIO, data: bytes) -> int:
+        """
+        Write a chunk into the output stream
+
+        Args:
+            writer (BinaryIO): The output stream
+            data (bytes): The chunk data
+
+        Returns:
+            int: The chunk size
+        """
+        writer.write(data)
+
+        return len(data)
+
+
+def get_repository(
+    storage: Storage,
+    codec: Codec,
+    temp_path: str,
+    chunker: Chunker,
+    workers: int = 8,
+) -> Repository:
+    """
+    Get Repository Class Instance
+
+    Args:
+        storage (Storage): The storage holding the repository
+        codec (Codec): The codec to compress new chunks with
+        temp_path (str): The path to the temp directory
+        chunker (Chunker): The chunker instance
+        workers (int): The number of chunks transferred concurrently
+
+    Returns:
+        Repository: An instance of repository class
+    """
+    return Repository(storage, codec, temp_path, chunker, workers)
+
+
+def get_repository_from_config(
+    config: Config, db_name: str, storage_name: str
+) -> Repository:
+    """
+    Get the repository of a database backups inside a storage
+
+    Args:
+        config (Config): A config instance
+        db_name (str): The database name
+        storage_name (str): The storage name
+
+    Returns:
+        Repository: An instance of repository class
+    """
+    repository = config.get_repository_config(db_name) or {}
+    compression = config.get_compression_config(db_name, storage_name)
+
+    # Chunks are small and compressed concurrently, each one in a single block
+    codec = get_codec(compression.get("codec", "gzip"), compression.get("level"))
+
+    chunker = Chunker(
+        repository.get("min_chunk_size", MIN_CHUNK_SIZE),
+        repository.get("avg_chunk_size", AVG_CHUNK_SIZE),
+        repository.get("max_chunk_size", MAX_CHUNK_SIZE),
+    )
+
+    return get_repository(
+        get_storage(config, storage_name),
+        codec,
+        config.get_temp_dir(),
+        chunker,
+        repository.get("workers", 8),
+    )
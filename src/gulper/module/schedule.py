@@ -21,7 +21,8 @@
 # SOFTWARE.
 
 from cron_converter import Cron
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple
 
 
 class Schedule:
@@ -29,6 +30,27 @@ class Schedule:
     A class for handling cron schedule operations and datetime formatting.
     """
 
+    def __init__(self):
+        """
+        Class Constructor
+        """
+        self._crons: Dict[str, Cron] = {}
+
+    def _get_cron(self, cron_expr: str) -> Cron:
+        """
+        Get a parsed cron expression, each expression is parsed once.
+
+        Args:
+            cron_expr (str): A string representing the cron expression.
+
+        Returns:
+            Cron: The parsed cron expression.
+        """
+        if cron_expr not in self._crons:
+            self._crons[cron_expr] = Cron(cron_expr)
+
+        return self._crons[cron_expr]
+
     def get_cron_next_run(self, cron_expr: str) -> datetime:
         """
         Get the next run time for a given cron expression.
@@ -39,8 +61,7 @@ class Schedule:
         Returns:
             datetime: The next scheduled run time in UTC.
         """
-        cron = Cron(cron_expr)
-        schedule = cron.schedule(timezone_str="UTC")
+        schedule = self._get_cron(cron_expr).schedule(timezone_str="UTC")
         return schedule.next()
 
     def get_cron_prev_run(self, cron_expr: str) -> datetime:
@@ -53,10 +74,51 @@ class Schedule:
         Returns:
             datetime: The previous scheduled run time in UTC.
         """
-        cron = Cron(cron_expr)
-        schedule = cron.schedule(timezone_str="UTC")
+        schedule = self._get_cron(cron_expr).schedule(timezone_str="UTC")
         return schedule.prev()
 
+    def get_cron_window(
+        self, cron_expr: str, at: datetime
+    ) -> Tuple[datetime, datetime]:
+        """
+        Get the window of a cron expression holding a time, it starts at
+        the last run at or before the time and ends at the next run.
+
+        Args:
+            cron_expr (str): A string representing the cron expression.
+            at (datetime): A timezone aware datetime.
+
+        Returns:
+            Tuple[datetime, datetime]: The window start and end in UTC.
+        """
+        # The seeker returns the start time itself when it matches
+        start_date = at.astimezone(timezone.utc) + timedelta(microseconds=1)
+        cron = self._get_cron(cron_expr)
+
+        return (
+            cron.schedule(start_date=start_date).prev(),
+            cron.schedule(start_date=start_date).next(),
+        )
+
+    def get_interval_window(
+        self, seconds: int, at: datetime
+    ) -> Tuple[datetime, datetime]:
+        """
+        Get the window of a fixed interval holding a time, windows are
+        aligned to the unix epoch.
+
+        Args:
+            seconds (int): The interval in seconds.
+            at (datetime): A timezone aware datetime.
+
+        Returns:
+            Tuple[datetime, datetime]: The window start and end in UTC.
+        """
+        timestamp = at.timestamp()
+        start = datetime.fromtimestamp(timestamp - timestamp % seconds, timezone.utc)
+
+        return start, start + timedelta(seconds=seconds)
+
     def get_current_utc(self) -> datetime:
         """
         Get the current UTC time.
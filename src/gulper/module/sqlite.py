@@ -22,9 +22,25 @@
 
 import os
 import uuid
+import struct
 import sqlite3
+import hashlib
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 from .database import Database
 from .file_system import FileSystem
+from .codec import Codec, get_codec_by_path
+from .stream import HashingWriter, copy_stream
+
+
+# The header of an increment: magic, page size, page count and the
+# sha256 of the whole database file it rebuilds
+PAGES_HEADER = struct.Struct(">8sIQ32s")
+PAGES_MAGIC = b"GLPRPAGE"
+
+# The header of a manifest: the backup id and the page size, followed
+# by the hash of every page
+MANIFEST_HEADER = struct.Struct(">36sI")
+PAGE_HASH_SIZE = 16
 
 
 class SQLite(Database):
@@ -33,7 +49,14 @@ class SQLite(Database):
     including backups, restores and connection testing.
     """
 
-    def __init__(self, file_system: FileSystem, temp_path: str, db_path: str):
+    def __init__(
+        self,
+        file_system: FileSystem,
+        temp_path: str,
+        db_path: str,
+        codec: Codec,
+        snapshot: Dict[str, Any],
+    ):
         """
         Initializes the SQLite instance
 
@@ -41,10 +64,16 @@ class SQLite(Database):
             file_system (FileSystem): An instance of the FileSystem class for file operations.
             temp_path (str): The temporary directory path for storing database backups.
             db_path (str): The database path
+            codec (Codec): The compression codec for backups
+            snapshot (Dict[str, Any]): The snapshot mode, pages per step and sleep between steps
         """
         self._file_system = file_system
         self._temp_path = temp_path.rstrip("/")
         self._db_path = db_path
+        self._codec = codec
+        self._snapshot_mode = snapshot.get("mode", "backup")
+        self._snapshot_pages = snapshot.get("pages", 1024)
+        self._snapshot_sleep = snapshot.get("sleep", 0.05)
 
     def backup(self) -> str:
         """
@@ -57,13 +86,17 @@ class SQLite(Database):
         new_db_path = f"{self._temp_path}/{new_db_name}.db"
 
         # Copy DB to a Temp directory
-        self._file_system.copy_file(self._db_path, new_db_path)
+        with open(new_db_path, "wb") as f:
+            writer = HashingWriter(f)
+            self.dump(writer)
 
         # Create a tar file of the db and checksum
-        tar_file_path = f"{self._temp_path}/{new_db_name}.tar.gz"
-        self._file_system.write_checksum_to_file(new_db_path)
-        self._file_system.compress_as_tar_gz(
-            new_db_path, f"{new_db_path}.checksum", tar_file_path
+        tar_file_path = (
+            f"{self._temp_path}/{new_db_name}.tar{self._codec.get_extension()}"
+        )
+        self._file_system.write_checksum_to_file(new_db_path, writer.hexdigest())
+        self._file_system.compress_archive(
+            new_db_path, f"{new_db_path}.checksum", tar_file_path, self._codec
         )
 
         # Delete Temp DB paths
@@ -72,36 +105,373 @@ class SQLite(Database):
 
         return tar_file_path
 
-    def restore(self, backup_path: str) -> bool:
+    def restore(self, backup_path: str, schemas: Optional[List[str]] = None) -> bool:
         """
         Restore SQLite database
 
         Args:
             backup_path (str): The backup path
+            schemas (Optional[List[str]]): The schemas to restore or None for the whole backup
 
         Returns:
             bool: whether the restore succeeded or not
         """
-        self._file_system.extract_tar_gz(backup_path, self._temp_path)
+        if schemas:
+            raise Exception(
+                "Restoring selected schemas is not supported by this database"
+            )
 
-        file_name = os.path.basename(backup_path).replace(".tar.gz", "")
-        dir_path = os.path.dirname(backup_path)
+        current_db_path = self._extract(backup_path)
 
-        current_db_path = f"{dir_path}/{file_name}.db"
-        current_db_checksum = f"{dir_path}/{file_name}.db.checksum"
+        # Restore a database file
+        self._restore_file(current_db_path)
 
-        checksum = self._file_system.read_file(current_db_checksum)
+        # Cleanup files
+        self._file_system.delete_file(current_db_path)
 
-        if checksum != self._file_system.get_sha256_hash(current_db_path):
-            raise Exception("Database checksum doesn't match!")
+    def backup_incremental(
+        self, manifest_path: str, parent: Optional[str]
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Creates a backup of the pages that changed since a parent backup.
+        The page hashes of the latest backup are kept in a manifest, a full
+        backup is created if the manifest doesn't describe the parent.
 
-        # Restore a database file
-        self._file_system.copy_file(current_db_path, self._db_path)
+        Args:
+            manifest_path (str): The path to the database manifest
+            parent (Optional[str]): The parent backup id, None for a full backup
+
+        Returns:
+            Tuple[str, Optional[str]]: The path to the backup file and the
+            parent backup id it depends on
+        """
+        new_db_name = str(uuid.uuid4())
+        previous = None
+
+        if parent and os.path.exists(manifest_path):
+            previous = self._read_manifest(manifest_path)
+
+        if previous is None or previous[0] != parent:
+            parent = None
+
+        new_db_path = f"{self._temp_path}/{new_db_name}.{'pages' if parent else 'db'}"
+        snapshot_path = self._snapshot()
+        page_size = self._get_page_size(snapshot_path)
+        hashes = []
+        db_hash = hashlib.sha256()
+
+        with open(snapshot_path, "rb") as reader, open(new_db_path, "wb") as f:
+            writer = HashingWriter(f)
+
+            if parent:
+                # The database hash is filled in once all the pages are read
+                writer.write(PAGES_HEADER.pack(PAGES_MAGIC, page_size, 0, b""))
+
+            for page in iter(lambda: reader.read(page_size), b""):
+                page_number = len(hashes)
+                page_hash = hashlib.blake2b(page, digest_size=PAGE_HASH_SIZE).digest()
+                db_hash.update(page)
+                hashes.append(page_hash)
+
+                if not parent:
+                    writer.write(page)
+                    continue
+
+                _, previous_page_size, previous_hashes = previous
+                offset = page_number * PAGE_HASH_SIZE
+
+                if (
+                    previous_page_size != page_size
+                    or previous_hashes[offset : offset + PAGE_HASH_SIZE] != page_hash
+                ):
+                    writer.write(struct.pack(">I", page_number) + page)
+
+        self._file_system.delete_file(snapshot_path)
+
+        if parent:
+            with open(new_db_path, "r+b") as f:
+                f.write(
+                    PAGES_HEADER.pack(
+                        PAGES_MAGIC, page_size, len(hashes), db_hash.digest()
+                    )
+                )
+
+            checksum = self._file_system.get_sha256_hash(new_db_path)
+        else:
+            checksum = writer.hexdigest()
+
+        # Create a tar file of the db or pages and checksum
+        tar_file_path = (
+            f"{self._temp_path}/{new_db_name}.tar{self._codec.get_extension()}"
+        )
+        self._file_system.write_checksum_to_file(new_db_path, checksum)
+        self._file_system.compress_archive(
+            new_db_path, f"{new_db_path}.checksum", tar_file_path, self._codec
+        )
+
+        # Delete Temp DB paths
+        self._file_system.delete_file(f"{new_db_path}.checksum")
+        self._file_system.delete_file(new_db_path)
+
+        self._write_manifest(manifest_path, new_db_name, page_size, hashes)
+
+        return tar_file_path, parent
+
+    def restore_chain(self, backup_paths: List[str]) -> bool:
+        """
+        Restore SQLite database from a full backup followed by its increments
+
+        Args:
+            backup_paths (List[str]): The backup archives, the full backup first
+
+        Returns:
+            bool: whether the restore succeeded or not
+        """
+        current_db_path = self._extract(backup_paths[0])
+
+        try:
+            db_hash = None
+
+            for backup_path in backup_paths[1:]:
+                pages_path = self._extract(backup_path)
+
+                try:
+                    db_hash = self._apply_pages(pages_path, current_db_path)
+                finally:
+                    self._file_system.delete_file(pages_path)
+
+            if db_hash is not None and db_hash != self._file_system.get_sha256_hash(
+                current_db_path
+            ):
+                raise Exception("Database checksum doesn't match!")
+
+            # Restore a database file
+            self._restore_file(current_db_path)
+        finally:
+            self._file_system.delete_file(current_db_path)
+
+        return True
+
+    def _extract(self, backup_path: str) -> str:
+        """
+        Extract a backup archive and verify its checksum
+
+        Args:
+            backup_path (str): The backup path
+
+        Returns:
+            str: The path to the extracted database or pages file
+        """
+        checksums = self._file_system.extract_archive(
+            backup_path,
+            self._temp_path,
+            get_codec_by_path(backup_path, self._codec.get_workers()),
+        )
+
+        file_name = os.path.basename(backup_path).split(".")[0]
+        dir_path = os.path.dirname(backup_path)
+        member = (
+            f"{file_name}.pages"
+            if f"{file_name}.pages" in checksums
+            else f"{file_name}.db"
+        )
+
+        current_db_path = f"{dir_path}/{member}"
+        current_db_checksum = f"{dir_path}/{member}.checksum"
+
+        checksum = self._file_system.read_file(current_db_checksum)
 
         # Cleanup files
         self._file_system.delete_file(current_db_checksum)
         self._file_system.delete_file(backup_path)
-        self._file_system.delete_file(current_db_path)
+
+        if checksum != checksums.get(member):
+            self._file_system.delete_file(current_db_path)
+            raise Exception("Database checksum doesn't match!")
+
+        return current_db_path
+
+    def _apply_pages(self, pages_path: str, db_path: str) -> str:
+        """
+        Apply the changed pages of an increment to a database file
+
+        Args:
+            pages_path (str): The increment path
+            db_path (str): The database file path
+
+        Returns:
+            str: The sha256 of the database file the increment rebuilds
+        """
+        with open(pages_path, "rb") as reader, open(db_path, "r+b") as writer:
+            magic, page_size, page_count, db_hash = PAGES_HEADER.unpack(
+                reader.read(PAGES_HEADER.size)
+            )
+
+            if magic != PAGES_MAGIC:
+                raise Exception(f"File {pages_path} is not a database increment!")
+
+            writer.truncate(page_count * page_size)
+
+            for record in iter(lambda: reader.read(4 + page_size), b""):
+                (page_number,) = struct.unpack(">I", record[:4])
+                writer.seek(page_number * page_size)
+                writer.write(record[4:])
+
+        return db_hash.hex()
+
+    def _get_page_size(self, db_path: str) -> int:
+        """
+        Get the page size of a database from its file header
+
+        Args:
+            db_path (str): The database file path
+
+        Returns:
+            int: The page size
+        """
+        with open(db_path, "rb") as reader:
+            header = reader.read(18)
+
+        if len(header) < 18:
+            return 4096
+
+        (page_size,) = struct.unpack(">H", header[16:18])
+
+        # The value 1 stands for a page size of 65536 bytes
+        return 65536 if page_size == 1 else page_size
+
+    def _read_manifest(self, path: str) -> Tuple[str, int, bytes]:
+        """
+        Read the page hashes of a backup manifest
+
+        Args:
+            path (str): The manifest path
+
+        Returns:
+            Tuple[str, int, bytes]: The backup id, the page size and the
+            concatenated page hashes
+        """
+        with open(path, "rb") as reader:
+            backup_id, page_size = MANIFEST_HEADER.unpack(
+                reader.read(MANIFEST_HEADER.size)
+            )
+            return backup_id.decode(), page_size, reader.read()
+
+    def _write_manifest(
+        self, path: str, backup_id: str, page_size: int, hashes: List[bytes]
+    ):
+        """
+        Write the page hashes of a backup manifest
+
+        Args:
+            path (str): The manifest path
+            backup_id (str): The backup id
+            page_size (int): The page size
+            hashes (List[bytes]): The page hashes
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(f"{path}.part", "wb") as writer:
+            writer.write(MANIFEST_HEADER.pack(backup_id.encode(), page_size))
+            writer.write(b"".join(hashes))
+
+        os.replace(f"{path}.part", path)
+
+    def dump(self, writer: BinaryIO) -> None:
+        """
+        Stream a consistent snapshot of the database into a writer
+
+        Args:
+            writer (BinaryIO): The writer to stream the database into
+        """
+        snapshot_path = self._snapshot()
+
+        try:
+            with open(snapshot_path, "rb") as reader:
+                copy_stream(reader, writer)
+        finally:
+            self._file_system.delete_file(snapshot_path)
+
+    def load(self, reader: BinaryIO) -> bool:
+        """
+        Replace the database content with the content of a stream
+
+        Args:
+            reader (BinaryIO): The reader to load the database from
+
+        Returns:
+            bool: whether the load succeeded or not
+        """
+        new_db_path = f"{self._temp_path}/{uuid.uuid4()}.db"
+
+        try:
+            with open(new_db_path, "wb") as writer:
+                copy_stream(reader, writer)
+
+            self._restore_file(new_db_path)
+        finally:
+            self._file_system.delete_file(new_db_path)
+
+        return True
+
+    def _snapshot(self) -> str:
+        """
+        Take a consistent snapshot of the live database into the temp
+        directory. The backup mode copies a few pages per step and sleeps
+        between steps so writers are not locked out for long, the vacuum
+        mode writes a compacted copy in a single transaction.
+
+        Returns:
+            str: The path to the snapshot
+        """
+        snapshot_path = f"{self._temp_path}/{uuid.uuid4()}.snapshot"
+
+        if self._snapshot_mode == "vacuum":
+            source = sqlite3.connect(self._db_path)
+
+            try:
+                source.execute("VACUUM INTO ?", (snapshot_path,))
+            finally:
+                source.close()
+
+            return snapshot_path
+
+        if self._snapshot_mode != "backup":
+            raise Exception(f"Unsupported SQLite snapshot mode {self._snapshot_mode}")
+
+        self._copy_database(self._db_path, snapshot_path)
+
+        return snapshot_path
+
+    def _restore_file(self, backup_db_path: str):
+        """
+        Copy a restored database file into the live database through the
+        backup API, so connections of the application see a consistent
+        database instead of a file replaced under them.
+
+        Args:
+            backup_db_path (str): The restored database file path
+        """
+        self._copy_database(backup_db_path, self._db_path)
+
+    def _copy_database(self, source_path: str, target_path: str):
+        """
+        Copy a database into another one with the online backup API
+
+        Args:
+            source_path (str): The source database path
+            target_path (str): The target database path
+        """
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path)
+
+        try:
+            source.backup(
+                target, pages=self._snapshot_pages, sleep=self._snapshot_sleep
+            )
+        finally:
+            target.close()
+            source.close()
 
     def connect(self) -> bool:
         """
@@ -118,7 +488,13 @@ class SQLite(Database):
             return False
 
 
-def get_sqlite(file_system: FileSystem, temp_path: str, db_path: str) -> SQLite:
+def get_sqlite(
+    file_system: FileSystem,
+    temp_path: str,
+    db_path: str,
+    codec: Codec,
+    snapshot: Optional[Dict[str, Any]] = None,
+) -> SQLite:
     """
     Creates and returns a new SQLite instance.
 
@@ -126,8 +502,10 @@ def get_sqlite(file_system: FileSystem, temp_path: str, db_path: str) -> SQLite:
         file_system (FileSystem): An instance of the FileSystem class for file operations.
         temp_path (str): The temporary directory path for storing database backups.
         db_path (str): The SQLite database path.
+        codec (Codec): The compression codec for backups
+        snapshot (Optional[Dict[str, Any]]): The snapshot mode, pages per step and sleep between steps
 
     Returns:
         SQLite: A new instance of the SQLite class.
     """
-    return SQLite(file_system, temp_path, db_path)
+    return SQLite(file_system, temp_path, db_path, codec, snapshot or {})
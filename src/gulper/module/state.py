@@ -22,45 +22,192 @@
 
 import uuid
 import sqlite3
-from typing import Dict, Any, List, Optional
+import functools
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Type
 from datetime import datetime, timedelta
+from gulper.module.record import BackupRecord, EventRecord, Record
+from gulper.module.recorder import EventRecorder, get_event_recorder
+
+
+# The rows read at once when streaming a listing
+PAGE_SIZE = 500
+
+
+def synchronized(method):
+    """Run a state method while holding the connection lock.
+
+    Args:
+        method: The state method.
+
+    Returns:
+        The wrapped method.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class State:
     """A Class to Manage the System State."""
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, profile: Optional[Dict[str, Any]] = None):
         """Initialize the database with a file path.
 
         Args:
             path (str): Path to the SQLite database file.
+            profile (Dict, optional): The connection profile with the journal_mode,
+                synchronous, busy_timeout, mmap_size and cache_size pragmas and
+                the event_batch_size and event_flush_interval of recorded events.
         """
         self._path = path
+        self._profile = profile or {}
+        self._recorder: Optional[EventRecorder] = None
         self._connection = None
+        # The connection is shared by the backup threads, one query at a time
+        self._lock = threading.RLock()
 
+    @synchronized
     def connect(self) -> int:
         """Establish a connection to the SQLite database.
 
         Returns:
             int: The number of total changes to the database.
         """
-        self._connection = sqlite3.connect(self._path)
+        busy_timeout = self._profile.get("busy_timeout", 5000)
+
+        self._connection = sqlite3.connect(
+            self._path, timeout=busy_timeout / 1000, check_same_thread=False
+        )
+
+        # Readers of a WAL database don't block the writer and the writer
+        # doesn't block them, with synchronous normal only checkpoints fsync
+        if self._profile.get("journal_mode"):
+            self._connection.execute(
+                f"PRAGMA journal_mode = {self._profile.get('journal_mode')}"
+            )
+
+        if self._profile.get("synchronous"):
+            self._connection.execute(
+                f"PRAGMA synchronous = {self._profile.get('synchronous')}"
+            )
+
+        self._connection.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+
+        if "mmap_size" in self._profile:
+            self._connection.execute(
+                f"PRAGMA mmap_size = {int(self._profile.get('mmap_size'))}"
+            )
+
+        if "cache_size" in self._profile:
+            # A negative cache size is in KiB instead of pages
+            self._connection.execute(
+                f"PRAGMA cache_size = -{int(self._profile.get('cache_size')) // 1024}"
+            )
+
+        # A zero batch size or flush interval writes every event right away
+        if (
+            self._profile.get("event_flush_interval", 0) > 0
+            and self._profile.get("event_batch_size", 500) > 0
+            and self._recorder is None
+        ):
+            self._recorder = get_event_recorder(
+                self,
+                self._profile.get("event_batch_size", 500),
+                self._profile.get("event_flush_interval"),
+            )
+
         return self._connection.total_changes
 
+    @synchronized
     def migrate(self) -> None:
-        """Create necessary tables if they don't exist."""
+        """Apply the schema migrations the database is missing.
+
+        The applied version is kept in the user_version pragma, so an up to
+        date database is only checked with one read.
+        """
+        migrations = [self._create_tables, self._add_keys]
         cursor = self._connection.cursor()
 
+        if cursor.execute("PRAGMA user_version").fetchone()[0] >= len(migrations):
+            cursor.close()
+            return
+
+        for version, migration in enumerate(migrations, start=1):
+            # Another process may be migrating, the write lock serializes them
+            cursor.execute("BEGIN IMMEDIATE")
+
+            try:
+                if cursor.execute("PRAGMA user_version").fetchone()[0] < version:
+                    migration(cursor)
+                    cursor.execute(f"PRAGMA user_version = {version}")
+
+                self._connection.commit()
+            except Exception:
+                self._connection.rollback()
+                raise
+
+        cursor.close()
+
+    def _create_tables(self, cursor: sqlite3.Cursor) -> None:
+        """Create the backup and event tables.
+
+        Args:
+            cursor (sqlite3.Cursor): A cursor inside the migration transaction.
+        """
         cursor.execute(
-            "CREATE TABLE IF NOT EXISTS backup (id TEXT, db TEXT, meta TEXT, status TEXT, createdAt TEXT, updatedAt TEXT)"
+            "CREATE TABLE IF NOT EXISTS backup (id TEXT, db TEXT, meta TEXT, status TEXT, createdAt TEXT, updatedAt TEXT, parent TEXT)"
         )
         cursor.execute(
             "CREATE TABLE IF NOT EXISTS event (id TEXT, db TEXT, record TEXT, type TEXT, meta TEXT, createdAt TEXT, updatedAt TEXT)"
         )
 
-        cursor.close()
-        self._connection.commit()
+        # The parent column was added with the incremental backups
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(backup)")]
+
+        if "parent" not in columns:
+            cursor.execute("ALTER TABLE backup ADD COLUMN parent TEXT")
+
+    def _add_keys(self, cursor: sqlite3.Cursor) -> None:
+        """Rebuild the tables with a primary key and index the lookups.
+
+        Rows repeating an id are dropped, the first one is kept.
+
+        Args:
+            cursor (sqlite3.Cursor): A cursor inside the migration transaction.
+        """
+        cursor.execute(
+            "CREATE TABLE backup_v2 (id TEXT PRIMARY KEY, db TEXT, meta TEXT, status TEXT, createdAt TEXT, updatedAt TEXT, parent TEXT)"
+        )
+        cursor.execute(
+            "INSERT OR IGNORE INTO backup_v2 SELECT id, db, meta, status, createdAt, updatedAt, parent FROM backup"
+        )
+        cursor.execute("DROP TABLE backup")
+        cursor.execute("ALTER TABLE backup_v2 RENAME TO backup")
+
+        cursor.execute(
+            "CREATE TABLE event_v2 (id TEXT PRIMARY KEY, db TEXT, record TEXT, type TEXT, meta TEXT, createdAt TEXT, updatedAt TEXT)"
+        )
+        cursor.execute(
+            "INSERT OR IGNORE INTO event_v2 SELECT id, db, record, type, meta, createdAt, updatedAt FROM event"
+        )
+        cursor.execute("DROP TABLE event")
+        cursor.execute("ALTER TABLE event_v2 RENAME TO event")
+
+        # The id breaks creation time ties of the keyset pagination
+        cursor.execute(
+            "CREATE INDEX backup_db_created_at ON backup (db, createdAt, id)"
+        )
+        cursor.execute("CREATE INDEX backup_created_at ON backup (createdAt, id)")
+        cursor.execute("CREATE INDEX backup_parent ON backup (parent)")
+        cursor.execute("CREATE INDEX event_db_created_at ON event (db, createdAt, id)")
+        cursor.execute("CREATE INDEX event_created_at ON event (createdAt, id)")
 
+    @synchronized
     def insert_backup(self, backup: Dict[str, Any]) -> int:
         """Insert a new backup item
 
@@ -73,12 +220,13 @@ class State:
         cursor = self._connection.cursor()
 
         result = cursor.execute(
-            "INSERT INTO backup VALUES (?, ?, ?, ?, datetime('now'), datetime('now'))",
+            "INSERT INTO backup VALUES (?, ?, ?, ?, datetime('now'), datetime('now'), ?)",
             (
                 backup.get("id", str(uuid.uuid4())),
                 backup.get("db"),
                 backup.get("meta", "{}"),
                 backup.get("status"),
+                backup.get("parent"),
             ),
         )
 
@@ -88,6 +236,7 @@ class State:
 
         return result.rowcount
 
+    @synchronized
     def insert_event(self, event: Dict[str, Any]) -> int:
         """Insert a new event record
 
@@ -116,6 +265,60 @@ class State:
 
         return result.rowcount
 
+    @synchronized
+    def insert_events(self, events: List[Dict[str, Any]]) -> int:
+        """Insert event records in one transaction
+
+        Args:
+            events (List[Dict]): The events data
+
+        Returns:
+            The total rows inserted
+        """
+        cursor = self._connection.cursor()
+
+        cursor.executemany(
+            "INSERT INTO event VALUES (?, ?, ?, ?, ?, COALESCE(?, datetime('now')), COALESCE(?, datetime('now')))",
+            [
+                (
+                    event.get("id", str(uuid.uuid4())),
+                    event.get("db"),
+                    event.get("record"),
+                    event.get("type"),
+                    event.get("meta", "{}"),
+                    event.get("createdAt"),
+                    event.get("updatedAt"),
+                )
+                for event in events
+            ],
+        )
+
+        cursor.close()
+
+        self._connection.commit()
+
+        return len(events)
+
+    def record_event(self, event: Dict[str, Any]) -> None:
+        """Record an event, buffered when the profile enables write-behind
+
+        Args:
+            event (Dict): The event data
+        """
+        if self._recorder is None:
+            self.insert_event(event)
+        else:
+            self._recorder.record(event)
+
+    def flush_events(self) -> int:
+        """Write the buffered events
+
+        Returns:
+            The total rows inserted
+        """
+        return self._recorder.flush() if self._recorder else 0
+
+    @synchronized
     def delete_backup(self, id: str) -> None:
         """Delete a backup by its ID.
 
@@ -127,6 +330,7 @@ class State:
         cursor.close()
         self._connection.commit()
 
+    @synchronized
     def delete_event(self, id: str) -> None:
         """Delete an event by its ID.
 
@@ -138,74 +342,45 @@ class State:
         cursor.close()
         self._connection.commit()
 
-    def get_backup_by_id(self, id: str) -> Dict[str, Any]:
+    @synchronized
+    def get_backup_by_id(self, id: str) -> Optional[BackupRecord]:
         """Retrieve a backup by its ID.
 
         Args:
             id (str): The ID of the backup to retrieve.
 
         Returns:
-            Dict[str, Any]: A dictionary containing the backup details.
+            Optional[BackupRecord]: The backup details.
         """
         cursor = self._connection.cursor()
+        cursor.row_factory = BackupRecord.from_row
         cursor.execute("SELECT * FROM backup WHERE id = ?", (id,))
         result = cursor.fetchone()
         cursor.close()
 
-        return (
-            dict(
-                zip(
-                    [
-                        "id",
-                        "db",
-                        "meta",
-                        "status",
-                        "createdAt",
-                        "updatedAt",
-                    ],
-                    result,
-                )
-            )
-            if result
-            else None
-        )
+        return result
 
-    def get_event_by_id(self, id: str) -> Dict[str, Any]:
+    @synchronized
+    def get_event_by_id(self, id: str) -> Optional[EventRecord]:
         """Retrieve a event by its ID.
 
         Args:
             id (str): The ID of the event to retrieve.
 
         Returns:
-            Dict[str, Any]: A dictionary containing the event details.
+            Optional[EventRecord]: The event details.
         """
         cursor = self._connection.cursor()
+        cursor.row_factory = EventRecord.from_row
         cursor.execute("SELECT * FROM event WHERE id = ?", (id,))
         result = cursor.fetchone()
         cursor.close()
 
-        return (
-            dict(
-                zip(
-                    [
-                        "id",
-                        "db",
-                        "record",
-                        "type",
-                        "meta",
-                        "createdAt",
-                        "updatedAt",
-                    ],
-                    result,
-                )
-            )
-            if result
-            else None
-        )
+        return result
 
     def get_backups(
         self, db: Optional[str] = None, since: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[BackupRecord]:
         """
         Retrieve backups based on database identifier and time filter.
 
@@ -214,101 +389,147 @@ class State:
             since (str, optional): Human-readable time filter (e.g., "3 hours ago", "1 day ago", "1 month ago"). Defaults to None.
 
         Returns:
-            List[Dict[str, Any]]: A list of dictionaries containing backup details.
+            List[BackupRecord]: The backup details, newest first.
         """
-        cursor = self._connection.cursor()
+        return list(self.iter_backups(db, since))
+
+    def iter_backups(
+        self,
+        db: Optional[str] = None,
+        since: Optional[str] = None,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[BackupRecord]:
+        """
+        Stream backups newest first, one page at a time.
 
-        # Convert human-readable time to datetime object
-        if since:
-            since_datetime = self._parse_human_readable_time(since)
+        Args:
+            db (str, optional): The database identifier to filter backups. Defaults to None.
+            since (str, optional): Human-readable time filter (e.g., "3 hours ago", "1 day ago", "1 month ago"). Defaults to None.
+            before (str, optional): Only backups older than the backup with this ID. Defaults to None.
+            after (str, optional): Only backups newer than the backup with this ID. Defaults to None.
+            limit (int, optional): The maximum number of backups, with after they are the ones right after it. Defaults to None.
 
-            if since_datetime is None:
-                raise ValueError(
-                    "Invalid time format. Use 'X hours ago', 'X days ago', 'X months ago'."
-                )
+        Returns:
+            Iterator[BackupRecord]: The backup details.
+        """
+        return self._iterate("backup", BackupRecord, db, since, before, after, limit)
 
-            # Convert datetime to string for SQL query
-            since_datetime_str = since_datetime.strftime("%Y-%m-%d %H:%M:%S")
+    @synchronized
+    def get_latest_backup(self, db_ident: str) -> Optional[BackupRecord]:
+        """Retrieve the latest backup for a database with the given identifier.
 
-            # Prepare SQL query with time filter
-            query = "SELECT * FROM backup WHERE createdAt >= ?"
-            params = (since_datetime_str,)
+        Args:
+            db_ident (str): The identifier of the database.
 
-            if db:
-                query += " AND db = ?"
-                params += (db,)
-        else:
-            query = "SELECT * FROM backup"
-            params = ()
+        Returns:
+            Optional[BackupRecord]: The latest backup details, or None if no backup is found.
+        """
+        cursor = self._connection.cursor()
+        cursor.row_factory = BackupRecord.from_row
+        cursor.execute(
+            "SELECT * FROM backup WHERE db = ? ORDER BY createdAt DESC LIMIT 1",
+            (db_ident,),
+        )
+        result = cursor.fetchone()
+        cursor.close()
 
-            if db:
-                query += " WHERE db = ?"
-                params = (db,)
+        return result
 
-        query += " ORDER BY createdAt DESC"
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        cursor.close()
+    @synchronized
+    def get_recent_backups(self, db_ident: str, limit: int) -> List[BackupRecord]:
+        """Retrieve the latest backups for a database with the given identifier.
 
-        return (
-            [
-                dict(
-                    zip(
-                        [
-                            "id",
-                            "db",
-                            "meta",
-                            "status",
-                            "createdAt",
-                            "updatedAt",
-                        ],
-                        result,
-                    )
-                )
-                for result in results
-            ]
-            if results
-            else []
+        Args:
+            db_ident (str): The identifier of the database.
+            limit (int): The maximum number of backups.
+
+        Returns:
+            List[BackupRecord]: The backups, newest first.
+        """
+        cursor = self._connection.cursor()
+        cursor.row_factory = BackupRecord.from_row
+        cursor.execute(
+            "SELECT * FROM backup WHERE db = ? ORDER BY createdAt DESC LIMIT ?",
+            (db_ident, limit),
         )
+        rows = cursor.fetchall()
+        cursor.close()
 
-    def get_latest_backup(self, db_ident: str) -> Dict[str, Any]:
-        """Retrieve the latest backup for a database with the given identifier.
+        return rows
+
+    @synchronized
+    def get_recent_restores(self, db_ident: str, limit: int) -> List[EventRecord]:
+        """Retrieve the latest restore events holding download stats for a database.
 
         Args:
             db_ident (str): The identifier of the database.
+            limit (int): The maximum number of events.
 
         Returns:
-            Dict[str, Any]: A dictionary containing the latest backup details, or None if no backup is found.
+            List[EventRecord]: The events, newest first.
         """
         cursor = self._connection.cursor()
+        cursor.row_factory = EventRecord.from_row
         cursor.execute(
-            "SELECT * FROM backup WHERE db = ? ORDER BY createdAt DESC LIMIT 1",
-            (db_ident,),
+            "SELECT * FROM event WHERE db = ? AND json_extract(meta, '$.downloads') IS NOT NULL ORDER BY createdAt DESC LIMIT ?",
+            (db_ident, limit),
         )
-        result = cursor.fetchone()
+        rows = cursor.fetchall()
         cursor.close()
 
-        return (
-            dict(
-                zip(
-                    [
-                        "id",
-                        "db",
-                        "meta",
-                        "status",
-                        "createdAt",
-                        "updatedAt",
-                    ],
-                    result,
+        return rows
+
+    @synchronized
+    def get_backup_chain(self, id: str) -> List[BackupRecord]:
+        """Retrieve a backup with the backups it depends on.
+
+        Args:
+            id (str): The ID of the backup.
+
+        Returns:
+            List[BackupRecord]: The backups from the full backup to the given one.
+        """
+        chain = []
+        backup = self.get_backup_by_id(id)
+
+        while backup:
+            chain.insert(0, backup)
+
+            if not backup.get("parent"):
+                break
+
+            backup = self.get_backup_by_id(backup.get("parent"))
+
+            if backup is None:
+                raise Exception(
+                    f"Backup {chain[0].get('parent')} is missing from the chain of {id}"
                 )
-            )
-            if result
-            else None
-        )
 
+        return chain
+
+    @synchronized
+    def has_child_backups(self, id: str) -> bool:
+        """Check whether other backups depend on a backup.
+
+        Args:
+            id (str): The ID of the backup.
+
+        Returns:
+            bool: Whether the backup has child backups.
+        """
+        cursor = self._connection.cursor()
+        cursor.execute("SELECT 1 FROM backup WHERE parent = ? LIMIT 1", (id,))
+        result = cursor.fetchone()
+        cursor.close()
+
+        return result is not None
+
+    @synchronized
     def get_stale_backups(
         self, seconds: int, db: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[BackupRecord]:
         """
         Retrieve stale backups older than X seconds.
 
@@ -317,9 +538,10 @@ class State:
             db (str, optional): The database identifier to filter backups. Defaults to None.
 
         Returns:
-            List[Dict[str, Any]]: A list of dictionaries containing stale backup details.
+            List[BackupRecord]: The stale backup details.
         """
         cursor = self._connection.cursor()
+        cursor.row_factory = BackupRecord.from_row
 
         # Calculate the stale date based on seconds
         stale_date = datetime.now() - timedelta(seconds=seconds)
@@ -337,41 +559,194 @@ class State:
         results = cursor.fetchall()
         cursor.close()
 
-        return (
-            [
-                dict(
-                    zip(
-                        [
-                            "id",
-                            "db",
-                            "meta",
-                            "status",
-                            "createdAt",
-                            "updatedAt",
-                        ],
-                        result,
-                    )
-                )
-                for result in results
-            ]
-            if results
-            else []
+        return results
+
+    @synchronized
+    def get_stale_backups_by_db(self, retentions: Dict[str, int]) -> List[BackupRecord]:
+        """
+        Retrieve the stale backups of several databases in one query.
+
+        Args:
+            retentions (Dict[str, int]): The retention seconds of each database.
+
+        Returns:
+            List[BackupRecord]: The stale backup details, newest first.
+        """
+        if not retentions:
+            return []
+
+        now = datetime.now()
+        params = ()
+
+        for db, seconds in retentions.items():
+            stale_date = now - timedelta(seconds=seconds)
+            params += (db, stale_date.strftime("%Y-%m-%d %H:%M:%S"))
+
+        cursor = self._connection.cursor()
+        cursor.row_factory = BackupRecord.from_row
+        cursor.execute(
+            "WITH retention (db, staleDate) AS (VALUES "
+            + ", ".join(["(?, ?)"] * len(retentions))
+            + ") SELECT backup.* FROM backup JOIN retention ON backup.db = retention.db"
+            " WHERE backup.createdAt < retention.staleDate ORDER BY backup.createdAt DESC",
+            params,
         )
+        results = cursor.fetchall()
+        cursor.close()
+
+        return results
+
+    @synchronized
+    def get_child_counts(self, ids: List[str]) -> Dict[str, int]:
+        """Count the backups that depend on each of the given backups.
+
+        Args:
+            ids (List[str]): The IDs of the backups.
+
+        Returns:
+            Dict[str, int]: The child count of each backup with children.
+        """
+        counts = {}
+        cursor = self._connection.cursor()
+
+        # Stay below the bound parameters limit of older SQLite builds
+        for i in range(0, len(ids), 500):
+            batch = ids[i : i + 500]
+            cursor.execute(
+                "SELECT parent, COUNT(*) FROM backup WHERE parent IN ("
+                + ", ".join(["?"] * len(batch))
+                + ") GROUP BY parent",
+                batch,
+            )
+            counts.update(dict(cursor.fetchall()))
+
+        cursor.close()
+
+        return counts
 
     def get_events(
         self, db: Optional[str] = None, since: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[EventRecord]:
         """
         Retrieve events based on database identifier and time filter.
 
         Args:
-            db (str, optional): The database identifier to filter backups. Defaults to None.
+            db (str, optional): The database identifier to filter events. Defaults to None.
+            since (str, optional): Human-readable time filter (e.g., "3 hours ago", "1 day ago", "1 month ago"). Defaults to None.
+
+        Returns:
+            List[EventRecord]: The event details, newest first.
+        """
+        return list(self.iter_events(db, since))
+
+    def iter_events(
+        self,
+        db: Optional[str] = None,
+        since: Optional[str] = None,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EventRecord]:
+        """
+        Stream events newest first, one page at a time.
+
+        Args:
+            db (str, optional): The database identifier to filter events. Defaults to None.
             since (str, optional): Human-readable time filter (e.g., "3 hours ago", "1 day ago", "1 month ago"). Defaults to None.
+            before (str, optional): Only events older than the event with this ID. Defaults to None.
+            after (str, optional): Only events newer than the event with this ID. Defaults to None.
+            limit (int, optional): The maximum number of events, with after they are the ones right after it. Defaults to None.
+
+        Returns:
+            Iterator[EventRecord]: The event details.
+        """
+        return self._iterate("event", EventRecord, db, since, before, after, limit)
+
+    @synchronized
+    def get_stale_events(self, seconds: int) -> List[EventRecord]:
+        """
+        Retrieve stale events older than X seconds.
+
+        Args:
+            seconds (int): Number of seconds to consider an event as stale.
+
+        Returns:
+            List[EventRecord]: The stale events details.
+        """
+        cursor = self._connection.cursor()
+        cursor.row_factory = EventRecord.from_row
+
+        # Calculate the stale date based on seconds
+        stale_date = datetime.now() - timedelta(seconds=seconds)
+        stale_date_str = stale_date.strftime("%Y-%m-%d %H:%M:%S")
+
+        query = "SELECT * FROM event WHERE createdAt < ? ORDER BY createdAt DESC"
+        params = (stale_date_str,)
+
+        cursor.execute(query, params)
+        results = cursor.fetchall()
+        cursor.close()
+
+        return results
+
+    @synchronized
+    def delete_stale_events(self, seconds: int) -> int:
+        """
+        Delete the events older than X seconds in one statement.
+
+        Args:
+            seconds (int): Number of seconds to consider an event as stale.
 
         Returns:
-            List[Dict[str, Any]]: A list of dictionaries containing event details.
+            int: The total rows deleted
         """
+        stale_date = datetime.now() - timedelta(seconds=seconds)
+
         cursor = self._connection.cursor()
+        result = cursor.execute(
+            "DELETE FROM event WHERE createdAt < ?",
+            (stale_date.strftime("%Y-%m-%d %H:%M:%S"),),
+        )
+        cursor.close()
+        self._connection.commit()
+
+        return result.rowcount
+
+    def _iterate(
+        self,
+        table: str,
+        record: Type[Record],
+        db: Optional[str],
+        since: Optional[str],
+        before: Optional[str],
+        after: Optional[str],
+        limit: Optional[int],
+    ) -> Iterator[Record]:
+        """
+        Stream the rows of a table newest first with keyset pagination
+        over (createdAt, id), the lock is only held while a page is read.
+
+        Args:
+            table (str): The table name.
+            record (Type[Record]): The record type of the rows.
+            db (str, optional): The database identifier to filter rows.
+            since (str, optional): Human-readable time filter.
+            before (str, optional): Only rows older than the row with this ID.
+            after (str, optional): Only rows newer than the row with this ID.
+            limit (int, optional): The maximum number of rows.
+
+        Returns:
+            Iterator[Record]: The rows.
+
+        Raises:
+            ValueError: If the time filter is invalid or a cursor row doesn't exist.
+        """
+        filters = []
+        params = ()
+
+        if db:
+            filters.append("db = ?")
+            params += (db,)
 
         # Convert human-readable time to datetime object
         if since:
@@ -382,95 +757,151 @@ class State:
                     "Invalid time format. Use 'X hours ago', 'X days ago', 'X months ago'."
                 )
 
-            # Convert datetime to string for SQL query
-            since_datetime_str = since_datetime.strftime("%Y-%m-%d %H:%M:%S")
+            filters.append("createdAt >= ?")
+            params += (since_datetime.strftime("%Y-%m-%d %H:%M:%S"),)
 
-            # Prepare SQL query with time filter
-            query = "SELECT * FROM event WHERE createdAt >= ?"
-            params = (since_datetime_str,)
+        lower = self._get_position(table, after) if after else None
+        upper = self._get_position(table, before) if before else None
 
-            if db:
-                query += " AND db = ?"
-                params += (db,)
-        else:
-            query = "SELECT * FROM event"
-            params = ()
+        if lower and limit is not None:
+            # The rows right after the cursor are read oldest first, at most
+            # limit of them are held to return them newest first
+            rows = list(
+                self._paginate(
+                    table, record, filters, params, lower, upper, limit, True
+                )
+            )
+            return iter(reversed(rows))
 
-            if db:
-                query += " WHERE db = ?"
-                params = (db,)
+        return self._paginate(
+            table, record, filters, params, lower, upper, limit, False
+        )
 
-        query += " ORDER BY createdAt DESC"
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        cursor.close()
+    def _paginate(
+        self,
+        table: str,
+        record: Type[Record],
+        filters: List[str],
+        params: Tuple[Any, ...],
+        lower: Optional[Tuple[str, str]],
+        upper: Optional[Tuple[str, str]],
+        limit: Optional[int],
+        ascending: bool,
+    ) -> Iterator[Record]:
+        """
+        Read the rows between two positions page by page
 
-        return (
-            [
-                dict(
-                    zip(
-                        [
-                            "id",
-                            "db",
-                            "record",
-                            "type",
-                            "meta",
-                            "createdAt",
-                            "updatedAt",
-                        ],
-                        result,
-                    )
-                )
-                for result in results
-            ]
-            if results
-            else []
-        )
+        Args:
+            table (str): The table name.
+            record (Type[Record]): The record type of the rows.
+            filters (List[str]): The SQL conditions.
+            params (Tuple[Any, ...]): The SQL conditions parameters.
+            lower (Tuple[str, str], optional): The excluded (createdAt, id) start.
+            upper (Tuple[str, str], optional): The excluded (createdAt, id) end.
+            limit (int, optional): The maximum number of rows.
+            ascending (bool): Whether to read the oldest rows first.
 
-    def get_stale_events(self, seconds: int) -> List[Dict[str, Any]]:
+        Returns:
+            Iterator[Record]: The rows.
         """
-        Retrieve stale events older than X seconds.
+        while limit is None or limit > 0:
+            size = PAGE_SIZE if limit is None else min(PAGE_SIZE, limit)
+            rows = self._get_page(
+                table, record, filters, params, lower, upper, size, ascending
+            )
+
+            yield from rows
+
+            if len(rows) < size:
+                return
+
+            if limit is not None:
+                limit -= len(rows)
+
+            # The next page starts after the last row of this one
+            if ascending:
+                lower = (rows[-1].createdAt, rows[-1].id)
+            else:
+                upper = (rows[-1].createdAt, rows[-1].id)
+
+    @synchronized
+    def _get_page(
+        self,
+        table: str,
+        record: Type[Record],
+        filters: List[str],
+        params: Tuple[Any, ...],
+        lower: Optional[Tuple[str, str]],
+        upper: Optional[Tuple[str, str]],
+        size: int,
+        ascending: bool,
+    ) -> List[Record]:
+        """
+        Read one page of rows between two positions
 
         Args:
-            seconds (int): Number of seconds to consider an event as stale.
+            table (str): The table name.
+            record (Type[Record]): The record type of the rows.
+            filters (List[str]): The SQL conditions.
+            params (Tuple[Any, ...]): The SQL conditions parameters.
+            lower (Tuple[str, str], optional): The excluded (createdAt, id) start.
+            upper (Tuple[str, str], optional): The excluded (createdAt, id) end.
+            size (int): The page size.
+            ascending (bool): Whether to read the oldest rows first.
 
         Returns:
-            List[Dict[str, Any]]: A list of dictionaries containing stale events details.
+            List[Record]: The rows.
         """
-        cursor = self._connection.cursor()
+        filters = list(filters)
 
-        # Calculate the stale date based on seconds
-        stale_date = datetime.now() - timedelta(seconds=seconds)
-        stale_date_str = stale_date.strftime("%Y-%m-%d %H:%M:%S")
+        if lower:
+            filters.append("(createdAt, id) > (?, ?)")
+            params += lower
 
-        query = "SELECT * FROM event WHERE createdAt < ? ORDER BY createdAt DESC"
-        params = (stale_date_str,)
+        if upper:
+            filters.append("(createdAt, id) < (?, ?)")
+            params += upper
 
-        cursor.execute(query, params)
+        query = f"SELECT * FROM {table}"
+
+        if filters:
+            query += " WHERE " + " AND ".join(filters)
+
+        order = "ASC" if ascending else "DESC"
+        query += f" ORDER BY createdAt {order}, id {order} LIMIT ?"
+
+        cursor = self._connection.cursor()
+        cursor.row_factory = record.from_row
+        cursor.execute(query, params + (size,))
         results = cursor.fetchall()
         cursor.close()
 
-        return (
-            [
-                dict(
-                    zip(
-                        [
-                            "id",
-                            "db",
-                            "record",
-                            "type",
-                            "meta",
-                            "createdAt",
-                            "updatedAt",
-                        ],
-                        result,
-                    )
-                )
-                for result in results
-            ]
-            if results
-            else []
-        )
+        return results
+
+    @synchronized
+    def _get_position(self, table: str, id: str) -> Tuple[str, str]:
+        """
+        Get the (createdAt, id) position of a row used as a cursor
+
+        Args:
+            table (str): The table name.
+            id (str): The row ID.
+
+        Returns:
+            Tuple[str, str]: The row position.
+
+        Raises:
+            ValueError: If the row doesn't exist.
+        """
+        cursor = self._connection.cursor()
+        cursor.execute(f"SELECT createdAt, id FROM {table} WHERE id = ?", (id,))
+        result = cursor.fetchone()
+        cursor.close()
+
+        if result is None:
+            raise ValueError(f"Unable to find a {table} with id {id}.")
+
+        return result
 
     def _parse_human_readable_time(self, time_str: str) -> Optional[datetime]:
         """
@@ -514,13 +945,14 @@ class State:
             return None
 
 
-def get_state(path: str) -> State:
+def get_state(path: str, profile: Optional[Dict[str, Any]] = None) -> State:
     """Create and return a state instance.
 
     Args:
         path (str): SQLite database path.
+        profile (Dict, optional): The connection profile.
 
     Returns:
         State: Initialized State client.
     """
-    return State(path)
+    return State(path, profile)
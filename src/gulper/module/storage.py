@@ -20,13 +20,30 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import io
 import os
+import time
+import queue
 import boto3
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from .config import Config
 from abc import ABC, abstractmethod
 from .file_system import FileSystem
-from typing import Dict, Any, Optional
+from typing import BinaryIO, Callable, Dict, Any, Iterator, Optional
+from .stream import CHUNK_SIZE, copy_stream
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as Boto3Config
 from botocore.client import BaseClient as Boto3Client
+from botocore.exceptions import ClientError
+
+
+# The S3 errors a range request can't recover from by retrying
+FATAL_RANGE_ERRORS = ["PreconditionFailed", "NoSuchKey", "AccessDenied"]
+
+# The directories of a chunk repository, their keys start with hex digests or UUIDs
+REPOSITORY_PREFIXES = ["chunks/", "indexes/", "leases/"]
 
 
 class Storage(ABC):
@@ -49,6 +66,21 @@ class Storage(ABC):
         """
         pass
 
+    @abstractmethod
+    def upload_stream(self, reader: BinaryIO, remote_file_name: str) -> bool:
+        """
+        Upload the content of a readable stream to remote storage whether
+        it is a local or S3
+
+        Args:
+            reader (BinaryIO): The stream to upload
+            remote_file_name (str): The remote file name
+
+        Returns:
+            Whether upload succeeded or not
+        """
+        pass
+
     @abstractmethod
     def download_file(self, remote_file_name: str, local_path: str) -> bool:
         """
@@ -64,6 +96,20 @@ class Storage(ABC):
         """
         pass
 
+    @abstractmethod
+    def download_stream(self, remote_file_name: str) -> BinaryIO:
+        """
+        Open a remote file for reading whether it is a local or S3 without
+        staging it on disk
+
+        Args:
+            remote_file_name (str): The remote file name
+
+        Returns:
+            A reader of the remote file, the caller closes it
+        """
+        pass
+
     @abstractmethod
     def delete_file(self, remote_file_name: str) -> bool:
         """
@@ -91,14 +137,31 @@ class Storage(ABC):
         pass
 
     @abstractmethod
-    def get_files(self) -> list[Dict[str, Any]]:
+    def iter_files(self, prefix: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the files of remote storage whether it is a local or S3,
+        the files are fetched lazily so memory stays flat for large storages.
+        Each file data holds the file name relative to the storage base path.
+
+        Args:
+            prefix (Optional[str]): Only yield the files with this name prefix
+
+        Returns:
+            The files data iterator
+        """
+        pass
+
+    def get_files(self, prefix: Optional[str] = None) -> list[Dict[str, Any]]:
         """
         Get file list from remote storage whether it is a local or S3
 
+        Args:
+            prefix (Optional[str]): Only get the files with this name prefix
+
         Returns:
             The files data
         """
-        pass
+        return list(self.iter_files(prefix))
 
     @abstractmethod
     def get_base_path(self) -> str:
@@ -135,8 +198,36 @@ class LocalStorage(Storage):
             Whether upload succeeded or not
         """
         remote_file_path = os.path.join(self.get_base_path(), remote_file_name)
+        os.makedirs(os.path.dirname(remote_file_path), exist_ok=True)
         return self._file_system.copy_file(local_file_path, remote_file_path)
 
+    def upload_stream(self, reader: BinaryIO, remote_file_name: str) -> bool:
+        """
+        Upload the content of a readable stream to a remote local storage
+
+        Args:
+            reader (BinaryIO): The stream to upload
+            remote_file_name (str): The remote file name
+
+        Returns:
+            Whether upload succeeded or not
+        """
+        remote_file_path = os.path.join(self.get_base_path(), remote_file_name)
+        partial_file_path = f"{remote_file_path}.part"
+        os.makedirs(os.path.dirname(remote_file_path), exist_ok=True)
+
+        try:
+            with open(partial_file_path, "wb") as writer:
+                copy_stream(reader, writer)
+        except Exception:
+            if os.path.exists(partial_file_path):
+                os.remove(partial_file_path)
+            raise
+
+        os.replace(partial_file_path, remote_file_path)
+
+        return True
+
     def download_file(self, remote_file_name: str, local_path: str) -> bool:
         """
         Download a file from a remote local storage
@@ -151,6 +242,18 @@ class LocalStorage(Storage):
         remote_file_path = os.path.join(self.get_base_path(), remote_file_name)
         return self._file_system.copy_file(remote_file_path, local_path)
 
+    def download_stream(self, remote_file_name: str) -> BinaryIO:
+        """
+        Open a file of a remote local storage for reading
+
+        Args:
+            remote_file_name (str): The remote file name
+
+        Returns:
+            A reader of the remote file, the caller closes it
+        """
+        return open(os.path.join(self.get_base_path(), remote_file_name), "rb")
+
     def delete_file(self, remote_file_name: str) -> bool:
         """
         Delete a file from a remote local storage
@@ -177,22 +280,31 @@ class LocalStorage(Storage):
         remote_file_path = os.path.join(self.get_base_path(), remote_file_name)
         return self._file_system.get_file_stats(remote_file_path)
 
-    def get_files(self) -> list[Dict[str, Any]]:
+    def iter_files(self, prefix: Optional[str] = None) -> Iterator[Dict[str, Any]]:
         """
-        Get file list from remote local storage
+        Iterate over the files of remote local storage
+
+        Args:
+            prefix (Optional[str]): Only yield the files with this name prefix
 
         Returns:
-            The files data
+            The files data iterator
         """
-        files_data = []
+        directory, name_prefix = os.path.split(prefix or "")
+        path = os.path.join(self.get_base_path(), directory)
 
-        for filename in os.listdir(self.get_base_path()):
-            remote_file_path = os.path.join(self.get_base_path(), filename)
+        if not os.path.isdir(path):
+            return
 
-            if os.path.isfile(remote_file_path):
-                files_data.append(self._file_system.get_file_stats(remote_file_path))
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if name_prefix and not entry.name.startswith(name_prefix):
+                    continue
 
-        return files_data
+                if entry.is_file():
+                    file_data = self._file_system.get_file_stats(entry.path)
+                    file_data["name"] = os.path.join(directory, entry.name)
+                    yield file_data
 
     def get_base_path(self) -> str:
         """
@@ -204,6 +316,89 @@ class LocalStorage(Storage):
         return self._base_path
 
 
+class RangeReader(io.RawIOBase):
+    """
+    A reader of a remote object fetched as byte ranges by concurrent
+    requests. Up to concurrency ranges are fetched ahead of the consumer
+    and handed out in order, so memory stays bounded by the range size.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[int, int], bytes],
+        size: int,
+        range_size: int,
+        concurrency: int,
+    ):
+        """
+        Class Constructor
+
+        Args:
+            fetch (Callable[[int, int], bytes]): Fetch the bytes between two inclusive offsets
+            size (int): The object size
+            range_size (int): The size of each range
+            concurrency (int): The number of ranges fetched at the same time
+        """
+        self._fetch = fetch
+        self._ranges = iter(
+            [
+                (start, min(start + range_size, size) - 1)
+                for start in range(0, size, range_size)
+            ]
+        )
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._pending = deque()
+        self._chunk = b""
+        self._offset = 0
+
+        for _ in range(concurrency):
+            self._schedule()
+
+    def _schedule(self):
+        """
+        Start fetching the next range if any
+        """
+        next_range = next(self._ranges, None)
+
+        if next_range is not None:
+            self._pending.append(self._executor.submit(self._fetch, *next_range))
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        """
+        Read the next available bytes into a buffer
+
+        Args:
+            buffer: A writable buffer
+
+        Returns:
+            int: The number of bytes read or 0 at the end of the object
+        """
+        while self._offset >= len(self._chunk):
+            if not self._pending:
+                return 0
+
+            self._chunk = self._pending.popleft().result()
+            self._offset = 0
+            self._schedule()
+
+        size = min(len(buffer), len(self._chunk) - self._offset)
+        buffer[:size] = self._chunk[self._offset : self._offset + size]
+        self._offset += size
+
+        return size
+
+    def close(self) -> None:
+        """
+        Stop fetching the ranges that are not consumed yet
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
+        super().close()
+
+
 class S3Storage(Storage):
     """S3 Backed Storage Class"""
 
@@ -212,6 +407,11 @@ class S3Storage(Storage):
         boto3_client: Boto3Client,
         bucket_name: str,
         base_path: str,
+        transfer_config: Optional[TransferConfig] = None,
+        list_concurrency: int = 1,
+        range_size: Optional[int] = None,
+        range_concurrency: int = 4,
+        range_retries: int = 3,
     ):
         """
         Class Constructor
@@ -219,6 +419,11 @@ class S3Storage(Storage):
         self._boto3_client = boto3_client
         self._bucket_name = bucket_name
         self._base_path = base_path
+        self._transfer_config = transfer_config
+        self._list_concurrency = list_concurrency
+        self._range_size = range_size
+        self._range_concurrency = range_concurrency
+        self._range_retries = range_retries
 
     def upload_file(self, local_file_path: str, remote_file_name: str) -> bool:
         """
@@ -235,7 +440,29 @@ class S3Storage(Storage):
             "/"
         )
         self._boto3_client.upload_file(
-            local_file_path, self._bucket_name, remote_file_path
+            local_file_path,
+            self._bucket_name,
+            remote_file_path,
+            Config=self._transfer_config,
+        )
+        return True
+
+    def upload_stream(self, reader: BinaryIO, remote_file_name: str) -> bool:
+        """
+        Upload the content of a readable stream to a remote S3 storage
+
+        Args:
+            reader (BinaryIO): The stream to upload
+            remote_file_name (str): The remote file name
+
+        Returns:
+            Whether upload succeeded or not
+        """
+        remote_file_path = os.path.join(self.get_base_path(), remote_file_name).lstrip(
+            "/"
+        )
+        self._boto3_client.upload_fileobj(
+            reader, self._bucket_name, remote_file_path, Config=self._transfer_config
         )
         return True
 
@@ -253,11 +480,121 @@ class S3Storage(Storage):
         remote_file_path = os.path.join(self.get_base_path(), remote_file_name).lstrip(
             "/"
         )
+        reader = self._open_ranges(remote_file_path)
+
+        if reader is not None:
+            with reader, open(local_path, "wb") as writer:
+                copy_stream(reader, writer)
+            return True
+
         self._boto3_client.download_file(
-            self._bucket_name, remote_file_path, local_path
+            self._bucket_name,
+            remote_file_path,
+            local_path,
+            Config=self._transfer_config,
         )
         return True
 
+    def download_stream(self, remote_file_name: str) -> BinaryIO:
+        """
+        Open a file of a remote S3 storage for reading
+
+        Args:
+            remote_file_name (str): The remote file name
+
+        Returns:
+            A reader of the remote file, the caller closes it
+        """
+        remote_file_path = os.path.join(self.get_base_path(), remote_file_name).lstrip(
+            "/"
+        )
+        reader = self._open_ranges(remote_file_path)
+
+        if reader is not None:
+            return reader
+
+        response = self._boto3_client.get_object(
+            Bucket=self._bucket_name, Key=remote_file_path
+        )
+        return response["Body"]
+
+    def _open_ranges(self, key: str) -> Optional[RangeReader]:
+        """
+        Open a reader fetching an object as concurrent ranges
+
+        Args:
+            key (str): The object key
+
+        Returns:
+            Optional[RangeReader]: The reader or None if ranges are disabled or the object fits in one range
+        """
+        if not self._range_size or self._range_concurrency < 2:
+            return None
+
+        head = self._boto3_client.head_object(Bucket=self._bucket_name, Key=key)
+        size = head["ContentLength"]
+
+        if size <= self._range_size:
+            return None
+
+        # Every range must come from the same version of the object
+        etag = head["ETag"]
+
+        return RangeReader(
+            lambda start, end: self._fetch_range(key, etag, start, end),
+            size,
+            self._range_size,
+            self._range_concurrency,
+        )
+
+    def _fetch_range(self, key: str, etag: str, start: int, end: int) -> bytes:
+        """
+        Fetch a byte range of an object. An interrupted range is retried
+        from the last byte received.
+
+        Args:
+            key (str): The object key
+            etag (str): The object ETag
+            start (int): The first byte offset
+            end (int): The last byte offset
+
+        Returns:
+            bytes: The range content
+        """
+        data = bytearray()
+        attempt = 0
+
+        while True:
+            try:
+                response = self._boto3_client.get_object(
+                    Bucket=self._bucket_name,
+                    Key=key,
+                    Range=f"bytes={start + len(data)}-{end}",
+                    IfMatch=etag,
+                )
+                body = response["Body"]
+
+                for chunk in iter(lambda: body.read(CHUNK_SIZE), b""):
+                    data.extend(chunk)
+
+                if len(data) != end - start + 1:
+                    raise IOError(f"Range {start}-{end} of {key} is incomplete")
+
+                return bytes(data)
+            except Exception as e:
+                if (
+                    isinstance(e, ClientError)
+                    and e.response.get("Error", {}).get("Code") in FATAL_RANGE_ERRORS
+                ):
+                    raise
+
+                attempt += 1
+
+                if attempt > self._range_retries:
+                    raise
+
+                time.sleep(min(0.2 * 2**attempt, 5))
+
     def delete_file(self, remote_file_name: str) -> bool:
         """
         Delete a file from remote S3 storage
@@ -298,30 +635,134 @@ class S3Storage(Storage):
             "mod_time": response["LastModified"].strftime("%Y-%m-%d %H:%M:%S"),
         }
 
-    def get_files(self) -> list[Dict[str, Any]]:
+    def iter_files(self, prefix: Optional[str] = None) -> Iterator[Dict[str, Any]]:
         """
-        Get file list from remote local storage
+        Iterate over the files of remote S3 storage. The listing follows the
+        continuation tokens page by page and, with a list concurrency above
+        one, splits the key space into ranges listed in parallel, the
+        chunk repository directories included. Files are yielded in no
+        particular order in that case.
+
+        Args:
+            prefix (Optional[str]): Only yield the files with this name prefix
 
         Returns:
-            The files data
-        """
-        files_data = []
-        response = self._boto3_client.list_objects_v2(
-            Bucket=self._bucket_name, Prefix=self._base_path.lstrip("/")
+            The files data iterator
+        """
+        key_prefix = os.path.join(self.get_base_path(), prefix or "").lstrip("/")
+
+        if self._list_concurrency <= 1:
+            yield from self._iter_range(key_prefix)
+            return
+
+        # Backup ids are random UUIDs and chunk names are hex digests, so hex
+        # digits split the keys evenly. The repository directories are split
+        # too, otherwise all their keys would land in a single range.
+        digits = "0123456789abcdef"
+        shards = min(self._list_concurrency, len(digits))
+        prefixes = [""] + [
+            directory
+            for directory in REPOSITORY_PREFIXES
+            if directory.startswith(prefix or "") and directory != (prefix or "")
+        ]
+        bounds = sorted(
+            key_prefix + directory + digits[len(digits) * i // shards]
+            for directory in prefixes
+            for i in range(1, shards)
         )
+        ranges = queue.Queue()
+
+        for bounds_range in zip([None] + bounds, bounds + [None]):
+            ranges.put(bounds_range)
+
+        pages = queue.Queue(maxsize=shards * 2)
+        stopped = threading.Event()
+
+        def put(item) -> bool:
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def list_ranges():
+            try:
+                while True:
+                    try:
+                        start_after, end = ranges.get_nowait()
+                    except queue.Empty:
+                        break
+
+                    for file_data in self._iter_range(key_prefix, start_after, end):
+                        if not put(file_data):
+                            return
+                put(None)
+            except Exception as e:
+                put(e)
+
+        threads = [
+            threading.Thread(target=list_ranges, daemon=True) for _ in range(shards)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            remaining = len(threads)
+
+            while remaining > 0:
+                item = pages.get()
+
+                if item is None:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stopped.set()
+
+    def _iter_range(
+        self,
+        key_prefix: str,
+        start_after: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the files with a key prefix, the key range is exclusive
+        of start_after and inclusive of end.
+
+        Args:
+            key_prefix (str): The key prefix
+            start_after (Optional[str]): The key to start listing after
+            end (Optional[str]): The last key to list
+
+        Returns:
+            The files data iterator
+        """
+        base_prefix = os.path.join(self.get_base_path(), "").lstrip("/")
+        paginator = self._boto3_client.get_paginator("list_objects_v2")
+        options = {"Bucket": self._bucket_name, "Prefix": key_prefix}
+
+        if start_after:
+            options["StartAfter"] = start_after
 
-        for obj in response.get("Contents", []):
-            if obj["Key"].startswith(self._base_path.lstrip("/")) and not obj[
-                "Key"
-            ].endswith("/"):
-                file_data = {
+        for page in paginator.paginate(**options):
+            for obj in page.get("Contents", []):
+                if end is not None and obj["Key"] > end:
+                    return
+
+                if obj["Key"].endswith("/"):
+                    continue
+
+                yield {
+                    "name": obj["Key"][len(base_prefix) :],
                     "path": f"s3://{self._bucket_name}/{obj['Key']}",
                     "size": obj["Size"],
                     "mod_time": obj["LastModified"].strftime("%Y-%m-%d %H:%M:%S"),
                 }
-                files_data.append(file_data)
-
-        return files_data
 
     def get_base_path(self) -> str:
         """
@@ -338,13 +779,33 @@ def get_local_storage(file_system: FileSystem, base_path: str) -> LocalStorage:
 
 
 def get_s3_storage(
-    boto3_client: Boto3Client, bucket_name: str, base_path: str
+    boto3_client: Boto3Client,
+    bucket_name: str,
+    base_path: str,
+    transfer_config: Optional[TransferConfig] = None,
+    list_concurrency: int = 1,
+    range_size: Optional[int] = None,
+    range_concurrency: int = 4,
+    range_retries: int = 3,
 ) -> S3Storage:
-    return S3Storage(boto3_client, bucket_name, base_path)
+    return S3Storage(
+        boto3_client,
+        bucket_name,
+        base_path,
+        transfer_config,
+        list_concurrency,
+        range_size,
+        range_concurrency,
+        range_retries,
+    )
 
 
 def get_boto3_client(
-    access_key_id: str, secret_access_key: str, region_name, endpoint_url: Optional[str]
+    access_key_id: str,
+    secret_access_key: str,
+    region_name,
+    endpoint_url: Optional[str],
+    max_pool_connections: Optional[int] = None,
 ) -> Boto3Client:
     """
     Get Boto3 Client
@@ -352,25 +813,56 @@ def get_boto3_client(
     Args:
         access_key_id (str): The access key id
         secret_access_key (str): The secret access key
+        region_name (str): The region name
+        endpoint_url (Optional[str]): The S3 compatible endpoint url
+        max_pool_connections (Optional[int]): The HTTP connection pool size
 
     Returns:
         The Boto3 Client
     """
-    if not endpoint_url:
-        return boto3.client(
-            "s3",
-            aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key,
-            region_name=region_name,
-        )
-    else:
-        return boto3.client(
-            "s3",
-            aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key,
-            region_name=region_name,
-            endpoint_url=endpoint_url,
-        )
+    options = {}
+
+    if endpoint_url:
+        options["endpoint_url"] = endpoint_url
+
+    if max_pool_connections:
+        options["config"] = Boto3Config(max_pool_connections=max_pool_connections)
+
+    return boto3.client(
+        "s3",
+        aws_access_key_id=access_key_id,
+        aws_secret_access_key=secret_access_key,
+        region_name=region_name,
+        **options,
+    )
+
+
+def get_transfer_config(transfer: Dict[str, Any]) -> Optional[TransferConfig]:
+    """
+    Get S3 Transfer Config
+
+    Args:
+        transfer (Dict[str, Any]): The storage transfer configs
+
+    Returns:
+        The transfer config or None to use the boto3 defaults
+    """
+    options = {
+        key: transfer[key]
+        for key in [
+            "multipart_threshold",
+            "multipart_chunksize",
+            "max_concurrency",
+            "max_bandwidth",
+            "use_threads",
+        ]
+        if key in transfer
+    }
+
+    if not options:
+        return None
+
+    return TransferConfig(**options)
 
 
 def get_storage(config: Config, storage_name: str) -> Storage:
@@ -382,13 +874,31 @@ def get_storage(config: Config, storage_name: str) -> Storage:
     if storage.get("type") == "local":
         return get_local_storage(FileSystem(), storage.get("path"))
     elif storage.get("type") == "s3":
+        transfer = config.get_transfer_config(storage_name)
+
+        # Each concurrent part or range transfer holds a connection, size the pool to match
+        concurrency = [transfer.get("max_concurrency", 0)]
+
+        if transfer.get("range_size"):
+            concurrency.append(transfer.get("range_concurrency", 4))
+
+        max_pool_connections = transfer.get(
+            "max_pool_connections", max(concurrency) or None
+        )
+
         return get_s3_storage(
             get_boto3_client(
                 storage.get("access_key_id"),
                 storage.get("secret_access_key"),
                 storage.get("region"),
                 storage.get("endpoint_url", None),
+                max_pool_connections,
             ),
             storage.get("bucket_name"),
             storage.get("path"),
+            get_transfer_config(transfer),
+            transfer.get("list_concurrency", 1),
+            transfer.get("range_size"),
+            transfer.get("range_concurrency", 4),
+            transfer.get("range_retries", 3),
         )
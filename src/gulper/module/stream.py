@@ -0,0 +1,571 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import io
+import time
+import queue
+import hashlib
+import tempfile
+import threading
+import subprocess
+from typing import Any, BinaryIO, Dict, List, Optional
+
+
+# The default size of the chunks moved through a stream
+CHUNK_SIZE = 1024 * 1024
+
+
+class QueueReader(io.RawIOBase):
+    """
+    The readable end of a bounded in-memory pipe.
+
+    Chunks are pushed by a producer through feed() and pulled by a
+    consumer through read(). The queue holds at most max_chunks chunks
+    so a slow consumer applies back pressure to the producer.
+    """
+
+    def __init__(self, max_chunks: int = 16):
+        """
+        Class Constructor
+
+        Args:
+            max_chunks (int): The maximum number of chunks held in memory
+        """
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._chunk = b""
+        self._offset = 0
+        self._eof = False
+        self._abandoned = threading.Event()
+        self._bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        """
+        Read the next available bytes into a buffer
+
+        Args:
+            buffer: A writable buffer
+
+        Returns:
+            int: The number of bytes read or 0 at the end of the stream
+        """
+        while self._offset >= len(self._chunk):
+            if self._eof:
+                return 0
+
+            item = self._queue.get()
+
+            if item is None:
+                self._eof = True
+                return 0
+
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise IOError(f"Stream producer failed: {item}")
+
+            self._chunk = item
+            self._offset = 0
+
+        size = min(len(buffer), len(self._chunk) - self._offset)
+        buffer[:size] = self._chunk[self._offset : self._offset + size]
+        self._offset += size
+        self._bytes_read += size
+
+        return size
+
+    def feed(self, item) -> bool:
+        """
+        Push a chunk, an end of stream marker or an error to the reader
+
+        Args:
+            item: The bytes chunk, None for end of stream or an exception
+
+        Returns:
+            bool: False if the reader was abandoned by its consumer
+        """
+        while not self._abandoned.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def abandon(self) -> None:
+        """
+        Mark the reader as abandoned so the producer stops feeding it
+        """
+        self._abandoned.set()
+
+    def close(self) -> None:
+        """
+        Close the reader, its producer stops feeding it
+        """
+        self.abandon()
+        super().close()
+
+    def is_abandoned(self) -> bool:
+        """
+        Whether the consumer gave up on the reader
+
+        Returns:
+            bool: whether the reader is abandoned
+        """
+        return self._abandoned.is_set()
+
+    def get_bytes_read(self) -> int:
+        """
+        Get the number of bytes consumed so far
+
+        Returns:
+            int: the number of bytes
+        """
+        return self._bytes_read
+
+
+class FanoutWriter(io.RawIOBase):
+    """
+    A writer that copies every chunk into a set of bounded readers
+    """
+
+    def __init__(self, count: int, max_chunks: int = 16):
+        """
+        Class Constructor
+
+        Args:
+            count (int): The number of readers to feed
+            max_chunks (int): The maximum number of chunks held per reader
+        """
+        self._readers = [QueueReader(max_chunks) for _ in range(count)]
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        """
+        Copy a chunk into all the readers that are still consumed
+
+        Args:
+            data: The bytes to write
+
+        Returns:
+            int: The number of bytes written
+        """
+        chunk = bytes(data)
+
+        if not chunk:
+            return 0
+
+        fed = False
+
+        for reader in self._readers:
+            if not reader.is_abandoned() and reader.feed(chunk):
+                fed = True
+
+        if not fed:
+            raise IOError("All the stream consumers have failed")
+
+        return len(chunk)
+
+    def close(self) -> None:
+        """
+        Signal the end of the stream to all the readers
+        """
+        if not self.closed:
+            for reader in self._readers:
+                reader.feed(None)
+        super().close()
+
+    def fail(self, error: BaseException) -> None:
+        """
+        Propagate a producer error to all the readers
+
+        Args:
+            error (BaseException): The producer error
+        """
+        for reader in self._readers:
+            reader.feed(error)
+        super().close()
+
+    def get_readers(self) -> List[QueueReader]:
+        """
+        Get the readers fed by this writer
+
+        Returns:
+            List[QueueReader]: The readers
+        """
+        return self._readers
+
+
+class TeeWriter(io.RawIOBase):
+    """
+    A writer that copies every chunk into a list of writers. A writer that
+    fails is dropped and the others keep being fed.
+    """
+
+    def __init__(self, writers: List[BinaryIO]):
+        """
+        Class Constructor
+
+        Args:
+            writers (List[BinaryIO]): The writers to copy the chunks into
+        """
+        self._writers = writers
+        self._errors = [None] * len(writers)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        """
+        Copy a chunk into all the writers that haven't failed
+
+        Args:
+            data: The bytes to write
+
+        Returns:
+            int: The number of bytes written
+        """
+        fed = False
+
+        for i, writer in enumerate(self._writers):
+            if self._errors[i] is not None:
+                continue
+
+            try:
+                writer.write(data)
+                fed = True
+            except Exception as e:
+                self._errors[i] = e
+
+        if not fed:
+            raise IOError("All the stream writers have failed")
+
+        return len(data)
+
+    def get_error(self, index: int) -> Optional[Exception]:
+        """
+        Get the error a writer failed with
+
+        Args:
+            index (int): The writer index
+
+        Returns:
+            Optional[Exception]: The error or None if the writer is still fed
+        """
+        return self._errors[index]
+
+
+class HashingWriter(io.RawIOBase):
+    """
+    A writer that calculates the SHA256 hash of the bytes passing through
+    """
+
+    def __init__(self, writer: BinaryIO):
+        """
+        Class Constructor
+
+        Args:
+            writer (BinaryIO): The writer to forward the bytes to
+        """
+        self._writer = writer
+        self._hash = hashlib.sha256()
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._hash.update(data)
+        self._size += len(data)
+        self._writer.write(data)
+        return len(data)
+
+    def hexdigest(self) -> str:
+        """
+        Get the SHA256 hash of the bytes written so far
+
+        Returns:
+            str: The SHA256 hash
+        """
+        return self._hash.hexdigest()
+
+    def get_size(self) -> int:
+        """
+        Get the number of bytes written so far
+
+        Returns:
+            int: the number of bytes
+        """
+        return self._size
+
+
+class HashingReader(io.RawIOBase):
+    """
+    A reader that calculates the SHA256 hash of the bytes passing through
+    """
+
+    def __init__(self, reader: BinaryIO):
+        """
+        Class Constructor
+
+        Args:
+            reader (BinaryIO): The reader to pull the bytes from
+        """
+        self._reader = reader
+        self._hash = hashlib.sha256()
+        self._size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._reader.read(size)
+        self._hash.update(data)
+        self._size += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def hexdigest(self) -> str:
+        """
+        Get the SHA256 hash of the bytes read so far
+
+        Returns:
+            str: The SHA256 hash
+        """
+        return self._hash.hexdigest()
+
+    def get_size(self) -> int:
+        """
+        Get the number of bytes read so far
+
+        Returns:
+            int: the number of bytes
+        """
+        return self._size
+
+
+class VerifyingReader(HashingReader):
+    """
+    A reader that fails at the end of the stream if the SHA256 hash of the
+    bytes read doesn't match the expected one. The consumer sees the error
+    before it sees the end of the stream.
+    """
+
+    def __init__(self, reader: BinaryIO, checksum: Optional[str]):
+        """
+        Class Constructor
+
+        Args:
+            reader (BinaryIO): The reader to pull the bytes from
+            checksum (Optional[str]): The expected SHA256 hash, None to only calculate it
+        """
+        super().__init__(reader)
+        self._checksum = checksum
+
+    def read(self, size: int = -1) -> bytes:
+        data = super().read(size)
+
+        if not data and size != 0:
+            self.verify()
+
+        return data
+
+    def verify(self) -> None:
+        """
+        Verify the SHA256 hash of the bytes read so far
+
+        Raises:
+            IOError: If the hash doesn't match the expected one
+        """
+        if self._checksum is not None and self.hexdigest() != self._checksum:
+            raise IOError("Database checksum doesn't match!")
+
+
+class TimingReader(io.RawIOBase):
+    """
+    A reader that counts the bytes of a download and the time its first
+    byte took to arrive
+    """
+
+    def __init__(self, reader: BinaryIO, start: float):
+        """
+        Class Constructor
+
+        Args:
+            reader (BinaryIO): The reader to pull the bytes from
+            start (float): The monotonic time the download was requested
+        """
+        self._reader = reader
+        self._start = start
+        self._first_byte = None
+        self._size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._reader.read(size)
+
+        if data and self._first_byte is None:
+            self._first_byte = time.monotonic() - self._start
+
+        self._size += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def get_size(self) -> int:
+        """
+        Get the number of bytes read so far
+
+        Returns:
+            int: the number of bytes
+        """
+        return self._size
+
+    def get_first_byte(self) -> Optional[float]:
+        """
+        Get the seconds between the download request and its first byte
+
+        Returns:
+            Optional[float]: The seconds or None if no byte arrived yet
+        """
+        return self._first_byte
+
+
+def get_transfer_stats(size: int, duration: float) -> Dict[str, Any]:
+    """
+    Get the stats of a finished transfer
+
+    Args:
+        size (int): The number of bytes transferred
+        duration (float): The transfer duration in seconds
+
+    Returns:
+        Dict[str, Any]: The size, duration and throughput in bytes per second
+    """
+    return {
+        "size": size,
+        "duration": round(duration, 3),
+        "throughput": int(size / duration) if duration > 0 else size,
+    }
+
+
+def format_throughput(throughput: int) -> str:
+    """
+    Format a throughput for humans
+
+    Args:
+        throughput (int): The throughput in bytes per second
+
+    Returns:
+        str: The throughput in MB/s
+    """
+    return f"{throughput / 1024**2:.2f} MB/s"
+
+
+def copy_stream(reader: BinaryIO, writer: BinaryIO, chunk_size: int = CHUNK_SIZE):
+    """
+    Copy a readable stream into a writer in chunks
+
+    Args:
+        reader (BinaryIO): The source stream
+        writer (BinaryIO): The destination stream
+        chunk_size (int): The chunk size
+    """
+    for chunk in iter(lambda: reader.read(chunk_size), b""):
+        writer.write(chunk)
+
+
+def stream_command_output(command: str, writer: BinaryIO) -> None:
+    """
+    Execute a shell command and stream its stdout into a writer
+
+    Args:
+        command (str): Command string to execute
+        writer (BinaryIO): The writer to stream the output into
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            command, shell=True, stdout=subprocess.PIPE, stderr=stderr
+        )
+
+        try:
+            copy_stream(process.stdout, writer)
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            process.stdout.close()
+
+        if process.wait() != 0:
+            stderr.seek(0)
+            raise Exception(f"Error: {stderr.read().decode()}")
+
+
+def stream_command_input(command: str, reader: BinaryIO) -> None:
+    """
+    Execute a shell command and stream a reader into its stdin
+
+    Args:
+        command (str): Command string to execute
+        reader (BinaryIO): The reader to stream into the command
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+        )
+
+        try:
+            copy_stream(reader, process.stdin)
+        except BrokenPipeError:
+            # The command exited early, its stderr tells why
+            pass
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+        if process.wait() != 0:
+            stderr.seek(0)
+            raise Exception(f"Error: {stderr.read().decode()}")
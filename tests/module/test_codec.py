@@ -0,0 +1,142 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import io
+import os
+import pytest
+from gulper.module import get_codec, get_file_system
+from gulper.module.codec import ParallelReader, ParallelWriter, get_codec_by_path
+
+
+@pytest.mark.parametrize("name", ["gzip", "xz", "zstd", "lz4", "none"])
+def test_codec_round_trip(name):
+    """Codec Tests"""
+    if name == "zstd":
+        pytest.importorskip("zstandard")
+    if name == "lz4":
+        pytest.importorskip("lz4")
+
+    codec = get_codec(name, 1)
+    data = b"INSERT INTO t VALUES (1, 'gulper');\n" * 5000
+    output = io.BytesIO()
+
+    with codec.open_writer(output) as writer:
+        writer.write(data)
+
+    assert not output.closed
+
+    output.seek(0)
+
+    with codec.open_reader(output) as reader:
+        assert reader.read() == data
+
+    assert get_codec_by_path(f"backup.tar{codec.get_extension()}").get_name() == name
+
+
+def test_unsupported_codec():
+    """Unsupported codecs are rejected"""
+    with pytest.raises(Exception):
+        get_codec("rar")
+
+
+def test_archive_with_codec(tmp_path):
+    """FileSystem archives with a codec"""
+    file_system = get_file_system()
+    input_file = os.path.join(tmp_path, "db.sql")
+    file_system.write_to_file(input_file, "SELECT 1;\n" * 100)
+    checksum_file = file_system.write_checksum_to_file(input_file)
+    archive = os.path.join(tmp_path, "db.tar.xz")
+    file_system.compress_archive(input_file, checksum_file, archive, get_codec("xz"))
+
+    transcoded = os.path.join(tmp_path, "db.tar")
+    file_system.transcode_file(archive, transcoded, get_codec("xz"), get_codec("none"))
+
+    extract_to = os.path.join(tmp_path, "out")
+    os.mkdir(extract_to)
+    checksums = file_system.extract_archive(transcoded, extract_to)
+
+    assert checksums["db.sql"] == file_system.read_file(checksum_file)
+
+
+@pytest.mark.parametrize("name", ["gzip", "xz", "zstd", "lz4"])
+def test_parallel_codec_round_trip(name):
+    """Parallel block compression and decompression"""
+    if name == "zstd":
+        pytest.importorskip("zstandard")
+    if name == "lz4":
+        pytest.importorskip("lz4")
+
+    parallel = get_codec(name, 1, workers=4, block_size=1024)
+    data = os.urandom(4096).hex().encode() * 10
+    output = io.BytesIO()
+
+    with parallel.open_writer(output) as writer:
+        for i in range(0, len(data), 1000):
+            writer.write(data[i : i + 1000])
+
+    # Readable by the sequential decoder
+    output.seek(0)
+
+    with get_codec(name).open_reader(output) as reader:
+        assert reader.read() == data
+
+    # Readable by the parallel decoder
+    output.seek(0)
+
+    with parallel.open_reader(output) as reader:
+        assert reader.read() == data
+
+
+def test_parallel_reader_fallback():
+    """Parallel decoder reads data compressed sequentially"""
+    data = b"SELECT 1;\n" * 10000
+    output = io.BytesIO()
+
+    with get_codec("gzip").open_writer(output) as writer:
+        writer.write(data)
+
+    output.seek(0)
+
+    with get_codec("gzip", workers=4).open_reader(output) as reader:
+        assert reader.read() == data
+
+
+def test_parallel_codec_capabilities():
+    """Only the block codecs open parallel writers and readers"""
+    output = io.BytesIO()
+
+    with get_codec("xz", workers=4).open_writer(io.BytesIO()) as writer:
+        assert isinstance(writer, ParallelWriter)
+
+    assert not isinstance(
+        get_codec("xz", workers=4).open_reader(output), ParallelReader
+    )
+    assert not isinstance(
+        get_codec("none", workers=4).open_writer(output), ParallelWriter
+    )
+
+    with pytest.raises(Exception):
+        ParallelReader(get_codec("xz"), output, 4)
+
+    with pytest.raises(Exception):
+        ParallelWriter(get_codec("none"), output, 4, 1024)
@@ -138,3 +138,58 @@ def test_get_config():
     config = get_config("config.example.yaml")
     assert isinstance(config, Config)
     assert isinstance(config.config, dict)
+
+
+def test_get_upload_workers():
+    config = get_config("config.example.yaml")
+    assert config.get_upload_workers() == 4
+
+    config.config["concurrency"] = None
+    assert config.get_upload_workers() == 4
+
+
+def test_get_transfer_config():
+    config = get_config("config.example.yaml")
+    assert config.get_transfer_config("local_01") == {}
+    assert config.get_transfer_config("do_s3_01") == {
+        "multipart_threshold": 64 * 1024**2,
+        "multipart_chunksize": 64 * 1024**2,
+        "max_concurrency": 16,
+        "max_pool_connections": 16,
+        "use_threads": True,
+        "range_size": 64 * 1024**2,
+        "range_concurrency": 8,
+    }
+
+
+def test_get_restore_config():
+    config = get_config("config.example.yaml")
+    assert config.get_restore_config() == {
+        "hedge": False,
+        "hedge_throughput": 10 * 1024**2,
+        "hedge_delay": 5,
+        "history": 20,
+    }
+
+
+def test_get_concurrency_config():
+    config = get_config("config.example.yaml")
+    assert config.get_concurrency_config() == {
+        "uploads": 4,
+        "backups": 4,
+        "per_host": 2,
+        "per_storage": 0,
+    }
+
+
+def test_get_state_config():
+    config = get_config("config.example.yaml")
+    assert config.get_state_config() == {
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "busy_timeout": 5000,
+        "mmap_size": 256 * 1024**2,
+        "cache_size": 16 * 1024**2,
+        "event_batch_size": 500,
+        "event_flush_interval": 1,
+    }
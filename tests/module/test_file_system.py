@@ -0,0 +1,74 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import os
+import hashlib
+from gulper.module import get_file_system
+
+
+def test_compress_and_extract_archive(tmp_path):
+    """FileSystem archive round trip with checksums"""
+    file_system = get_file_system()
+    input_file = os.path.join(tmp_path, "db.sql")
+    content = b"INSERT INTO t VALUES (1);\n" * 1000
+
+    with open(input_file, "wb") as f:
+        f.write(content)
+
+    checksum = hashlib.sha256(content).hexdigest()
+    checksum_file = file_system.write_checksum_to_file(input_file, checksum)
+    archive = os.path.join(tmp_path, "db.tar.gz")
+    file_system.compress_archive(input_file, checksum_file, archive)
+
+    extract_to = os.path.join(tmp_path, "out")
+    os.mkdir(extract_to)
+    checksums = file_system.extract_archive(archive, extract_to)
+
+    assert checksums["db.sql"] == checksum
+    assert (
+        file_system.read_file(os.path.join(extract_to, "db.sql.checksum")) == checksum
+    )
+    assert file_system.get_sha256_hash(os.path.join(extract_to, "db.sql")) == checksum
+
+
+def test_directory_archive_checksums(tmp_path):
+    """FileSystem directory archive round trip with a checksum manifest"""
+    file_system = get_file_system()
+    backup_dir = os.path.join(tmp_path, "backup")
+    os.mkdir(backup_dir)
+
+    for name in ["toc.dat", "3001.dat", "3002.dat"]:
+        with open(os.path.join(backup_dir, name), "wb") as f:
+            f.write(name.encode() * 1000)
+
+    checksum_file = file_system.write_directory_checksums(backup_dir, 2)
+    archive = os.path.join(tmp_path, "backup.tar.gz")
+    file_system.compress_archive(backup_dir, checksum_file, archive)
+
+    extract_to = os.path.join(tmp_path, "extract")
+    os.mkdir(extract_to)
+    checksums = file_system.extract_archive(archive, extract_to)
+    expected = file_system.read_checksums(os.path.join(extract_to, "backup.checksum"))
+
+    assert sorted(expected) == ["backup/3001.dat", "backup/3002.dat", "backup/toc.dat"]
+    assert all(checksums[path] == checksum for path, checksum in expected.items())
@@ -0,0 +1,224 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import os
+from gulper.module import get_file_system
+from gulper.module.codec import get_codec
+from gulper.module.mysql import MySQL, get_mysql
+
+
+class FakeCursor:
+    """Fake Cursor returning canned results in order"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.queries = []
+
+    def execute(self, query, args=None):
+        self.queries.append(query)
+        self.result = self.results.pop(0)
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+def test_mysql_chunk_ranges(tmp_path):
+    """MySQL tables are split on single integer primary keys only"""
+    mysql = get_mysql(
+        get_file_system(),
+        "localhost",
+        "root",
+        "secret",
+        3306,
+        ["app"],
+        str(tmp_path),
+        {},
+        get_codec("gzip"),
+        "parallel",
+        4,
+        1000,
+    )
+
+    cursor = FakeCursor([[("id", "bigint")], [(2500,)], [(1001,)], [(2001,)], []])
+    assert mysql._get_ranges(cursor, "app", "users") == [
+        "`id` < 1001",
+        "`id` >= 1001 AND `id` < 2001",
+        "`id` >= 2001",
+    ]
+    assert "WHERE `id` >= 2001 ORDER BY `id` LIMIT 1 OFFSET 1000" in cursor.queries[-1]
+
+    # Sparse keys are split by rows, not by the span of the values
+    cursor = FakeCursor([[("id", "bigint")], [(1500,)], [(7 * 10**17,)], []])
+    assert mysql._get_ranges(cursor, "app", "users") == [
+        f"`id` < {7 * 10**17}",
+        f"`id` >= {7 * 10**17}",
+    ]
+
+    cursor = FakeCursor([[("id", "bigint")], [(500,)]])
+    assert mysql._get_ranges(cursor, "app", "users") == [None]
+    assert len(cursor.queries) == 2
+
+    cursor = FakeCursor([[("id", "varchar")]])
+    assert mysql._get_ranges(cursor, "app", "users") == [None]
+
+    cursor = FakeCursor([[("a", "int"), ("b", "int")]])
+    assert mysql._get_ranges(cursor, "app", "users") == [None]
+
+
+def test_mysql_schema_restore(tmp_path):
+    """MySQL schema backups restore only the selected schemas"""
+    file_system = get_file_system()
+    restored = []
+
+    class FakeMySQL(MySQL):
+        def _execute_command(self, command):
+            if "SHOW DATABASES" in command:
+                return "app\ntenant_1\ntenant_2\nsys\n"
+
+            if command.startswith("mysqldump"):
+                output = command.split(" > ")[1]
+                schema = os.path.basename(output)[:-4]
+
+                with open(output, "w") as writer:
+                    writer.write(f"CREATE DATABASE {schema};\n")
+                return ""
+
+            restored.append(os.path.basename(command.split(" < ")[1]))
+            return ""
+
+    mysql = FakeMySQL(
+        file_system,
+        "localhost",
+        "root",
+        "secret",
+        3306,
+        [],
+        str(tmp_path),
+        {"single-transaction": True},
+        get_codec("gzip"),
+        "schemas",
+        2,
+    )
+
+    backup_path = mysql.backup()
+    assert os.listdir(tmp_path) == [os.path.basename(backup_path)]
+
+    mysql.restore(backup_path, ["tenant_2"])
+    assert restored == ["tenant_2.sql"]
+    assert os.listdir(tmp_path) == []
+
+    backup_path = mysql.backup()
+    restored.clear()
+    mysql.restore(backup_path)
+    assert sorted(restored) == ["app.sql", "tenant_1.sql", "tenant_2.sql"]
+
+
+def test_mysql_dump_objects(tmp_path):
+    """MySQL parallel backups dump routines, events and triggers"""
+
+    class FakeConnection:
+        def escape(self, value):
+            return f"'{value}'"
+
+    mysql = get_mysql(
+        get_file_system(),
+        "localhost",
+        "root",
+        "secret",
+        3306,
+        ["app"],
+        str(tmp_path),
+        {},
+        get_codec("gzip"),
+        "parallel",
+    )
+
+    cursor = FakeCursor(
+        [
+            [("PROCEDURE", "cleanup")],
+            [("purge",)],
+            [("audit",)],
+            [("cleanup", "STRICT", "CREATE PROCEDURE `cleanup`() BEGIN END")],
+            [("purge", "STRICT", "UTC", "CREATE EVENT `purge` DO SELECT 1")],
+            [
+                (
+                    "audit",
+                    "STRICT",
+                    "CREATE TRIGGER `audit` BEFORE INSERT ON t SET @a = 1",
+                )
+            ],
+        ]
+    )
+    mysql._dump_objects(FakeConnection(), cursor, str(tmp_path), "app")
+
+    with open(tmp_path / "app-schema-objects.sql") as reader:
+        content = reader.read()
+
+    assert content.startswith("USE `app`;\nDELIMITER ;;\n")
+    assert "DROP PROCEDURE IF EXISTS `cleanup`;;\nCREATE PROCEDURE" in content
+    assert "SET SESSION time_zone = 'UTC';;\nDROP EVENT IF EXISTS `purge`;;" in content
+    assert "DROP TRIGGER IF EXISTS `audit`;;\nCREATE TRIGGER" in content
+    assert content.endswith("DELIMITER ;\n")
+    assert mysql._is_schema_file("app-schema-objects.sql", "app")
+
+    cursor = FakeCursor([[], [], []])
+    mysql._dump_objects(FakeConnection(), cursor, str(tmp_path), "tenant")
+    assert not os.path.exists(tmp_path / "tenant-schema-objects.sql")
+
+
+def test_mysql_dump_view(tmp_path):
+    """MySQL parallel backups create views as placeholders with the tables"""
+    mysql = get_mysql(
+        get_file_system(),
+        "localhost",
+        "root",
+        "secret",
+        3306,
+        ["app"],
+        str(tmp_path),
+        {},
+        get_codec("gzip"),
+        "parallel",
+    )
+
+    cursor = FakeCursor(
+        [
+            [("id",), ("name",)],
+            [("active", "CREATE ALGORITHM=UNDEFINED VIEW `active` AS select 1")],
+        ]
+    )
+    mysql._dump_view(cursor, str(tmp_path), "app", "active")
+
+    with open(tmp_path / "app.active-schema.sql") as reader:
+        assert reader.read() == (
+            "USE `app`;\nDROP VIEW IF EXISTS `active`;\n"
+            "CREATE VIEW `active` AS SELECT 1 AS `id`, 1 AS `name`;\n"
+        )
+
+    with open(tmp_path / "app.active-schema-view.sql") as reader:
+        assert reader.read() == (
+            "USE `app`;\nCREATE OR REPLACE ALGORITHM=UNDEFINED VIEW `active` AS select 1;\n"
+        )
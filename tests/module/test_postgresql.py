@@ -0,0 +1,92 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import os
+from gulper.module import get_file_system
+from gulper.module.codec import get_codec
+from gulper.module.postgresql import PostgreSQL
+
+
+def test_postgresql_cluster_backup(tmp_path):
+    """PostgreSQL cluster backups restore the globals before the databases"""
+    restored = []
+
+    class FakePostgreSQL(PostgreSQL):
+        def _execute_command(self, command):
+            if "pg_database" in command:
+                return "app\ntenant_1\npostgres\n"
+
+            if "pg_dump" in command:
+                output = command.split(" -f ")[1]
+
+                with open(output, "w") as writer:
+                    writer.write(f"-- {os.path.basename(output)}\n")
+                return ""
+
+            restored.append(os.path.basename(command.split(" -f ")[1]))
+            return ""
+
+    postgresql = FakePostgreSQL(
+        get_file_system(),
+        "localhost",
+        "postgres",
+        "secret",
+        5432,
+        None,
+        str(tmp_path),
+        get_codec("gzip"),
+        "cluster",
+        2,
+    )
+
+    backup_path = postgresql.backup()
+    assert os.listdir(tmp_path) == [os.path.basename(backup_path)]
+
+    postgresql.restore(backup_path)
+    assert restored[0] == "globals.sql"
+    assert sorted(restored[1:]) == ["app.db.sql", "postgres.db.sql", "tenant_1.db.sql"]
+    assert os.listdir(tmp_path) == []
+
+    backup_path = postgresql.backup()
+    restored.clear()
+    postgresql.restore(backup_path, ["tenant_1"])
+    assert restored == ["globals.sql", "tenant_1.db.sql"]
+
+
+def test_postgresql_jobs(tmp_path):
+    """PostgreSQL dumps and restores run at least one job"""
+    postgresql = PostgreSQL(
+        get_file_system(),
+        "localhost",
+        "postgres",
+        "secret",
+        5432,
+        "app",
+        str(tmp_path),
+        get_codec("gzip"),
+        "directory",
+        0,
+    )
+
+    assert " -j 1 " in postgresql._build_directory_dump_command("/tmp/app")
+    assert " -j 1 " in postgresql._build_directory_restore_command("/tmp/app")
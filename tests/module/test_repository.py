@@ -0,0 +1,125 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import random
+import io
+import os
+import pytest
+from gulper.module import get_file_system
+from gulper.module.codec import get_codec
+from gulper.module.storage import get_local_storage
+from gulper.module.repository import Chunker, get_repository
+
+
+def get_dump(rows):
+    return b"".join(f"INSERT INTO t VALUES ({i}, 'row {i}');\n".encode() for i in rows)
+
+
+def test_chunker():
+    """Chunker cut points only move around a change"""
+    chunker = Chunker(1024, 4096, 16384)
+    data = get_dump(range(20000))
+    chunks = list(chunker.split(io.BytesIO(data)))
+
+    assert b"".join(chunks) == data
+    assert all(len(chunk) <= 16384 for chunk in chunks)
+
+    changed = list(chunker.split(io.BytesIO(get_dump([-1]) + data)))
+
+    assert len(set(changed) - set(chunks)) <= 2
+
+    # Binary data keeps its cut points when a byte is inserted
+    data = random.Random(1).randbytes(200000)
+    chunks = list(chunker.split(io.BytesIO(data)))
+    changed = list(chunker.split(io.BytesIO(data[:50000] + b"x" + data[50000:])))
+
+    assert len(chunks) > 20
+    assert len(set(changed) - set(chunks)) <= 2
+
+
+def test_repository(tmp_path):
+    """Repository round trip uploads only new chunks and collects garbage"""
+    storage_path = os.path.join(tmp_path, "storage")
+    os.mkdir(storage_path)
+    storage = get_local_storage(get_file_system(), storage_path)
+    repository = get_repository(
+        storage, get_codec("gzip"), str(tmp_path), Chunker(1024, 4096, 16384), 4
+    )
+    data = get_dump(range(20000))
+
+    first = repository.write(io.BytesIO(data), "first")
+    second = repository.write(io.BytesIO(get_dump([-1]) + data), "second")
+
+    assert first["new_chunks"] == first["chunks"]
+    assert second["new_chunks"] <= 2
+
+    output = io.BytesIO()
+    repository.read("first", output)
+    assert output.getvalue() == data
+
+    storage.delete_file(repository.get_index_name("second"))
+    deleted = repository.collect_garbage(0)
+
+    assert len(deleted) == second["new_chunks"]
+    assert len(storage.get_files("chunks/")) == first["chunks"]
+
+
+def test_repository_lease(tmp_path):
+    """Garbage collection can't delete the chunks a running backup reuses"""
+    storage_path = os.path.join(tmp_path, "storage")
+    os.mkdir(storage_path)
+    storage = get_local_storage(get_file_system(), storage_path)
+    repository = get_repository(
+        storage, get_codec("gzip"), str(tmp_path), Chunker(1024, 4096, 16384), 4
+    )
+    data = get_dump(range(20000))
+    repository.write(io.BytesIO(data), "first")
+    storage.delete_file(repository.get_index_name("first"))
+
+    for file_data in storage.get_files("chunks/"):
+        os.utime(os.path.join(storage_path, file_data["name"]), (0, 0))
+
+    # A running backup holds a lease
+    storage.upload_stream(io.BytesIO(b"{}"), repository.get_lease_name("running"))
+    assert repository.collect_garbage(3600) == []
+
+    # A lease older than the grace belongs to a crashed backup
+    os.utime(os.path.join(storage_path, repository.get_lease_name("running")), (0, 0))
+    assert len(repository.collect_garbage(3600)) > 0
+    assert storage.get_files("leases/") == []
+
+    repository.write(io.BytesIO(data), "first")
+    storage.delete_file(repository.get_index_name("first"))
+
+    class DeletingReader(io.BytesIO):
+        def read(self, size=-1):
+            # A garbage collection that started before the lease
+            for file_data in storage.get_files("chunks/"):
+                storage.delete_file(file_data["name"])
+            return super().read(size)
+
+    with pytest.raises(Exception):
+        repository.write(DeletingReader(data), "second")
+
+    assert storage.get_files("indexes/") == []
+    assert storage.get_files("leases/") == []
@@ -0,0 +1,54 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from datetime import datetime, timezone
+from gulper.module import get_schedule
+
+
+def test_get_cron_window():
+    """Schedule Tests"""
+    schedule = get_schedule()
+
+    start, end = schedule.get_cron_window(
+        "*/5 * * * *", datetime(2025, 1, 1, 10, 7, 3, tzinfo=timezone.utc)
+    )
+    assert start == datetime(2025, 1, 1, 10, 5, tzinfo=timezone.utc)
+    assert end == datetime(2025, 1, 1, 10, 10, tzinfo=timezone.utc)
+
+    # A run time starts its own window
+    start, end = schedule.get_cron_window(
+        "0 * * * *", datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+    )
+    assert start == datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+    assert end == datetime(2025, 1, 1, 11, 0, tzinfo=timezone.utc)
+
+
+def test_get_interval_window():
+    """Schedule Tests"""
+    schedule = get_schedule()
+
+    start, end = schedule.get_interval_window(
+        30, datetime(2025, 1, 1, 10, 7, 45, tzinfo=timezone.utc)
+    )
+    assert start == datetime(2025, 1, 1, 10, 7, 30, tzinfo=timezone.utc)
+    assert end == datetime(2025, 1, 1, 10, 8, tzinfo=timezone.utc)
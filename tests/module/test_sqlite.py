@@ -0,0 +1,92 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import os
+import sqlite3
+from gulper.module import get_file_system
+from gulper.module.codec import get_codec
+from gulper.module.sqlite import get_sqlite
+
+
+def test_sqlite_snapshot(tmp_path):
+    """SQLite snapshots see the committed data of a WAL database"""
+    db_path = os.path.join(tmp_path, "app.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (x TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(f"row {i}",) for i in range(100)])
+    conn.commit()
+
+    for mode in ["backup", "vacuum"]:
+        sqlite = get_sqlite(
+            get_file_system(), str(tmp_path), db_path, get_codec("gzip"), {"mode": mode}
+        )
+        snapshot = os.path.join(tmp_path, f"{mode}.db")
+
+        with open(snapshot, "wb") as writer:
+            sqlite.dump(writer)
+
+        snapshot_conn = sqlite3.connect(snapshot)
+        assert snapshot_conn.execute("SELECT COUNT(*) FROM t").fetchone() == (100,)
+        snapshot_conn.close()
+
+    conn.close()
+
+
+def test_sqlite_incremental_backup(tmp_path):
+    """SQLite increments store only the changed pages and rebuild the database"""
+    file_system = get_file_system()
+    db_path = os.path.join(tmp_path, "app.db")
+    manifest = os.path.join(tmp_path, "manifests", "app.pages")
+    sqlite = get_sqlite(file_system, str(tmp_path), db_path, get_codec("gzip"))
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE t (x TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(f"row {i}",) for i in range(5000)])
+    conn.commit()
+
+    full, parent = sqlite.backup_incremental(manifest, None)
+    full_id = os.path.basename(full).split(".")[0]
+    assert parent is None
+
+    conn.execute("UPDATE t SET x = 'changed' WHERE rowid = 10")
+    conn.execute("INSERT INTO t VALUES ('new')")
+    conn.commit()
+    rows = conn.execute("SELECT rowid, x FROM t").fetchall()
+    conn.close()
+
+    increment, parent = sqlite.backup_incremental(manifest, full_id)
+    assert parent == full_id
+    assert os.path.getsize(increment) < os.path.getsize(full)
+
+    # An unknown parent falls back to a full backup
+    other, parent = sqlite.backup_incremental(manifest, full_id)
+    assert parent is None
+    os.remove(other)
+
+    os.remove(db_path)
+    sqlite.restore_chain([full, increment])
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT rowid, x FROM t").fetchall() == rows
+    conn.close()
@@ -0,0 +1,292 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import time
+import pytest
+import sqlite3
+from gulper.module import BackupRecord, get_state
+
+
+def get_test_state(tmp_path):
+    state = get_state(str(tmp_path / "state.db"))
+    state.connect()
+    state.migrate()
+    return state
+
+
+def test_delete_stale_events(tmp_path):
+    """State Tests"""
+    state = get_test_state(tmp_path)
+
+    for i in range(5):
+        state.insert_event({"id": f"e{i}", "db": "db01", "type": "info"})
+
+    state._connection.execute(
+        "UPDATE event SET createdAt = datetime('now', '-2 days') WHERE id IN ('e0', 'e1', 'e2')"
+    )
+
+    assert state.delete_stale_events(86400) == 3
+    assert sorted(event.get("id") for event in state.get_events()) == ["e3", "e4"]
+
+
+def test_get_stale_backups_by_db(tmp_path):
+    """State Tests"""
+    state = get_test_state(tmp_path)
+
+    state.insert_backup({"id": "a1", "db": "db01", "status": "success"})
+    state.insert_backup({"id": "a2", "db": "db01", "status": "success", "parent": "a1"})
+    state.insert_backup({"id": "b1", "db": "db02", "status": "success"})
+    state.insert_backup({"id": "c1", "db": "db03", "status": "success"})
+    state._connection.execute(
+        "UPDATE backup SET createdAt = datetime('now', '-2 hours')"
+    )
+
+    backups = state.get_stale_backups_by_db({"db01": 3600, "db02": 86400, "db03": 60})
+
+    assert sorted(backup.get("id") for backup in backups) == ["a1", "a2", "c1"]
+    assert state.get_child_counts(["a1", "a2", "c1"]) == {"a1": 1}
+    assert state.get_stale_backups_by_db({}) == []
+
+
+def test_get_recent_restores(tmp_path):
+    """State Tests"""
+    state = get_test_state(tmp_path)
+    downloads = (
+        '{"downloads": [{"storage_name": "s3", "throughput": 10, "first_byte": 0.2}]}'
+    )
+
+    state.insert_event({"id": "e1", "db": "db01", "type": "info", "meta": downloads})
+    state.insert_event({"id": "e2", "db": "db01", "type": "info"})
+    state.insert_event({"id": "e3", "db": "db02", "type": "info", "meta": downloads})
+    state.insert_event({"id": "e4", "db": "db01", "type": "info", "meta": downloads})
+    state._connection.execute(
+        "UPDATE event SET createdAt = datetime('now', '-1 hour') WHERE id = 'e1'"
+    )
+
+    events = state.get_recent_restores("db01", 5)
+
+    assert [event.get("id") for event in events] == ["e4", "e1"]
+    assert events[0].meta["downloads"][0]["first_byte"] == 0.2
+    assert len(state.get_recent_restores("db01", 1)) == 1
+
+
+def test_migrate_legacy_state(tmp_path):
+    """State Tests"""
+    connection = sqlite3.connect(str(tmp_path / "state.db"))
+    connection.execute(
+        "CREATE TABLE backup (id TEXT, db TEXT, meta TEXT, status TEXT, createdAt TEXT, updatedAt TEXT)"
+    )
+    connection.execute(
+        "INSERT INTO backup VALUES ('a1', 'db01', '{}', 'success', datetime('now'), datetime('now'))"
+    )
+    connection.commit()
+    connection.close()
+
+    state = get_test_state(tmp_path)
+    state.migrate()
+
+    assert state._connection.execute("PRAGMA user_version").fetchone()[0] == 2
+    assert state.get_latest_backup("db01").get("id") == "a1"
+    assert state.get_latest_backup("db01").get("parent") is None
+
+    plan = state._connection.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM backup WHERE db = ? ORDER BY createdAt DESC LIMIT 1",
+        ("db01",),
+    ).fetchall()
+    assert "backup_db_created_at" in str(plan)
+
+
+def test_migrate_duplicate_ids(tmp_path):
+    """State Tests"""
+    connection = sqlite3.connect(str(tmp_path / "state.db"))
+    connection.execute(
+        "CREATE TABLE backup (id TEXT, db TEXT, meta TEXT, status TEXT, createdAt TEXT, updatedAt TEXT, parent TEXT)"
+    )
+    connection.execute(
+        "CREATE TABLE event (id TEXT, db TEXT, record TEXT, type TEXT, meta TEXT, createdAt TEXT, updatedAt TEXT)"
+    )
+
+    for status in ["success", "failure"]:
+        connection.execute(
+            "INSERT INTO backup VALUES ('a1', 'db01', '{}', ?, datetime('now'), datetime('now'), NULL)",
+            (status,),
+        )
+        connection.execute(
+            "INSERT INTO event VALUES ('e1', 'db01', 'a1', 'info', '{}', datetime('now'), datetime('now'))"
+        )
+
+    connection.execute("PRAGMA user_version = 1")
+    connection.commit()
+    connection.close()
+
+    state = get_test_state(tmp_path)
+    state.migrate()
+
+    assert state._connection.execute("PRAGMA user_version").fetchone()[0] == 2
+    assert state._connection.execute("SELECT COUNT(*) FROM backup").fetchone()[0] == 1
+    assert state._connection.execute("SELECT COUNT(*) FROM event").fetchone()[0] == 1
+    assert state.get_latest_backup("db01").get("status") == "success"
+
+
+def test_connect_profile(tmp_path):
+    """State Tests"""
+    state = get_state(
+        str(tmp_path / "state.db"),
+        {
+            "journal_mode": "wal",
+            "synchronous": "normal",
+            "busy_timeout": 2000,
+            "cache_size": 8 * 1024**2,
+        },
+    )
+    state.connect()
+
+    assert state._connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert state._connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert state._connection.execute("PRAGMA busy_timeout").fetchone()[0] == 2000
+    assert state._connection.execute("PRAGMA cache_size").fetchone()[0] == -8192
+
+
+def test_record_events(tmp_path):
+    """State Tests"""
+    state = get_state(
+        str(tmp_path / "state.db"),
+        {"event_batch_size": 100, "event_flush_interval": 60},
+    )
+    state.connect()
+    state.migrate()
+
+    for i in range(3):
+        state.record_event({"id": f"e{i}", "db": "db01", "type": "info"})
+
+    assert state.get_events() == []
+
+    # Errors wake the writer up with the events buffered before them
+    state.record_event({"id": "e3", "db": "db01", "type": "error"})
+
+    for _ in range(100):
+        if len(state.get_events()) == 4:
+            break
+        time.sleep(0.05)
+
+    assert len(state.get_events()) == 4
+
+    state.record_event({"id": "e4", "db": "db01", "type": "info"})
+    assert state.flush_events() == 1
+    assert state.get_event_by_id("e4").get("createdAt") is not None
+
+
+def test_record_events_inline(tmp_path):
+    """State Tests"""
+    state = get_state(
+        str(tmp_path / "state.db"),
+        {"event_batch_size": 0, "event_flush_interval": 1},
+    )
+    state.connect()
+    state.migrate()
+
+    state.record_event({"id": "e0", "db": "db01", "type": "info"})
+
+    assert state._recorder is None
+    assert state.get_event_by_id("e0") is not None
+
+
+def test_record_events_failure(tmp_path, monkeypatch):
+    """State Tests"""
+    state = get_state(
+        str(tmp_path / "state.db"),
+        {"event_batch_size": 2, "event_flush_interval": 0.2},
+    )
+    state.connect()
+    state.migrate()
+    attempts = []
+
+    def insert_events(events):
+        attempts.append(len(events))
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(state, "insert_events", insert_events)
+    monkeypatch.setattr("gulper.module.recorder.MAX_BUFFERED_EVENTS", 5)
+
+    for i in range(10):
+        state.record_event({"id": f"e{i}", "db": "db01", "type": "info"})
+
+    # A failed flush waits an interval instead of retrying right away
+    time.sleep(0.5)
+    assert 1 <= len(attempts) <= 4
+    assert max(attempts) <= 5
+
+    monkeypatch.undo()
+    assert state.flush_events() == 5
+    assert state.get_event_by_id("e9") is not None
+    assert state.get_event_by_id("e0") is None
+
+
+def test_backup_record(tmp_path):
+    """State Tests"""
+    state = get_test_state(tmp_path)
+    state.insert_backup(
+        {"id": "a1", "db": "db01", "status": "success", "meta": '{"backups": []}'}
+    )
+
+    backup = state.get_backup_by_id("a1")
+
+    assert isinstance(backup, BackupRecord)
+    assert backup["id"] == "a1"
+    assert backup.get("parent") is None
+    assert backup.get("unknown", "default") == "default"
+    assert backup._meta is None
+    assert backup.get("meta") == {"backups": []}
+    assert backup.to_dict()["meta"] == {"backups": []}
+    assert not hasattr(backup, "__dict__")
+
+
+def test_iter_backups(tmp_path, monkeypatch):
+    """State Tests"""
+    monkeypatch.setattr("gulper.module.state.PAGE_SIZE", 2)
+    state = get_test_state(tmp_path)
+
+    for i in range(7):
+        state.insert_backup({"id": f"a{i}", "db": "db01", "status": "success"})
+        state._connection.execute(
+            "UPDATE backup SET createdAt = datetime('now', ?) WHERE id = ?",
+            (f"-{10 - i} minutes", f"a{i}"),
+        )
+
+    # Two backups share a creation time so the id breaks the tie
+    state._connection.execute(
+        "UPDATE backup SET createdAt = (SELECT createdAt FROM backup WHERE id = 'a3') WHERE id = 'a4'"
+    )
+
+    def ids(backups):
+        return [backup.get("id") for backup in backups]
+
+    assert ids(state.iter_backups()) == ["a6", "a5", "a4", "a3", "a2", "a1", "a0"]
+    assert ids(state.iter_backups(limit=3)) == ["a6", "a5", "a4"]
+    assert ids(state.iter_backups(before="a4", limit=3)) == ["a3", "a2", "a1"]
+    assert ids(state.iter_backups(after="a1", limit=3)) == ["a4", "a3", "a2"]
+    assert ids(state.iter_backups(after="a2", before="a5")) == ["a4", "a3"]
+    assert ids(state.iter_backups(db="db02")) == []
+
+    with pytest.raises(ValueError):
+        state.iter_backups(before="missing")
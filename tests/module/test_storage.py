@@ -0,0 +1,148 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import io
+import os
+import uuid
+from datetime import datetime
+from gulper.module import get_file_system
+from gulper.module.storage import get_local_storage, get_s3_storage
+
+
+class FakePaginator:
+    def __init__(self, keys, starts=None):
+        self._keys = keys
+        self._starts = starts if starts is not None else []
+
+    def paginate(self, Bucket, Prefix, StartAfter=""):
+        self._starts.append(StartAfter)
+        keys = [k for k in self._keys if k.startswith(Prefix) and k > StartAfter]
+
+        for i in range(0, len(keys), 1000):
+            yield {
+                "Contents": [
+                    {"Key": k, "Size": 1, "LastModified": datetime(2025, 1, 1)}
+                    for k in keys[i : i + 1000]
+                ]
+            }
+
+
+class FakeBody:
+    def __init__(self, data, fail_after=None):
+        self._data = io.BytesIO(data)
+        self._fail_after = fail_after
+
+    def read(self, size=-1):
+        if self._fail_after is not None and self._data.tell() >= self._fail_after:
+            raise IOError("Connection reset")
+        return self._data.read(min(size, 1000))
+
+
+class FakeBoto3Client:
+    def __init__(self, keys, objects=None):
+        self._keys = sorted(keys)
+        self._objects = objects or {}
+        self.ranges = []
+        self.failed = set()
+        self.starts = []
+
+    def get_paginator(self, name):
+        return FakePaginator(self._keys, self.starts)
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self._objects[Key]), "ETag": '"etag"'}
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None):
+        data = self._objects[Key]
+
+        if Range is None:
+            return {"Body": FakeBody(data)}
+
+        start, end = [int(i) for i in Range[len("bytes=") :].split("-")]
+        self.ranges.append((start, end))
+
+        # Every range is interrupted once in its middle
+        if start % 4096 == 0 and start not in self.failed:
+            self.failed.add(start)
+            return {"Body": FakeBody(data[start : end + 1], 2000)}
+
+        return {"Body": FakeBody(data[start : end + 1])}
+
+
+def test_local_storage_iter_files(tmp_path):
+    """LocalStorage yields the files matching a prefix"""
+    for name in ["a.tar.gz", "a.dump.gz", "b.tar.gz"]:
+        with open(os.path.join(tmp_path, name), "wb") as f:
+            f.write(b"data")
+
+    os.mkdir(os.path.join(tmp_path, "a_dir"))
+    storage = get_local_storage(get_file_system(), str(tmp_path))
+
+    assert len(storage.get_files()) == 3
+    assert sorted(os.path.basename(f["path"]) for f in storage.iter_files("a")) == [
+        "a.dump.gz",
+        "a.tar.gz",
+    ]
+
+
+def test_s3_storage_iter_files():
+    """S3Storage lists every page, sequentially and in parallel ranges"""
+    names = [f"{uuid.uuid4()}.tar.gz" for i in range(2500)]
+    keys = [f"backups/{name}" for name in names]
+    keys += [f"backups/chunks/{uuid.uuid4().hex}.gz" for i in range(500)]
+    keys += [f"backups/indexes/{uuid.uuid4()}.json" for i in range(50)]
+    keys += ["backups/", "backups/0", "backups/f", "backups/_other", "other/x.tar.gz"]
+    expected = sorted(
+        f"s3://bucket/{k}" for k in keys if k.startswith("backups/") and k[-1] != "/"
+    )
+
+    for concurrency in [1, 3, 16, 32]:
+        storage = get_s3_storage(
+            FakeBoto3Client(keys), "bucket", "/backups", None, concurrency
+        )
+        assert sorted(f["path"] for f in storage.iter_files()) == expected
+
+    # The chunks of a repository are listed in ranges of their own
+    client = FakeBoto3Client(keys)
+    storage = get_s3_storage(client, "bucket", "/backups", None, 4)
+    assert len(list(storage.iter_files())) == len(expected)
+    assert len([s for s in client.starts if s.startswith("backups/chunks/")]) == 3
+
+
+def test_s3_storage_range_download(tmp_path):
+    """S3Storage downloads large objects as concurrent retried ranges"""
+    data = os.urandom(50000)
+    client = FakeBoto3Client([], {"backups/a.tar.gz": data})
+    storage = get_s3_storage(client, "bucket", "/backups", None, 1, 4096, 4, 1)
+
+    storage.download_file("a.tar.gz", os.path.join(tmp_path, "a.tar.gz"))
+
+    with open(os.path.join(tmp_path, "a.tar.gz"), "rb") as f:
+        assert f.read() == data
+
+    # Interrupted ranges resume from the last byte received
+    assert (0, 4095) in client.ranges
+    assert (2000, 4095) in client.ranges
+
+    with storage.download_stream("a.tar.gz") as reader:
+        assert reader.read() == data
@@ -0,0 +1,161 @@
+# MIT License
+#
+# Copyright (c) 2025 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import io
+import time
+import hashlib
+import threading
+import pytest
+from gulper.module.stream import (
+    FanoutWriter,
+    HashingWriter,
+    TeeWriter,
+    TimingReader,
+    VerifyingReader,
+    copy_stream,
+)
+
+
+def test_fanout_writer():
+    """FanoutWriter Tests"""
+    fanout = FanoutWriter(2, max_chunks=2)
+    results = [io.BytesIO(), io.BytesIO()]
+    threads = [
+        threading.Thread(target=copy_stream, args=(reader, result))
+        for reader, result in zip(fanout.get_readers(), results)
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    for i in range(100):
+        fanout.write(f"line {i}\n".encode())
+
+    fanout.close()
+
+    for thread in threads:
+        thread.join()
+
+    expected = "".join(f"line {i}\n" for i in range(100)).encode()
+
+    assert results[0].getvalue() == expected
+    assert results[1].getvalue() == expected
+
+
+def test_fanout_writer_abandoned_reader():
+    """FanoutWriter keeps feeding the readers that are still consumed"""
+    fanout = FanoutWriter(2, max_chunks=1)
+    readers = fanout.get_readers()
+    readers[0].abandon()
+    result = io.BytesIO()
+    thread = threading.Thread(target=copy_stream, args=(readers[1], result))
+    thread.start()
+
+    for _ in range(10):
+        fanout.write(b"data")
+
+    fanout.close()
+    thread.join()
+
+    assert result.getvalue() == b"data" * 10
+
+
+def test_fanout_writer_failure():
+    """FanoutWriter propagates producer errors to the readers"""
+    fanout = FanoutWriter(1)
+    fanout.write(b"data")
+    fanout.fail(Exception("dump failed"))
+    reader = fanout.get_readers()[0]
+
+    assert reader.read(4) == b"data"
+
+    try:
+        reader.read(4)
+        assert False
+    except IOError as e:
+        assert "dump failed" in str(e)
+
+
+def test_tee_writer_failure():
+    """TeeWriter keeps feeding the writers that haven't failed"""
+
+    class FailingWriter(io.RawIOBase):
+        def writable(self):
+            return True
+
+        def write(self, data):
+            raise IOError("All the stream consumers have failed")
+
+    working = io.BytesIO()
+    tee = TeeWriter([FailingWriter(), working])
+
+    tee.write(b"hello ")
+    tee.write(b"world")
+    assert working.getvalue() == b"hello world"
+    assert isinstance(tee.get_error(0), IOError)
+    assert tee.get_error(1) is None
+
+    tee = TeeWriter([FailingWriter()])
+
+    with pytest.raises(IOError):
+        tee.write(b"hello")
+
+
+def test_hashing_writer():
+    """HashingWriter Tests"""
+    result = io.BytesIO()
+    writer = HashingWriter(result)
+    writer.write(b"hello ")
+    writer.write(b"world")
+
+    assert result.getvalue() == b"hello world"
+    assert writer.hexdigest() == hashlib.sha256(b"hello world").hexdigest()
+    assert writer.get_size() == 11
+
+
+def test_verifying_reader():
+    """VerifyingReader fails before the end of a corrupted stream"""
+    data = b"backup" * 1000
+    checksum = hashlib.sha256(data).hexdigest()
+
+    result = io.BytesIO()
+    copy_stream(VerifyingReader(io.BytesIO(data), checksum), result, 100)
+    assert result.getvalue() == data
+
+    result = io.BytesIO()
+    with pytest.raises(IOError):
+        copy_stream(VerifyingReader(io.BytesIO(data[:-1]), checksum), result, 100)
+
+
+def test_timing_reader():
+    """TimingReader Tests"""
+    reader = TimingReader(io.BytesIO(b"x" * 1000), time.monotonic() - 1)
+
+    assert reader.get_first_byte() is None
+    assert reader.read(600) == b"x" * 600
+    first_byte = reader.get_first_byte()
+    assert first_byte >= 1
+    assert len(reader.read()) == 400
+    assert reader.read() == b""
+    assert reader.get_first_byte() == first_byte
+    assert reader.get_size() == 1000